@@ -14,6 +14,26 @@ bl_info = {
 
 if "bpy" in locals():
     import importlib
+    if "objx_warnings" in locals():
+        importlib.reload(objx_warnings)
+    if "objx_reader" in locals():
+        importlib.reload(objx_reader)
+    if "objx_tokenizer" in locals():
+        importlib.reload(objx_tokenizer)
+    if "objx_parse" in locals():
+        importlib.reload(objx_parse)
+    if "objx_archive" in locals():
+        importlib.reload(objx_archive)
+    if "objx_prefetch" in locals():
+        importlib.reload(objx_prefetch)
+    if "objx_memory" in locals():
+        importlib.reload(objx_memory)
+    if "objx_voxel" in locals():
+        importlib.reload(objx_voxel)
+    if "objx_stream" in locals():
+        importlib.reload(objx_stream)
+    if "objx_inspect" in locals():
+        importlib.reload(objx_inspect)
     if "import_objx" in locals():
         importlib.reload(import_objx)
 
@@ -22,6 +42,8 @@ import bpy
 from bpy.props import (
     BoolProperty,
     FloatProperty,
+    FloatVectorProperty,
+    IntProperty,
     StringProperty,
     EnumProperty,
     CollectionProperty,
@@ -46,7 +68,7 @@ class ImportOBJx(bpy.types.Operator, ImportHelper):
 
     filename_ext = ".objx"
     filter_glob: StringProperty(
-        default="*.objx;*.obj",
+        default="*.objx;*.obj;*.objx.gz;*.obj.gz;*.objx.xz;*.obj.xz;*.zip",
         options={'HIDDEN'},
     )
 
@@ -77,6 +99,13 @@ class ImportOBJx(bpy.types.Operator, ImportHelper):
         default=False,
     )
 
+    object_filter: StringProperty(
+        name="Only",
+        description="Comma separated names or patterns (such as Wall*) of the objects to import, all when empty. "
+                    "Only their part of the file is parsed, using an index kept next to the file",
+        default="",
+    )
+
     use_groups_as_vgroups: BoolProperty(
         name="Poly Groups",
         description="Import OBJx groups as vertex groups",
@@ -106,12 +135,81 @@ class ImportOBJx(bpy.types.Operator, ImportHelper):
         default=0.0,
     )
 
+    use_region: BoolProperty(
+        name="Region",
+        description="Only import the faces with a corner inside a box, in the coordinates of the file",
+        default=False,
+    )
+    region_min: FloatVectorProperty(
+        name="Min",
+        description="Minimum corner of the imported region, in the coordinates of the file",
+        default=(-100.0, -100.0, -100.0),
+    )
+    region_max: FloatVectorProperty(
+        name="Max",
+        description="Maximum corner of the imported region, in the coordinates of the file",
+        default=(100.0, 100.0, 100.0),
+    )
+
     rotate_transform_apply: BoolProperty(
         name="Rotate transform apply",
         description="Apply rotation to zero",
         default=True,
     )
 
+    parse_processes: IntProperty(
+        name="Processes",
+        description="Number of processes parsing big files in parallel (1 to parse them in Blender only)",
+        min=1, max=64,
+        soft_min=1, soft_max=16,
+        default=1,
+    )
+
+    use_streaming: BoolProperty(
+        name="Stream Objects",
+        description="Parse and build one object at a time, for files bigger than the memory "
+                    "(only when splitting by object or group). Each object, with the vertices it uses from "
+                    "the rest of the file, still has to fit in memory, and these vertices are read again "
+                    "for every object using them",
+        default=False,
+    )
+
+    pipeline_depth: IntProperty(
+        name="Pipeline Depth",
+        description="Build the objects while the next ones are parsed by the parsing processes, "
+                    "with at most that many parsed objects waiting to be built (0 to parse them in Blender, "
+                    "only when splitting by object or group)",
+        min=0, max=64,
+        soft_min=0, soft_max=16,
+        default=0,
+    )
+
+    use_memory_check: BoolProperty(
+        name="Check Memory",
+        description="Estimate the memory the import of a big file (256 MB or more) needs from a sample "
+                    "of it beforehand, stream it when it does not fit in the available memory (when splitting), "
+                    "or do not import it",
+        default=True,
+    )
+
+    voxel_size: FloatProperty(
+        name="Voxel Size",
+        description="Downsample the vertices while parsing, to one per voxel of that size averaging "
+                    "their positions and colors, faces being dropped (0 to keep all the vertices)",
+        min=0.0, max=1000.0,
+        soft_min=0.0, soft_max=10.0,
+        default=0.0,
+        subtype='DISTANCE',
+    )
+
+    vertex_budget: IntProperty(
+        name="Vertex Budget",
+        description="Downsample the vertices while parsing, growing the voxels so that at most about "
+                    "that many vertices are imported, faces being dropped (0 for no budget)",
+        min=0,
+        default=0,
+    )
+
     def draw(self, context):
         layout = self.layout
         layout.use_property_split = True
@@ -120,10 +218,22 @@ class ImportOBJx(bpy.types.Operator, ImportHelper):
         import_panel_include(layout, self)
         import_panel_transform(layout, self)
         import_panel_geometry(layout, self)
+        import_panel_performance(layout, self)
 
     def execute(self, context):
+        keywords = self.import_keywords(context)
+
+        ret = {'CANCELLED'}
+        for path in self.import_paths():
+            if self.import_file(context, path, keywords) == {'FINISHED'}:
+                ret = {'FINISHED'}
+        return ret
+
+    def import_keywords(self, context):
+        """
+        Returns the keyword arguments of import_objx.load() given by the properties of the operator.
+        """
         # print("Selected: " + context.active_object.name)
-        from . import import_objx
         import os
 
         if self.split_mode == 'OFF':
@@ -137,6 +247,9 @@ class ImportOBJx(bpy.types.Operator, ImportHelper):
                 "axis_forward",
                 "axis_up",
                 "filter_glob",
+                "use_region",
+                "region_min",
+                "region_max",
                 "split_mode",
                 "directory",
                 "filepath",
@@ -149,27 +262,165 @@ class ImportOBJx(bpy.types.Operator, ImportHelper):
             from_up=self.axis_up,
         ).to_4x4()
         keywords["global_matrix"] = global_matrix
+        if self.use_region:
+            keywords["region"] = (tuple(self.region_min), tuple(self.region_max))
 
         if bpy.data.is_saved and context.preferences.filepaths.use_relative_paths:
             keywords["relpath"] = os.path.dirname(bpy.data.filepath)
+        return keywords
 
-#        return import_objx.load(context, **keywords)
+    def import_paths(self):
+        """
+        Returns the paths of the files to import.
+        """
+        import os
 
         if self.files:
-            ret = {'CANCELLED'}
             dirname = os.path.dirname(self.filepath)
-            for file in self.files:
-                path = os.path.join(dirname, file.name)
-                if import_objx.load(context, filepath=path, **keywords) == {'FINISHED'}:
-                    ret = {'FINISHED'}
-            return ret
+            return [os.path.join(dirname, file.name) for file in self.files]
         else:
-            return import_objx.load(context, filepath=self.filepath, **keywords)
+            return [self.filepath]
+
+    def import_file(self, context, filepath, keywords):
+        from . import import_objx, objx_warnings
+        import os
+
+        warnings = objx_warnings.OBJxWarnings()
+        ret = import_objx.load(context, filepath=filepath, warnings=warnings, **keywords)
+        if warnings:
+            self.report({'WARNING'}, "%s:\n%s" % (os.path.basename(filepath), "\n".join(warnings.summary())))
+        return ret
 
     def invoke(self, context, event):
         return self.invoke_popup(context)
 
 
+# Interval of the timer building the objects of ImportOBJxModal, and time spent building at each tick, in seconds.
+MODAL_TIMER_STEP = 0.05
+MODAL_TIME_SLICE = 0.05
+
+# Datablocks an import creates, removed when it is cancelled.
+IMPORTED_DATA = ("objects", "meshes", "curves", "materials", "images")
+
+
+class ImportOBJxModal(ImportOBJx):
+    """Load a Wavefront OBJx File in the background, keeping Blender responsive (Esc to cancel, between meshes)"""
+    bl_idname = "import_scene.objx_modal"
+    bl_label = "Import OBJx (Background)"
+    bl_options = {'PRESET', 'UNDO'}
+
+    def execute(self, context):
+        from . import objx_warnings
+
+        keywords = self.import_keywords(context)
+        self._warnings = objx_warnings.OBJxWarnings()
+        self._existing = {attr: {datablock.as_pointer() for datablock in getattr(bpy.data, attr)}
+                          for attr in IMPORTED_DATA}
+        # The context given to execute() is only valid during that call, the import uses the current one.
+        self._steps = self.iter_import(bpy.context, keywords)
+        self._step = None
+        self._step_start = 0.0
+
+        wm = context.window_manager
+        self._timer = wm.event_timer_add(MODAL_TIMER_STEP, window=context.window)
+        wm.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+
+    def iter_import(self, context, keywords):
+        from . import import_objx
+
+        ret = {'CANCELLED'}
+        for path in self.import_paths():
+            file_ret = yield from import_objx.iter_load(context, filepath=path, warnings=self._warnings,
+                                                        background=True, **keywords)
+            if file_ret == {'FINISHED'}:
+                ret = {'FINISHED'}
+        return ret
+
+    def modal(self, context, event):
+        import time
+
+        if event.type == 'ESC':
+            self.cancel(context)
+            self.report({'WARNING'}, "OBJx import cancelled")
+            return {'CANCELLED'}
+        if event.type != 'TIMER' or event.timer is not self._timer:
+            return {'PASS_THROUGH'}
+
+        deadline = time.monotonic() + MODAL_TIME_SLICE
+        try:
+            status = next(self._steps)
+            while time.monotonic() < deadline:
+                status = next(self._steps)
+        except StopIteration as stop:
+            self.finish(context)
+            if self._warnings:
+                self.report({'WARNING'}, "\n".join(self._warnings.summary()))
+            return stop.value
+        except Exception as ex:
+            self.cancel(context)
+            self.report({'ERROR'}, "OBJx import failed: %s" % ex)
+            return {'CANCELLED'}
+        self.show_status(context, status)
+        return {'RUNNING_MODAL'}
+
+    def show_status(self, context, status):
+        """
+        Shows the progress of the import, its throughput and remaining time, in the status bar.
+        """
+        import time
+
+        now = time.monotonic()
+        if self._step != (status.text, status.unit):
+            self._step = (status.text, status.unit)
+            self._step_start = now
+        elapsed = now - self._step_start
+        text = "Importing OBJx: %s" % status.text
+        if status.unit == 'BYTES':
+            if elapsed > 0.0:
+                text += ", %.1f MB/s" % (status.done / elapsed / 1e6)
+        else:
+            text += " %d/%d faces" % (status.done, status.total)
+        if status.total and status.done and elapsed > 0.0:
+            text += ", ETA %d s" % (elapsed * (status.total - status.done) / status.done)
+        context.workspace.status_text_set(text + " (Esc to cancel)")
+
+    def finish(self, context):
+        context.window_manager.event_timer_remove(self._timer)
+        context.workspace.status_text_set(None)
+        self._steps = None
+
+    def cancel(self, context):
+        """
+        Stops the import, and removes the datablocks it created.
+        """
+        self._steps.close()
+        self.finish(context)
+        bpy.data.batch_remove([datablock for attr in IMPORTED_DATA for datablock in getattr(bpy.data, attr)
+                               if datablock.as_pointer() not in self._existing[attr]])
+
+
+class InspectOBJx(bpy.types.Operator, ImportHelper):
+    """Scan a Wavefront OBJx File and report its structure, without importing it"""
+    bl_idname = "import_scene.objx_inspect"
+    bl_label = "Inspect OBJx"
+
+    filename_ext = ".objx"
+    filter_glob: StringProperty(
+        default="*.objx;*.obj",
+        options={'HIDDEN'},
+    )
+
+    def execute(self, context):
+        from . import objx_inspect
+
+        summary = objx_inspect.inspect(self.filepath).summary()
+        for line in summary:
+            print(line)
+        self.report({'INFO'}, "\n".join(summary))
+        return {'FINISHED'}
+
+
 def import_panel_include(layout, operator):
     header, body = layout.panel("OBJX_import_include", default_closed=False)
     header.label(text="Include")
@@ -203,15 +454,39 @@ def import_panel_geometry(layout, operator):
         if operator.split_mode == 'ON':
             col.prop(operator, "use_split_objects", text="Split by Object")
             col.prop(operator, "use_split_groups", text="Split by Group")
+            col.prop(operator, "object_filter")
         else:
             col.prop(operator, "use_groups_as_vgroups")
 
+        col = body.column()
+        col.prop(operator, "use_region")
+        sub = col.column()
+        sub.enabled = operator.use_region
+        sub.prop(operator, "region_min")
+        sub.prop(operator, "region_max")
+
+
+def import_panel_performance(layout, operator):
+    header, body = layout.panel("OBJX_import_performance", default_closed=True)
+    header.label(text="Performance")
+    if body:
+        body.prop(operator, "parse_processes")
+        body.prop(operator, "use_memory_check")
+        body.prop(operator, "voxel_size")
+        body.prop(operator, "vertex_budget")
+        col = body.column()
+        col.enabled = operator.split_mode == 'ON'
+        col.prop(operator, "use_streaming")
+        col.prop(operator, "pipeline_depth")
+
 
 class IO_FH_objx(bpy.types.FileHandler):
     bl_idname = "IO_FH_objx"
     bl_label = "OBJX"
     bl_import_operator = "import_scene.objx"
-    bl_file_extensions = ".objx"
+    # Zip bundles are left to File > Import, poll_drop() cannot tell whether a dropped zip file holds an OBJx file,
+    # and claiming every zip file would take them from the other importers.
+    bl_file_extensions = ".objx;.objx.gz;.objx.xz"
 
     @classmethod
     def poll_drop(cls, context):
@@ -220,10 +495,14 @@ class IO_FH_objx(bpy.types.FileHandler):
 
 def menu_func_import(self, context):
     self.layout.operator(ImportOBJx.bl_idname, text="OBJx [4xUV, VC, Mat] (.objx)")
+    self.layout.operator(ImportOBJxModal.bl_idname, text="OBJx in Background (.objx)")
+    self.layout.operator(InspectOBJx.bl_idname, text="Inspect OBJx (.objx)")
 
 
 classes = (
     ImportOBJx,
+    ImportOBJxModal,
+    InspectOBJx,
     IO_FH_objx,
 )
 
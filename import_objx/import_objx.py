@@ -15,61 +15,36 @@ http://wiki.blender.org/index.php/Scripts/Manual/Import/wavefront_obj
 
 import array
 import os
+import threading
 import time
 import bpy
 import mathutils
+import numpy as np
 
-from bpy_extras.io_utils import unpack_list
 from bpy_extras.image_utils import load_image
 from bpy_extras.wm_utils.progress_report import ProgressReport
 
+from . import (objx_archive, objx_memory, objx_parse, objx_prefetch, objx_stream, objx_tokenizer, objx_voxel,
+               objx_warnings)
+from .objx_tokenizer import line_value
 
-def line_value(line_split):
-    """
-    Returns 1 string representing the value for this line
-    None will be returned if there's only 1 word
-    """
-    length = len(line_split)
-    if length == 1:
-        return None
-
-    elif length == 2:
-        return line_split[1]
-
-    elif length > 2:
-        return b' '.join(line_split[1:])
 
-
-def filenames_group_by_ext(line, ext):
+def archive_image_load(imagepath, dirname, prefetch, **kwargs):
     """
-    Splits material libraries supporting spaces, so:
-    b'foo bar.mtl baz spam.MTL' -> (b'foo bar.mtl', b'baz spam.MTL')
-    Also handle " chars (some software use those to protect filenames with spaces, see T67266... sic).
+    load_image(), the image being first looked for in the zip bundle of prefetch (an objx_prefetch.MaterialPrefetch)
+    when it has one, and packed in the blend-file when found there.
     """
-    # Note that we assume that if there are some " in that line,
-    # then all filenames are properly enclosed within those...
-    start = line.find(b'"') + 1
-    if start != 0:
-        while start != 0:
-            end = line.find(b'"', start)
-            if end != -1:
-                yield line[start:end]
-                start = line.find(b'"', end + 1) + 1
-            else:
-                break
-        return
-
-    line_lower = line.lower()
-    i_prev = 0
-    while i_prev != -1 and i_prev < len(line):
-        i = line_lower.find(ext, i_prev)
-        if i != -1:
-            i += len(ext)
-        yield line[i_prev:i].strip()
-        i_prev = i
+    if prefetch.archive is not None:
+        data = prefetch.read(os.path.join(dirname, imagepath))
+        if data is not None:
+            image = bpy.data.images.new(os.path.basename(imagepath), 1, 1)
+            image.pack(data=data, data_len=len(data))
+            image.source = 'FILE'
+            return image
+    return load_image(imagepath, dirname, **kwargs)
 
 
-def obj_image_load(img_data, context_imagepath_map, line, DIR, recursive, relpath):
+def obj_image_load(img_data, context_imagepath_map, line, DIR, recursive, relpath, prefetch):
     """
     Mainly uses comprehensiveImageLoad
     But we try all space-separated items from current line when file is not found with last one
@@ -91,9 +66,10 @@ def obj_image_load(img_data, context_imagepath_map, line, DIR, recursive, relpat
         imagepath = os.fsdecode(b" ".join(filepath_parts[i:]))
         image = context_imagepath_map.get(imagepath, ...)
         if image is ...:
-            image = load_image(imagepath, DIR, recursive=recursive, relpath=relpath)
+            image = archive_image_load(imagepath, DIR, prefetch, recursive=recursive, relpath=relpath)
             if image is None and "_" in imagepath:
-                image = load_image(imagepath.replace("_", " "), DIR, recursive=recursive, relpath=relpath)
+                image = archive_image_load(imagepath.replace("_", " "), DIR, prefetch,
+                                           recursive=recursive, relpath=relpath)
             if image is not None:
                 context_imagepath_map[imagepath] = image
                 del img_data[i:]
@@ -106,7 +82,7 @@ def obj_image_load(img_data, context_imagepath_map, line, DIR, recursive, relpat
 
     if image is None:
         imagepath = os.fsdecode(filepath_parts[-1])
-        image = load_image(imagepath, DIR, recursive=recursive, place_holder=True, relpath=relpath)
+        image = archive_image_load(imagepath, DIR, prefetch, recursive=recursive, place_holder=True, relpath=relpath)
         context_imagepath_map[imagepath] = image
 
     return image
@@ -114,10 +90,13 @@ def obj_image_load(img_data, context_imagepath_map, line, DIR, recursive, relpat
 
 def create_materials(filepath, relpath,
                      material_libs, unique_materials,
-                     use_image_search, float_func):
+                     use_image_search, float_func, warnings, prefetch):
     """
     Create all the used materials in this obj,
-    assign colors and images to the materials from all referenced material libs
+    assign colors and images to the materials from all referenced material libs,
+    warnings (an objx_warnings.OBJxWarnings) collecting the issues of the MTL files.
+    The material libs and images are read by prefetch (an objx_prefetch.MaterialPrefetch), from its zip bundle
+    when it has one.
     """
     from math import sqrt
     from bpy_extras import node_shader_utils
@@ -130,6 +109,10 @@ def create_materials(filepath, relpath,
 
     nodal_material_wrap_map = {}
 
+    def mtl_warn(category):
+        # About the MTL line currently parsed.
+        warnings.warn(category, "%s: %s" % (libname, line.decode('utf-8', 'replace')), line_number)
+
     def load_material_image(blender_material, mat_wrap, context_material_name, img_data, line, type):
         """
         Set textures defined in .mtl file.
@@ -137,7 +120,7 @@ def create_materials(filepath, relpath,
         map_options = {}
 
         # Absolute path - c:\.. etc would work here
-        image = obj_image_load(img_data, context_imagepath_map, line, DIR, use_image_search, relpath)
+        image = obj_image_load(img_data, context_imagepath_map, line, DIR, use_image_search, relpath, prefetch)
 
         curr_token = []
         for token in img_data[:-1]:
@@ -170,7 +153,7 @@ def create_materials(filepath, relpath,
 
         elif type == 'Ka':
             # XXX Not supported?
-            print("WARNING, currently unsupported ambient texture, skipped.")
+            mtl_warn("currently unsupported ambient texture, skipped")
 
         elif type == 'Ks':
             _generic_tex_set(mat_wrap.specular_texture, image, 'UV', map_offset, map_scale)
@@ -191,15 +174,14 @@ def create_materials(filepath, relpath,
 
         elif type == 'disp':
             # XXX Not supported?
-            print("WARNING, currently unsupported displacement texture, skipped.")
+            mtl_warn("currently unsupported displacement texture, skipped")
             # ~ mat_wrap.bump_image_set(image)
             # ~ mat_wrap.bump_mapping_set(coords='UV', translation=map_offset, scale=map_scale)
 
         elif type == 'refl':
             map_type = map_options.get(b'-type')
             if map_type and map_type != [b'sphere']:
-                print("WARNING, unsupported reflection type '%s', defaulting to 'sphere'"
-                      "" % ' '.join(i.decode() for i in map_type))
+                mtl_warn("unsupported reflection type, defaulting to 'sphere'")
 
             _generic_tex_set(mat_wrap.base_color_texture, image, 'Reflection', map_offset, map_scale)
             mat_wrap.base_color_texture.projection = 'SPHERE'
@@ -259,7 +241,7 @@ def create_materials(filepath, relpath,
 
     # Try to find a MTL with the same name as the OBJ if no MTLs are specified.
     temp_mtl = os.path.splitext((os.path.basename(filepath)))[0] + ".mtl"
-    if os.path.exists(os.path.join(DIR, temp_mtl)):
+    if prefetch.library(temp_mtl) is not None:
         material_libs.add(temp_mtl)
     del temp_mtl
 
@@ -274,8 +256,9 @@ def create_materials(filepath, relpath,
     for libname in sorted(material_libs):
         # print(libname)
         mtlpath = os.path.join(DIR, libname)
-        if not os.path.exists(mtlpath):
-            print("\tMaterial not found MTL: %r" % mtlpath)
+        mtl_content = prefetch.library(libname)
+        if mtl_content is None:
+            warnings.warn("material library not found", mtlpath)
         else:
             # Note: with modern Principled BSDF shader, things like ambient, raytrace or fresnel are always 'ON'
             # (i.e. automatically controlled by other parameters).
@@ -288,8 +271,7 @@ def create_materials(filepath, relpath,
             # print('\t\tloading mtl: %e' % mtlpath)
             context_material = None
             context_mat_wrap = None
-            mtl = open(mtlpath, 'rb')
-            for line in mtl:  # .readlines():
+            for line_number, line in enumerate(mtl_content.splitlines(), 1):  # .readlines():
                 line = line.strip()
                 if not line or line.startswith(b'#'):
                     continue
@@ -354,10 +336,10 @@ def create_materials(filepath, relpath,
                         context_mat_wrap.alpha = float_func(line_split[1])
                         context_material_vars.add("alpha")
                     elif line_id == b'tr':  # translucency
-                        print("WARNING, currently unsupported 'tr' translucency option, skipped.")
+                        mtl_warn("currently unsupported 'tr' translucency option, skipped")
                     elif line_id == b'tf':
                         # rgb, filter color, blender has no support for this.
-                        print("WARNING, currently unsupported 'tf' filter color option, skipped.")
+                        mtl_warn("currently unsupported 'tf' filter color option, skipped")
                     elif line_id == b'illum':
                         # Some MTL files incorrectly use a float for this value, see T60135.
                         illum = any_number_as_int(line_split[1])
@@ -365,8 +347,8 @@ def create_materials(filepath, relpath,
                         # inline comments are from the spec, v4.2
                         if illum == 0:
                             # Color on and Ambient off
-                            print("WARNING, Principled BSDF shader does not support illumination 0 mode "
-                                  "(colors with no ambient), skipped.")
+                            mtl_warn("Principled BSDF shader does not support illumination 0 mode "
+                                     "(colors with no ambient), skipped")
                         elif illum == 1:
                             # Color on and Ambient on
                             pass
@@ -406,8 +388,8 @@ def create_materials(filepath, relpath,
                             do_glass = True
                         elif illum == 10:
                             # Casts shadows onto invisible surfaces
-                            print("WARNING, Principled BSDF shader does not support illumination 10 mode "
-                                  "(cast shadows on invisible surfaces), skipped.")
+                            mtl_warn("Principled BSDF shader does not support illumination 10 mode "
+                                     "(cast shadows on invisible surfaces), skipped")
                             pass
 
                     elif line_id == b'map_ka':
@@ -453,107 +435,68 @@ def create_materials(filepath, relpath,
                             load_material_image(context_material, context_mat_wrap,
                                                 context_material_name, img_data, line, 'refl')
                     else:
-                        print("WARNING: %r:%r (ignored)" % (filepath, line))
+                        mtl_warn("unknown MTL directive (ignored)")
 
             # Finalize last mat, if any.
             finalize_material(context_material, context_material_vars, spec_colors,
                               do_highlight, do_reflection, do_transparency, do_glass)
-            mtl.close()
-
-
-def face_is_edge(face):
-    """Simple check to test whether given (temp, working) data is an edge, and not a real face."""
-    face_vert_loc_indices = face[0]
-    face_vert_nor_indices = face[1]
-    return len(face_vert_nor_indices) == 1 or len(face_vert_loc_indices) == 2
 
 
-def split_mesh(verts_loc, faces, unique_materials, filepath, SPLIT_OB_OR_GROUP):
+def split_mesh(data, unique_materials, filepath, SPLIT_OB_OR_GROUP):
     """
-    Takes vert_loc and faces, and separates into multiple sets of
-    (verts_loc, faces, unique_materials, dataname)
+    Takes the faces of data (an objx_parse.OBJxData), and separates them into multiple sets of
+    (verts_idx, faces, loc, unique_materials, dataname, use_vnor, use_vtex, use_vtex2, use_vtex3, use_vtex4),
+    faces being the indices of the faces of the set, loc the indices of all their corners in the vertices of the set,
+    and verts_idx the indices of those vertices in data.verts_loc (None when the set uses them all, in the same order).
     """
 
     filename = os.path.splitext((os.path.basename(filepath)))[0]
 
-    if not SPLIT_OB_OR_GROUP or not faces:
-        use_verts_nor = any(f[1] for f in faces)
-        use_verts_tex = any(f[2] for f in faces)
-        use_verts_tex2 = any(f[3] for f in faces)
-        use_verts_tex3 = any(f[4] for f in faces)
-        use_verts_tex4 = any(f[5] for f in faces)
-        # use the filename for the object name since we aren't chopping up the mesh.
-        return [(verts_loc, faces, unique_materials, filename, use_verts_nor, use_verts_tex, use_verts_tex2, use_verts_tex3, use_verts_tex4)]
-
-    def key_to_name(key):
-        # if the key is a tuple, join it to make a string
-        if not key:
-            return filename  # assume its a string. make sure this is true if the splitting code is changed
-        elif isinstance(key, bytes):
-            return key.decode('utf-8', 'replace')
-        else:
-            return "_".join(k.decode('utf-8', 'replace') for k in key)
-
-    # Return a key that makes the faces unique.
-    face_split_dict = {}
-
-    oldkey = -1  # initialize to a value that will never match the key
-
-    for face in faces:
-        (face_vert_loc_indices,
-         face_vert_nor_indices,
-         face_vert_tex_indices,
-         face_vert_tex2_indices,
-         face_vert_tex3_indices,
-         face_vert_tex4_indices,
-         context_material,
-         _context_smooth_group,
-         context_object_key,
-         _face_invalid_blenpoly,
-         ) = face
-        key = context_object_key
-
-        if oldkey != key:
-            # Check the key has changed.
-            (verts_split, faces_split, unique_materials_split, vert_remap,
-             use_verts_nor, use_verts_tex, use_verts_tex2, use_verts_tex3, use_verts_tex4) = face_split_dict.setdefault(key, ([], [], {}, {}, [], [], [], [], []))
-            oldkey = key
-
-        if not face_is_edge(face):
-            if not use_verts_nor and face_vert_nor_indices:
-                use_verts_nor.append(True)
-
-            if not use_verts_tex and face_vert_tex_indices:
-                use_verts_tex.append(True)
-
-            if not use_verts_tex2 and face_vert_tex2_indices:
-                use_verts_tex2.append(True)
-
-            if not use_verts_tex3 and face_vert_tex3_indices:
-                use_verts_tex3.append(True)
-
-            if not use_verts_tex4 and face_vert_tex4_indices:
-                use_verts_tex4.append(True)
-
-        # Remap verts to new vert list and add where needed
-        for loop_idx, vert_idx in enumerate(face_vert_loc_indices):
-            map_index = vert_remap.get(vert_idx)
-            if map_index is None:
-                map_index = len(verts_split)
-                vert_remap[vert_idx] = map_index  # set the new remapped index so we only add once and can reference next time.
-                verts_split.append(verts_loc[vert_idx])  # add the vert to the local verts
-
-            face_vert_loc_indices[loop_idx] = map_index  # remap to the local index
-
-            if context_material not in unique_materials_split:
-                unique_materials_split[context_material] = unique_materials[context_material]
+    face_offsets = np.frombuffer(data.face_offsets, dtype=np.int64)
+    face_sizes = np.diff(face_offsets)
+    face_loc = np.frombuffer(data.face_loc, dtype=np.int32)
+    is_polyline = (np.frombuffer(data.face_flags, dtype=np.uint8) & objx_parse.FACE_POLYLINE).astype(bool)
 
-        faces_split.append(face)
-
-    # remove one of the items and reorder
-    return [(verts_split, faces_split, unique_materials_split, key_to_name(key), bool(use_vnor), bool(use_vtex), bool(use_vtex2), bool(use_vtex3), bool(use_vtex4))
-            for key, (verts_split, faces_split, unique_materials_split, _, use_vnor, use_vtex, use_vtex2, use_vtex3, use_vtex4)
-            in face_split_dict.items()]
+    if not SPLIT_OB_OR_GROUP or not len(face_sizes):
+        use_verts_nor = bool(is_polyline.any() or face_sizes.any())
+        use_verts_tex = bool(face_sizes[~is_polyline].any())
+        # use the filename for the object name since we aren't chopping up the mesh.
+        return [(None, np.arange(len(face_sizes)), face_loc, unique_materials, filename,
+                 use_verts_nor, use_verts_tex, use_verts_tex, use_verts_tex, use_verts_tex)]
+
+    object_keys = list(data.object_keys)
+    material_keys = list(data.material_keys)
+    face_object = np.frombuffer(data.face_object, dtype=np.int32)
+    face_material = np.frombuffer(data.face_material, dtype=np.int32)
+    # Edges (polylines and faces with 2 verts) and single verts do not tell which vertex data the mesh uses.
+    is_face = ~is_polyline & (face_sizes > 2)
+
+    # Faces of each key, the keys being in the order of their first face.
+    keys, keys_first_face, keys_faces_num = np.unique(face_object, return_index=True, return_counts=True)
+    keys_faces_start = np.cumsum(keys_faces_num) - keys_faces_num
+    faces_by_key = np.argsort(face_object, kind='stable')
+
+    meshes = []
+    for key_idx in np.argsort(keys_first_face).tolist():
+        faces = faces_by_key[keys_faces_start[key_idx]:keys_faces_start[key_idx] + keys_faces_num[key_idx]]
+        sizes = face_sizes[faces]
+
+        # Remap verts to new vert list, in the order of their first use
+        verts_idx, verts_first_use, loc = np.unique(face_loc[objx_parse.csr_indices(face_offsets[faces], sizes)],
+                                                    return_index=True, return_inverse=True)
+        verts_order = np.argsort(verts_first_use)
+        verts_remap = np.empty_like(verts_order)
+        verts_remap[verts_order] = np.arange(len(verts_order))
+
+        materials, materials_first_face = np.unique(face_material[faces[sizes > 0]], return_index=True)
+        unique_materials_split = {material_keys[i]: unique_materials[material_keys[i]]
+                                  for i in materials[np.argsort(materials_first_face)].tolist()}
+
+        use_verts = bool(is_face[faces].any())
+        meshes.append((verts_idx[verts_order], faces, verts_remap[loc.ravel()], unique_materials_split,
+                       objx_parse.key_to_name(object_keys[keys[key_idx]], filename),
+                       use_verts, use_verts, use_verts, use_verts, use_verts))
+    return meshes
 
 
 def create_mesh(new_objects,
@@ -565,7 +508,9 @@ def create_mesh(new_objects,
                 verts_tex3,
                 verts_tex4,
                 verts_col,
+                data,
                 faces,
+                loc,
                 unique_materials,
                 unique_smooth_groups,
                 vertex_groups,
@@ -573,127 +518,73 @@ def create_mesh(new_objects,
                 ):
     """
     Takes all the data gathered and generates a mesh, adding the new object to new_objects
-    deals with ngons, sharp edges and assigning materials
+    deals with ngons, sharp edges and assigning materials.
+    faces are the indices of the faces of data (an objx_parse.OBJxData) to use,
+    loc the indices in verts_loc of all their corners, one face after the other.
+    verts_loc, verts_nor, verts_tex* and verts_col are float32 numpy arrays of one vertex per row.
     """
 
+    face_offsets = np.frombuffer(data.face_offsets, dtype=np.int64)
+    face_sizes = np.diff(face_offsets)[faces]
+    face_flags = np.frombuffer(data.face_flags, dtype=np.uint8)[faces]
+    face_material = np.frombuffer(data.face_material, dtype=np.int32)[faces]
+    face_smooth_group = np.frombuffer(data.face_smooth_group, dtype=np.int32)[faces]
+    use_smooth = np.array([bool(key) for key in data.smooth_group_keys], dtype=bool)
+    # Index of the corners in the data.face_* arrays, and of the first corner of each face in loc.
+    corners = objx_parse.csr_indices(face_offsets[faces], face_sizes)
+    corners_start = np.cumsum(face_sizes) - face_sizes
+
+    # Single verts are dropped, polylines and faces with 2 verts become edges, Blender-invalid ngons are tessellated.
+    is_face, faces_kept, edges, ngons = objx_parse.partition_faces(face_sizes, face_flags, loc, use_edges)
+
     if unique_smooth_groups:
-        sharp_edges = set()
-        smooth_group_users = {context_smooth_group: {} for context_smooth_group in unique_smooth_groups.keys()}
-        context_smooth_group_old = -1
+        # Edges used only once by the faces of a smooth group are on the boundary of that group.
+        smooth_faces = np.flatnonzero(is_face & use_smooth[face_smooth_group])
+        smooth_edges = np.column_stack((np.repeat(face_smooth_group[smooth_faces], face_sizes[smooth_faces]),
+                                        objx_parse.face_edges(corners_start[smooth_faces], face_sizes[smooth_faces],
+                                                              loc)))
+        smooth_edges, users = np.unique(smooth_edges, axis=0, return_counts=True)
+        sharp_edges = set(map(tuple, smooth_edges[users == 1, 1:].tolist()))
 
     fgon_edges = set()  # Used for storing fgon keys when we need to tessellate/untessellate them (ngons with hole).
-    edges = []
-    tot_loops = 0
-
-    context_object_key = None
-
-    # reverse loop through face indices
-    for f_idx in range(len(faces) - 1, -1, -1):
-        face = faces[f_idx]
-
-        (face_vert_loc_indices,
-         face_vert_nor_indices,
-         face_vert_tex_indices,
-         face_vert_tex2_indices,
-         face_vert_tex3_indices,
-         face_vert_tex4_indices,
-         context_material,
-         context_smooth_group,
-         context_object_key,
-         face_invalid_blenpoly,
-         ) = face
-
-        len_face_vert_loc_indices = len(face_vert_loc_indices)
-
-        if len_face_vert_loc_indices == 1:
-            faces.pop(f_idx)  # can't add single vert faces
-
-        # Face with a single item in face_vert_nor_indices is actually a polyline!
-        elif face_is_edge(face):
-            if use_edges:
-                edges.extend((face_vert_loc_indices[i], face_vert_loc_indices[i + 1])
-                             for i in range(len_face_vert_loc_indices - 1))
-            faces.pop(f_idx)
-
-        else:
-            # Smooth Group
-            if unique_smooth_groups and context_smooth_group:
-                # Is a part of of a smooth group and is a face
-                if context_smooth_group_old is not context_smooth_group:
-                    edge_dict = smooth_group_users[context_smooth_group]
-                    context_smooth_group_old = context_smooth_group
-
-                prev_vidx = face_vert_loc_indices[-1]
-                for vidx in face_vert_loc_indices:
+    tris_face = []  # Triangles of the tessellated ngons: their face, and the position of their corners in loc.
+    tris_corners = []
+
+    # NGons into triangles, in reverse order too.
+    for f_idx, len_face_vert_loc_indices, start in zip(
+            ngons.tolist(), face_sizes[ngons].tolist(), corners_start[ngons].tolist()):
+        face_vert_loc_indices = loc[start:start + len_face_vert_loc_indices].tolist()
+
+        from bpy_extras.mesh_utils import ngon_tessellate
+        ngon_face_indices = ngon_tessellate(verts_loc[face_vert_loc_indices].tolist(),
+                                            list(range(len_face_vert_loc_indices)),
+                                            debug_print=bpy.app.debug)
+        tris_face += [f_idx] * len(ngon_face_indices)
+        tris_corners += [start + ngidx for ngon in ngon_face_indices for ngidx in ngon[:3]]
+
+        # edges to make ngons
+        if len(ngon_face_indices) > 1:
+            edge_users = set()
+            for ngon in ngon_face_indices:
+                prev_vidx = face_vert_loc_indices[ngon[-1]]
+                for ngidx in ngon:
+                    vidx = face_vert_loc_indices[ngidx]
+                    if vidx == prev_vidx:
+                        continue  # broken OBJ... Just skip.
                     edge_key = (prev_vidx, vidx) if (prev_vidx < vidx) else (vidx, prev_vidx)
                     prev_vidx = vidx
-                    edge_dict[edge_key] = edge_dict.get(edge_key, 0) + 1
-
-            # NGons into triangles
-            if face_invalid_blenpoly:
-                # ignore triangles with invalid indices
-                if len(face_vert_loc_indices) > 3:
-                    from bpy_extras.mesh_utils import ngon_tessellate
-                    ngon_face_indices = ngon_tessellate(verts_loc, face_vert_loc_indices, debug_print=bpy.app.debug)
-                    faces.extend([([face_vert_loc_indices[ngon[0]],
-                                    face_vert_loc_indices[ngon[1]],
-                                    face_vert_loc_indices[ngon[2]],
-                                    ],
-                                [face_vert_nor_indices[ngon[0]],
-                                    face_vert_nor_indices[ngon[1]],
-                                    face_vert_nor_indices[ngon[2]],
-                                    ] if face_vert_nor_indices else [],
-                                [face_vert_tex_indices[ngon[0]],
-                                    face_vert_tex_indices[ngon[1]],
-                                    face_vert_tex_indices[ngon[2]],
-                                    ] if face_vert_tex_indices else [],
-                                [face_vert_tex2_indices[ngon[0]],
-                                    face_vert_tex2_indices[ngon[1]],
-                                    face_vert_tex2_indices[ngon[2]],
-                                    ] if face_vert_tex2_indices else [],
-                                [face_vert_tex3_indices[ngon[0]],
-                                    face_vert_tex3_indices[ngon[1]],
-                                    face_vert_tex3_indices[ngon[2]],
-                                    ] if face_vert_tex3_indices else [],
-                                [face_vert_tex4_indices[ngon[0]],
-                                    face_vert_tex4_indices[ngon[1]],
-                                    face_vert_tex4_indices[ngon[2]],
-                                    ] if face_vert_tex4_indices else [],
-                                context_material,
-                                context_smooth_group,
-                                context_object_key,
-                                [],
-                                )
-                                for ngon in ngon_face_indices]
-                                )
-                    tot_loops += 3 * len(ngon_face_indices)
-
-                    # edges to make ngons
-                    if len(ngon_face_indices) > 1:
-                        edge_users = set()
-                        for ngon in ngon_face_indices:
-                            prev_vidx = face_vert_loc_indices[ngon[-1]]
-                            for ngidx in ngon:
-                                vidx = face_vert_loc_indices[ngidx]
-                                if vidx == prev_vidx:
-                                    continue  # broken OBJ... Just skip.
-                                edge_key = (prev_vidx, vidx) if (prev_vidx < vidx) else (vidx, prev_vidx)
-                                prev_vidx = vidx
-                                if edge_key in edge_users:
-                                    fgon_edges.add(edge_key)
-                                else:
-                                    edge_users.add(edge_key)
-
-                faces.pop(f_idx)
-            else:
-                tot_loops += len_face_vert_loc_indices
+                    if edge_key in edge_users:
+                        fgon_edges.add(edge_key)
+                    else:
+                        edge_users.add(edge_key)
 
-    # Build sharp edges
-    if unique_smooth_groups:
-        for edge_dict in smooth_group_users.values():
-            for key, users in edge_dict.items():
-                if users == 1:  # This edge is on the boundary of a group
-                    sharp_edges.add(key)
+    # Polygons are the kept faces in their order, followed by the triangles of the tessellated ngons.
+    polys_face = np.concatenate((faces_kept, np.array(tris_face, dtype=np.int64)))
+    polys_size = np.concatenate((face_sizes[faces_kept], np.full(len(tris_face), 3, dtype=np.int64)))
+    loops_corner = np.concatenate((objx_parse.csr_indices(corners_start[faces_kept], face_sizes[faces_kept]),
+                                   np.array(tris_corners, dtype=np.int64)))
+    loops_vert_idx = loc[loops_corner].astype(np.int32)
+    loops_corner = corners[loops_corner]
 
     # map the material names to an index
     material_mapping = {name: i for i, name in enumerate(unique_materials)}  # enumerate over unique_materials keys()
@@ -710,22 +601,14 @@ def create_mesh(new_objects,
         me.materials.append(material)
 
     me.vertices.add(len(verts_loc))
-    me.loops.add(tot_loops)
-    me.polygons.add(len(faces))
-
-    # verts_loc is a list of (x, y, z) tuples
-    me.vertices.foreach_set("co", unpack_list(verts_loc))
-
-    loops_vert_idx = tuple(vidx for (face_vert_loc_indices, _, _, _, _, _, _, _, _, _) in faces for vidx in face_vert_loc_indices)
-    faces_loop_start = []
-    lidx = 0
-    for f in faces:
-        face_vert_loc_indices = f[0]
-        nbr_vidx = len(face_vert_loc_indices)
-        faces_loop_start.append(lidx)
-        lidx += nbr_vidx
+    me.loops.add(len(loops_vert_idx))
+    me.polygons.add(len(polys_face))
+
+    me.vertices.foreach_set("co", verts_loc.ravel())
+
+    faces_loop_start = (np.cumsum(polys_size) - polys_size).astype(np.int32)
 # removed between 3.5.1 and 3.6.0
-    faces_loop_total = tuple(len(face_vert_loc_indices) for (face_vert_loc_indices, _, _, _, _, _, _, _, _, _) in faces)
+    faces_loop_total = polys_size.astype(np.int32)
 # https://github.com/blender/blender-addons/commit/bb76a94d06ae5f4a5a8313a7b6bf5660dcb8e569
 
     me.loops.foreach_set("vertex_index", loops_vert_idx)
@@ -734,76 +617,40 @@ def create_mesh(new_objects,
     me.polygons.foreach_set("loop_total", faces_loop_total)
 # https://github.com/blender/blender-addons/commit/bb76a94d06ae5f4a5a8313a7b6bf5660dcb8e569
 
-    faces_ma_index = tuple(material_mapping[context_material] for (_, _, _, _, _, _, context_material, _, _, _) in faces)
+    material_index = np.array([material_mapping.get(key, 0) for key in data.material_keys], dtype=np.int32)
+    faces_ma_index = material_index[face_material[polys_face]]
     me.polygons.foreach_set("material_index", faces_ma_index)
 
-    faces_use_smooth = tuple(bool(context_smooth_group) for (_, _, _, _, _, _, _, context_smooth_group, _, _) in faces)
+    faces_use_smooth = use_smooth[face_smooth_group[polys_face]]
     me.polygons.foreach_set("use_smooth", faces_use_smooth)
 
-    if verts_nor and me.loops:
+    if len(verts_nor) and me.loops:
         # Note: we store 'temp' normals in loops, since validate() may alter final mesh,
         #       we can only set custom lnors *after* calling it.
         if bpy.app.version < (4, 1, 0):
             me.create_normals_split()
-        loops_nor = tuple(no for (_, face_vert_nor_indices, _, _, _, _, _, _, _, _) in faces
-                          for face_noidx in face_vert_nor_indices
-                          for no in verts_nor[face_noidx])
+        loops_nor = verts_nor[np.frombuffer(data.face_nor, dtype=np.int32)[loops_corner]].ravel()
         if bpy.app.version < (4, 1, 0):
             me.loops.foreach_set("normal", loops_nor)
         else:
             me.attributes.new("temp_custom_normals", 'FLOAT_VECTOR', 'CORNER')
             me.attributes["temp_custom_normals"].data.foreach_set("vector", loops_nor)
 
-    if verts_tex and me.polygons:
-        # Some files Do not explicitly write the 'v' value when it's 0.0, see T68249...
-        verts_tex = [uv if len(uv) == 2 else uv + [0.0] for uv in verts_tex]
-        me.uv_layers.new(do_init=False)
-        loops_uv = tuple(uv for (_, _, face_vert_tex_indices, _, _, _, _, _, _, _) in faces
-                            for face_uvidx in face_vert_tex_indices
-                            for uv in verts_tex[face_uvidx])
-        me.uv_layers[0].data.foreach_set("uv", loops_uv)
-
-    if verts_tex2 and me.polygons:
-        # Some files Do not explicitely write the 'v' value when it's 0.0, see T68249...
-        verts_tex2 = [uv if len(uv) == 2 else uv + [0.0] for uv in verts_tex2]
-        me.uv_layers.new(do_init=False)
-        loops_uv = tuple(uv for (_, _, _, face_vert_tex2_indices, _, _, _, _, _, _) in faces
-                         for face_uvidx in face_vert_tex2_indices
-                         for uv in verts_tex2[face_uvidx])
-        me.uv_layers[1].data.foreach_set("uv", loops_uv)
-
-    if verts_tex3 and me.polygons:
-        # Some files Do not explicitely write the 'v' value when it's 0.0, see T68249...
-        verts_tex3 = [uv if len(uv) == 2 else uv + [0.0] for uv in verts_tex3]
-        me.uv_layers.new(do_init=False)
-        loops_uv = tuple(uv for (_, _, _, _, face_vert_tex3_indices, _, _, _, _, _) in faces
-                         for face_uvidx in face_vert_tex3_indices
-                         for uv in verts_tex3[face_uvidx])
-        me.uv_layers[2].data.foreach_set("uv", loops_uv)
-
-    if verts_tex4 and me.polygons:
-        # Some files Do not explicitely write the 'v' value when it's 0.0, see T68249...
-        verts_tex4 = [uv if len(uv) == 2 else uv + [0.0] for uv in verts_tex4]
-        me.uv_layers.new(do_init=False)
-        loops_uv = tuple(uv for (_, _, _, _, _, face_vert_tex4_indices, _, _, _, _) in faces
-                         for face_uvidx in face_vert_tex4_indices
-                         for uv in verts_tex4[face_uvidx])
-        me.uv_layers[3].data.foreach_set("uv", loops_uv)
-
-    use_edges = use_edges and bool(edges)
+    for layer, (verts_uv, face_uv) in enumerate(((verts_tex, data.face_tex), (verts_tex2, data.face_tex2),
+                                                 (verts_tex3, data.face_tex3), (verts_tex4, data.face_tex4))):
+        if len(verts_uv) and me.polygons:
+            me.uv_layers.new(do_init=False)
+            loops_uv = verts_uv[np.frombuffer(face_uv, dtype=np.int32)[loops_corner]].ravel()
+            me.uv_layers[layer].data.foreach_set("uv", loops_uv)
+
+    use_edges = use_edges and bool(len(edges))
     if use_edges:
         me.edges.add(len(edges))
-        # edges should be a list of (a, b) tuples
-        me.edges.foreach_set("vertices", unpack_list(edges))
+        me.edges.foreach_set("vertices", edges.ravel())
 
-    if verts_col and me.polygons:
+    if len(verts_col) and me.polygons:
         vcol_lay = me.vertex_colors.new()
-
-        for i, col in enumerate(vcol_lay.data):
-            col.color[0] = verts_col[loops_vert_idx[i]][0]
-            col.color[1] = verts_col[loops_vert_idx[i]][1]
-            col.color[2] = verts_col[loops_vert_idx[i]][2]
-            col.color[3] = verts_col[loops_vert_idx[i]][3]      # alpha
+        vcol_lay.data.foreach_set("color", verts_col[loops_vert_idx].ravel())
 
     me.validate(clean_customdata=False)  # *Very* important to not remove lnors here!
     me.update(calc_edges=use_edges, calc_edges_loose=use_edges)
@@ -832,7 +679,7 @@ def create_mesh(new_objects,
             if e.key in sharp_edges:
                 e.use_edge_sharp = True
 
-    if verts_nor:
+    if len(verts_nor):
         clnors = array.array('f', [0.0] * (len(me.loops) * 3))
         if bpy.app.version < (4, 1, 0):
             me.loops.foreach_get("normal", clnors)
@@ -859,7 +706,37 @@ def create_mesh(new_objects,
         group.add(group_indices, 1.0, 'REPLACE')
 
 
-def create_nurbs(context_nurbs, vert_loc, new_objects):
+def create_point_cloud(new_objects, data, filepath):
+    """
+    Creates a mesh of loose vertices from data (an objx_parse.OBJxData of a point cloud, see is_point_cloud()),
+    their colors going to a point domain color attribute. Everything is copied from the parsed buffers in bulk,
+    scans having tens of millions of vertices.
+    """
+    verts_loc = np.frombuffer(data.verts_loc, dtype=np.float32)
+    verts_col = np.frombuffer(data.verts_col, dtype=np.float32)
+
+    me = bpy.data.meshes.new(os.path.splitext((os.path.basename(filepath)))[0])
+    me.vertices.add(len(verts_loc) // 3)
+    me.vertices.foreach_set("co", verts_loc)
+
+    # Vertex colors are only used when all the vertices have one.
+    if len(verts_col) and len(verts_col) // 4 == len(verts_loc) // 3:
+        if bpy.app.version < (4, 1, 0):
+            # Legacy vertex_colors only hold face corner colors, which loose vertices have none of,
+            # use a generic point attribute, its values being stored as they are.
+            color_attr = me.attributes.new("Col", 'FLOAT_COLOR', 'POINT')
+            color_attr.data.foreach_set("color", verts_col)
+        else:
+            color_attr = me.color_attributes.new("Col", 'BYTE_COLOR', 'POINT')
+            color_attr.data.foreach_set("color_srgb", verts_col)
+            me.color_attributes.active_color = color_attr
+            me.color_attributes.render_color_index = me.color_attributes.active_color_index
+
+    me.update()
+    new_objects.append(bpy.data.objects.new(me.name, me))
+
+
+def create_nurbs(context_nurbs, vert_loc, new_objects, warnings):
     """
     Add nurbs object to blender, only support one type at the moment
     """
@@ -872,16 +749,16 @@ def create_nurbs(context_nurbs, vert_loc, new_objects):
     cstype = context_nurbs.get(b'cstype')
 
     if cstype is None:
-        print('\tWarning, cstype not found')
+        warnings.warn("nurbs cstype not found", name.decode('utf-8', "replace"))
         return
     if cstype != b'bspline':
-        print('\tWarning, cstype is not supported (only bspline)')
+        warnings.warn("nurbs cstype is not supported (only bspline)", name.decode('utf-8', "replace"))
         return
     if not curv_idx:
-        print('\tWarning, curv argument empty or not set')
+        warnings.warn("nurbs curv argument empty or not set", name.decode('utf-8', "replace"))
         return
     if len(deg) > 1 or parm_v:
-        print('\tWarning, surfaces not supported')
+        warnings.warn("nurbs surfaces not supported", name.decode('utf-8', "replace"))
         return
 
     cu = bpy.data.curves.new(name.decode('utf-8', "replace"), 'CURVE')
@@ -889,7 +766,9 @@ def create_nurbs(context_nurbs, vert_loc, new_objects):
 
     nu = cu.splines.new('NURBS')
     nu.points.add(len(curv_idx) - 1)  # a point is added to start with
-    nu.points.foreach_set("co", [co_axis for vt_idx in curv_idx for co_axis in (vert_loc[vt_idx] + [1.0])])
+    points_co = np.ones((len(curv_idx), 4), dtype=np.float32)
+    points_co[:, :3] = vert_loc[curv_idx]
+    nu.points.foreach_set("co", points_co.ravel())
 
     nu.order_u = deg[0] + 1
 
@@ -932,35 +811,63 @@ def create_nurbs(context_nurbs, vert_loc, new_objects):
     new_objects.append(ob)
 
 
-def strip_slash(line_split):
-    if line_split[-1][-1] == 92:  # '\' char
-        if len(line_split[-1]) == 1:
-            line_split.pop()  # remove the \ item
-        else:
-            line_split[-1] = line_split[-1][:-1]  # remove the \ from the end last number
-        return True
-    return False
-
-
-def get_float_func(filepath):
+def create_objects(new_objects, data, unique_materials, unique_smooth_groups, filepath,
+                   use_edges, SPLIT_OB_OR_GROUP, warnings, name_filter=None):
     """
-    find the float function for this obj file
-    - whether to replace commas or not
+    Creates the meshes and nurbs of data (an objx_parse.OBJxData), adding their objects to new_objects.
+    Only the objects whose name name_filter (see objx_parse.name_filter()) tells to keep are created when given.
+    Yields the amount of faces of each mesh once it is created, so that the caller can pause in between.
     """
-    file = open(filepath, 'rb')
-    for line in file:  # .readlines():
-        line = line.lstrip()
-        if line.startswith(b'v'):  # vn vt v
-            if b',' in line:
-                file.close()
-                return lambda f: float(f.replace(b',', b'.'))
-            elif b'.' in line:
-                file.close()
-                return float
-
-    file.close()
-    # in case all vert values were ints
-    return float
+    verts_loc = np.frombuffer(data.verts_loc, dtype=np.float32).reshape(-1, 3)
+    verts_nor = np.frombuffer(data.verts_nor, dtype=np.float32).reshape(-1, 3)
+    verts_tex = np.frombuffer(data.verts_tex, dtype=np.float32).reshape(-1, 2)
+    verts_tex2 = np.frombuffer(data.verts_tex2, dtype=np.float32).reshape(-1, 2)
+    verts_tex3 = np.frombuffer(data.verts_tex3, dtype=np.float32).reshape(-1, 2)
+    verts_tex4 = np.frombuffer(data.verts_tex4, dtype=np.float32).reshape(-1, 2)
+    verts_col = np.frombuffer(data.verts_col, dtype=np.float32).reshape(-1, 4)
+
+    # Vertex colors are only used when all the vertices have one.
+    if len(verts_col) != len(verts_loc):
+        verts_col = verts_col[:0]
+
+    for (verts_idx, faces_split, loc_split, unique_materials_split, dataname,
+         use_vnor, use_vtex, use_vtex2, use_vtex3, use_vtex4) in split_mesh(data, unique_materials, filepath,
+                                                                             SPLIT_OB_OR_GROUP):
+        if name_filter is not None and not name_filter(dataname):
+            continue
+        if verts_idx is None:
+            verts_loc_split = verts_loc
+            verts_col_split = verts_col
+        else:
+            verts_loc_split = verts_loc[verts_idx]
+            verts_col_split = verts_col[verts_idx] if len(verts_col) else verts_col
+
+        # Create meshes from the data, warning 'vertex_groups' wont support splitting
+        #~ print(dataname, use_vnor, use_vtex, use_vtex2, use_vtex3, use_vtex4)
+        create_mesh(new_objects,
+                    use_edges,
+                    verts_loc_split,
+                    verts_nor if use_vnor else [],
+                    verts_tex if use_vtex else [],
+                    verts_tex2 if use_vtex2 else [],
+                    verts_tex3 if use_vtex3 else [],
+                    verts_tex4 if use_vtex4 else [],
+                    verts_col_split,
+                    data,
+                    faces_split,
+                    loc_split,
+                    unique_materials_split,
+                    unique_smooth_groups,
+                    data.vertex_groups,
+                    dataname,
+                    )
+        yield len(faces_split)
+
+    # nurbs support
+    filename = os.path.splitext((os.path.basename(filepath)))[0]
+    for context_nurbs in data.nurbs:
+        if name_filter is None or name_filter(objx_parse.key_to_name(context_nurbs.get(b'name'), filename)):
+            create_nurbs(context_nurbs, verts_loc, new_objects, warnings)
 
 
 def any_number_as_int(svalue):
@@ -969,469 +876,322 @@ def any_number_as_int(svalue):
     return int(float(svalue))
 
 
-def load(context,
-         filepath,
-         *,
-         global_clamp_size=0.0,
-         use_smooth_groups=True,
-         use_edges=True,
-         use_split_objects=True,
-         use_split_groups=False,
-         use_image_search=True,
-         use_groups_as_vgroups=False,
-         relpath=None,
-         global_matrix=None,
-         rotate_transform_apply=True
-         ):
+# Time a background step is waited for between two yields of iter_load(), see ImportStatus.call().
+POLL_INTERVAL = 0.02
+
+
+class ImportStatus:
+    """
+    Progress of iter_load(): its current step, and the amount done in it out of total, in unit,
+    which is 'BYTES' of the file while parsing it (total being 0 when unknown) and 'FACES' while building the objects.
+    With background, the parsing steps run in a thread, see call().
+    """
+
+    def __init__(self, background=False):
+        self.background = background
+        self.text = ""
+        self.unit = 'BYTES'
+        self.done = 0
+        self.total = 0
+        self.cancelled = threading.Event()
+
+    def start(self, text, unit, total):
+        self.text = text
+        self.unit = unit
+        self.done = 0
+        self.total = total
+
+    def on_progress(self, done):
+        # Called by the parsing thread, which is stopped that way as soon as the import is cancelled.
+        if self.cancelled.is_set():
+            raise InterruptedError("OBJx import cancelled")
+        self.done = done
+
+    def call(self, func, *args, **kwargs):
+        """
+        Generator returning func(*args, **kwargs). With background, func runs in a thread and this yields
+        the status until it returns; closing the generator cancels func, see on_progress().
+        """
+        if not self.background:
+            return func(*args, **kwargs)
+        result = []
+
+        def run():
+            try:
+                result.append((func(*args, **kwargs), None))
+            except BaseException as ex:
+                result.append((None, ex))
+
+        thread = threading.Thread(target=run, name="objx_import", daemon=True)
+        thread.start()
+        try:
+            while thread.is_alive():
+                thread.join(POLL_INTERVAL)
+                yield self
+        except GeneratorExit:
+            self.cancelled.set()
+            raise
+        value, exception = result[0]
+        if exception is not None:
+            raise exception
+        return value
+
+
+def load(context, filepath, **kwargs):
     """
     Called by the user interface or another script.
     load_obj(path) - should give acceptable results.
+    Imports the file at filepath in one go, kwargs being the ones of iter_load().
+    """
+    steps = iter_load(context, filepath, **kwargs)
+    while True:
+        try:
+            next(steps)
+        except StopIteration as stop:
+            return stop.value
+
+
+def iter_load(context,
+              filepath,
+              *,
+              global_clamp_size=0.0,
+              use_smooth_groups=True,
+              use_edges=True,
+              use_split_objects=True,
+              use_split_groups=False,
+              use_image_search=True,
+              use_groups_as_vgroups=False,
+              relpath=None,
+              global_matrix=None,
+              rotate_transform_apply=True,
+              parse_processes=1,
+              use_streaming=False,
+              pipeline_depth=0,
+              use_memory_check=True,
+              voxel_size=0.0,
+              vertex_budget=0,
+              object_filter="",
+              region=None,
+              warnings=None,
+              source=None,
+              archive=None,
+              background=False,
+              ):
+    """
+    Generator importing the file at filepath step by step, yielding its ImportStatus in between,
+    and returning {'FINISHED'} once done ({'CANCELLED'} when a zip bundle has no OBJx file).
     This function passes the file and sends the data off
         to be split into objects and then converted into mesh objects
+    With background, the file is parsed in a thread while this yields, see ImportStatus.call(),
+    the objects being built between the yields. Closing the generator cancels the import,
+    removing the datablocks it already created is left to the caller. The parsing stops right away,
+    but building a mesh cannot be interrupted, the import only stops once the mesh being built is done.
+    With use_streaming, files split by objects (or groups) are parsed and built one object at a time,
+    see objx_stream.
+    With pipeline_depth, the objects are streamed that way, but parsed in parse_processes worker processes
+    while the previous ones are built, at most pipeline_depth of them waiting to be built at a time.
+    With use_memory_check, the memory the import of files of at least objx_memory.CHECK_MIN_SIZE bytes needs
+    is estimated from a sample of the file beforehand, see objx_memory. When it does not fit in the available memory,
+    files split by objects (or groups) are streamed, and the others (or the ones that cannot be streamed)
+    are not imported.
+    With voxel_size or vertex_budget, the vertices are downsampled while the file is parsed, to one per voxel
+    of voxel_size (in file space), growing the voxels so that there are at most about vertex_budget of them,
+    see objx_voxel. Faces are dropped, the file being imported as a point cloud.
+    object_filter is comma separated names or patterns (such as "Wall*") of the objects (or groups) to import
+    when splitting, all of them when empty. Only those objects are parsed, using the index kept next to the file.
+    region is an axis-aligned box in file space, as its (min corner, max corner), to only import the faces
+    with a corner inside it.
+    The warnings of the import are collected in warnings (an objx_warnings.OBJxWarnings) when given,
+    and their summary printed at the end.
+    source is the content of the file to parse instead of the file at filepath, see load_from_buffer();
+    filepath then only names the objects and locates the MTL libraries and images,
+    read from the zip bundle archive (an objx_archive.OBJxArchive) when given.
+    The MTL libraries and their images are read in background threads as soon as they are known,
+    while the geometry is parsed, see objx_prefetch.
+    Compressed files (.gz, .xz) and the OBJx files of zip bundles are decompressed while they are parsed,
+    see objx_archive.
     """
-    def unique_name(existing_names, name_orig):
-        i = 0
-        if name_orig is None:
-            name_orig = b"ObjObject"
-        name = name_orig
-        while name in existing_names:
-            name = b"%s.%03d" % (name_orig, i)
-            i += 1
-        existing_names.add(name)
-        return name
-
-    def handle_vec(line_start, context_multi_line, line_split, tag, data, vec, vec_len):
-        ret_context_multi_line = tag if strip_slash(line_split) else b''
-        if line_start == tag:
-            vec[:] = [float_func(v) for v in line_split[1:]]
-        elif context_multi_line == tag:
-            vec += [float_func(v) for v in line_split]
-        if not ret_context_multi_line:
-            data.append(tuple(vec[:vec_len]))
-        return ret_context_multi_line
-
-    def create_face(context_material, context_smooth_group, context_object_key):
-        face_vert_loc_indices = []
-        face_vert_nor_indices = []
-        face_vert_tex_indices = []
-        face_vert_tex2_indices = []
-        face_vert_tex3_indices = []
-        face_vert_tex4_indices = []
-        return (
-            face_vert_loc_indices,
-            face_vert_nor_indices,
-            face_vert_tex_indices,
-            face_vert_tex2_indices,
-            face_vert_tex3_indices,
-            face_vert_tex4_indices,
-            context_material,
-            context_smooth_group,
-            context_object_key,
-            [],  # If non-empty, that face is a Blender-invalid ngon (holes...), need a mutable object for that...
-        )
-
-    with ProgressReport(context.window_manager) as progress:
+    if source is None and objx_archive.is_packed(filepath):
+        ret = {'CANCELLED'}
+        for path, file, archive in objx_archive.iter_files(filepath):
+            file_ret = yield from iter_load(context, path, source=file, archive=archive,
+                                            global_clamp_size=global_clamp_size,
+                                            use_smooth_groups=use_smooth_groups,
+                                            use_edges=use_edges,
+                                            use_split_objects=use_split_objects,
+                                            use_split_groups=use_split_groups,
+                                            use_image_search=use_image_search,
+                                            use_groups_as_vgroups=use_groups_as_vgroups,
+                                            relpath=relpath,
+                                            global_matrix=global_matrix,
+                                            rotate_transform_apply=rotate_transform_apply,
+                                            object_filter=object_filter,
+                                            region=region,
+                                            warnings=warnings,
+                                            background=background,
+                                            use_memory_check=use_memory_check,
+                                            voxel_size=voxel_size,
+                                            vertex_budget=vertex_budget)
+            if file_ret == {'FINISHED'}:
+                ret = {'FINISHED'}
+        if ret != {'FINISHED'}:
+            print("\tNo OBJx file in %r" % filepath)
+        return ret
+
+    with ProgressReport(context.window_manager) as progress, \
+            objx_prefetch.MaterialPrefetch(filepath, archive) as prefetch:
         progress.enter_substeps(1, "Importing OBJx %r..." % filepath)
 
         if global_matrix is None:
             global_matrix = mathutils.Matrix()
 
+        if warnings is None:
+            warnings = objx_warnings.OBJxWarnings()
+        status = ImportStatus(background)
+
         if use_split_objects or use_split_groups:
             use_groups_as_vgroups = False
 
-        verts_loc = []
-        verts_nor = []
-        verts_tex = []
-        verts_tex2 = []
-        verts_tex3 = []
-        verts_tex4 = []
-        verts_col = []
-        faces = []  # tuples of the faces
-        material_libs = set()  # filenames to material libs this OBJ uses
-        vertex_groups = {}  # when use_groups_as_vgroups is true
-
-        # Get the string to float conversion func for this file- is 'float' for almost all files.
-        float_func = get_float_func(filepath)
-
-        # Context variables
-        context_material = None
-        context_smooth_group = None
-        context_object_key = None
-        context_object_obpart = None
-        context_vgroup = None
-
-        objects_names = set()
-
-        # Nurbs
-        context_nurbs = {}
-        nurbs = []
-        context_parm = b''  # used by nurbs too but could be used elsewhere
-
-        # Until we can use sets
-        use_default_material = False
-        unique_materials = {}
-        unique_smooth_groups = {}
-        # unique_obects= {} - no use for this variable since the objects are stored in the face.
-
-        # when there are faces that end with \
-        # it means they are multiline-
-        # since we use xreadline we can't skip to the next line
-        # so we need to know whether
-        context_multi_line = b''
-
-        # Per-face handling data.
-        face_vert_loc_indices = None
-        face_vert_nor_indices = None
-        face_vert_tex_indices = None
-        face_vert_tex2_indices = None
-        face_vert_tex3_indices = None
-        face_vert_tex4_indices = None
-        verts_loc_len = verts_nor_len = verts_tex_len = verts_tex2_len = verts_tex3_len = verts_tex4_len = 0
-        face_items_usage = set()
-        face_invalid_blenpoly = None
-        prev_vidx = None
-        face = None
-        vec = []
-
-        quick_vert_failures = 0
-        skip_quick_vert = False
-
         progress.enter_substeps(3, "Parsing OBJx file...")
-        with open(filepath, 'rb') as f:
-            for line in f:
-                line_split = line.split()
-
-                if not line_split:
-                    continue
-
-                line_start = line_split[0]  # we compare with this a _lot_
-
-                if len(line_split) == 1 and not context_multi_line and line_start != b'end':
-                    print("WARNING, skipping malformatted line: %s" % line.decode('UTF-8', 'replace').rstrip())
-                    continue
-
-                # Handling vertex data are pretty similar, factorize that.
-                # Also, most OBJ files store all those on a single line, so try fast parsing for that first,
-                # and only fallback to full multi-line parsing when needed, this gives significant speed-up
-                # (~40% on affected code).
-                if line_start == b'v':
-                    vdata, vdata_len, do_quick_vert = verts_loc, 3, not skip_quick_vert
-                elif line_start == b'vn':
-                    vdata, vdata_len, do_quick_vert = verts_nor, 3, not skip_quick_vert
-                elif line_start == b'vt':
-                    vdata, vdata_len, do_quick_vert = verts_tex, 2, not skip_quick_vert
-                elif line_start == b'vt2':
-                    vdata, vdata_len, do_quick_vert = verts_tex2, 2, not skip_quick_vert
-                elif line_start == b'vt3':
-                    vdata, vdata_len, do_quick_vert = verts_tex3, 2, not skip_quick_vert
-                elif line_start == b'vt4':
-                    vdata, vdata_len, do_quick_vert = verts_tex4, 2, not skip_quick_vert
-                elif context_multi_line == b'v':
-                    vdata, vdata_len, do_quick_vert = verts_loc, 3, False
-                elif context_multi_line == b'vn':
-                    vdata, vdata_len, do_quick_vert = verts_nor, 3, False
-                elif context_multi_line == b'vt':
-                    vdata, vdata_len, do_quick_vert = verts_tex, 2, False
-                elif context_multi_line == b'vt2':
-                    vdata, vdata_len, do_quick_vert = verts_tex2, 2, False
-                elif context_multi_line == b'vt3':
-                    vdata, vdata_len, do_quick_vert = verts_tex3, 2, False
-                elif context_multi_line == b'vt4':
-                    vdata, vdata_len, do_quick_vert = verts_tex4, 2, False
-                else:
-                    vdata_len = 0
-
-                if vdata_len:
-                    if do_quick_vert:
-                        try:
-                            vdata.append(list(map(float_func, line_split[1:vdata_len + 1])))
-                            if len(line_split) == 7:
-                                rgb = list(map(float_func, line_split[vdata_len + 1:vdata_len+4]))
-                                rgb.append(1.0)             # add alpha=1.0
-                                verts_col.append(rgb)
-                            elif len(line_split) == 8:      # with alpha
-                                verts_col.append(list(map(float_func, line_split[vdata_len + 1:vdata_len+5])))
-                        except:
-                            do_quick_vert = False
-                            # In case we get too many failures on quick parsing, force fallback to full multi-line one.
-                            # Exception handling can become costly...
-                            quick_vert_failures += 1
-                            if quick_vert_failures > 10000:
-                                skip_quick_vert = True
-                    if not do_quick_vert:
-                        context_multi_line = handle_vec(line_start, context_multi_line, line_split,
-                                                        context_multi_line or line_start,
-                                                        vdata, vec, vdata_len)
-
-                elif line_start == b'f' or context_multi_line == b'f':
-                    if not context_multi_line:
-                        line_split = line_split[1:]
-                        # Instantiate a face
-                        face = create_face(context_material, context_smooth_group, context_object_key)
-                        (face_vert_loc_indices, face_vert_nor_indices, face_vert_tex_indices, face_vert_tex2_indices, face_vert_tex3_indices, face_vert_tex4_indices,
-                         _1, _2, _3, face_invalid_blenpoly) = face
-                        faces.append(face)
-                        face_items_usage.clear()
-                        verts_loc_len = len(verts_loc)
-                        verts_nor_len = len(verts_nor)
-                        verts_tex_len = len(verts_tex)
-                        verts_tex2_len = len(verts_tex2)
-                        verts_tex3_len = len(verts_tex3)
-                        verts_tex4_len = len(verts_tex4)
-                        if context_material is None:
-                            use_default_material = True
-                    # Else, use face_vert_loc_indices and face_vert_tex_indices previously defined and used the obj_face
-
-                    context_multi_line = b'f' if strip_slash(line_split) else b''
-
-                    for v in line_split:
-                        obj_vert = v.split(b'/')
-                        idx = int(obj_vert[0])  # Note that we assume here we cannot get OBJ invalid 0 index...
-                        vert_loc_index = (idx + verts_loc_len) if (idx < 1) else idx - 1
-                        # Add the vertex to the current group
-                        # *warning*, this wont work for files that have groups defined around verts
-                        if use_groups_as_vgroups and context_vgroup:
-                            vertex_groups[context_vgroup].append(vert_loc_index)
-                        # This a first round to quick-detect ngons that *may* use a same edge more than once.
-                        # Potential candidate will be re-checked once we have done parsing the whole face.
-                        if not face_invalid_blenpoly:
-                            # If we use more than once a same vertex, invalid ngon is suspected.
-                            if vert_loc_index in face_items_usage:
-                                face_invalid_blenpoly.append(True)
-                            else:
-                                face_items_usage.add(vert_loc_index)
-                        face_vert_loc_indices.append(vert_loc_index)
-
-                        # formatting for faces with normals and textures is
-                        # loc_index/tex_index/nor_index
-                        if len(obj_vert) > 1 and obj_vert[1] and obj_vert[1] != b'0':
-                            idx = int(obj_vert[1])
-                            face_vert_tex_indices.append((idx + verts_tex_len) if (idx < 1) else idx - 1)
-                        else:
-                            face_vert_tex_indices.append(0)
-
-                        if len(obj_vert) > 1 and obj_vert[1] and obj_vert[1] != b'0':
-                            idx = int(obj_vert[1])
-                            face_vert_tex2_indices.append((idx + verts_tex2_len) if (idx < 1) else idx - 1)
-                        else:
-                            face_vert_tex2_indices.append(0)
-
-                        if len(obj_vert) > 1 and obj_vert[1] and obj_vert[1] != b'0':
-                            idx = int(obj_vert[1])
-                            face_vert_tex3_indices.append((idx + verts_tex3_len) if (idx < 1) else idx - 1)
-                        else:
-                            face_vert_tex3_indices.append(0)
-
-                        if len(obj_vert) > 1 and obj_vert[1] and obj_vert[1] != b'0':
-                            idx = int(obj_vert[1])
-                            face_vert_tex4_indices.append((idx + verts_tex4_len) if (idx < 1) else idx - 1)
-                        else:
-                            face_vert_tex4_indices.append(0)
-
-                        if len(obj_vert) > 2 and obj_vert[2] and obj_vert[2] != b'0':
-                            idx = int(obj_vert[2])
-                            face_vert_nor_indices.append((idx + verts_nor_len) if (idx < 1) else idx - 1)
-                        else:
-                            face_vert_nor_indices.append(0)
-
-                    if not context_multi_line:
-                        # Means we have finished a face, we have to do final check if ngon is suspected to be blender-invalid...
-                        if face_invalid_blenpoly:
-                            face_invalid_blenpoly.clear()
-                            face_items_usage.clear()
-                            prev_vidx = face_vert_loc_indices[-1]
-                            for vidx in face_vert_loc_indices:
-                                edge_key = (prev_vidx, vidx) if (prev_vidx < vidx) else (vidx, prev_vidx)
-                                if edge_key in face_items_usage:
-                                    face_invalid_blenpoly.append(True)
-                                    break
-                                face_items_usage.add(edge_key)
-                                prev_vidx = vidx
-
-                elif use_edges and (line_start == b'l' or context_multi_line == b'l'):
-                    # very similar to the face load function above with some parts removed
-                    if not context_multi_line:
-                        line_split = line_split[1:]
-                        # Instantiate a face
-                        face = create_face(context_material, context_smooth_group, context_object_key)
-                        face_vert_loc_indices = face[0]
-                        # XXX A bit hackish, we use special 'value' of face_vert_nor_indices (a single True item) to tag this
-                        #     as a polyline, and not a regular face...
-                        face[1][:] = [True]
-                        faces.append(face)
-                        if context_material is None:
-                            use_default_material = True
-                    # Else, use face_vert_loc_indices previously defined and used the obj_face
-
-                    context_multi_line = b'l' if strip_slash(line_split) else b''
-
-                    for v in line_split:
-                        obj_vert = v.split(b'/')
-                        idx = int(obj_vert[0]) - 1
-                        face_vert_loc_indices.append((idx + len(verts_loc) + 1) if (idx < 0) else idx)
-
-                elif line_start == b's':
-                    if use_smooth_groups:
-                        context_smooth_group = line_value(line_split)
-                        if context_smooth_group == b'off':
-                            context_smooth_group = None
-                        elif context_smooth_group:  # is not None
-                            unique_smooth_groups[context_smooth_group] = None
-
-                elif line_start == b'o':
-                    if use_split_objects:
-                        context_object_key = unique_name(objects_names, line_value(line_split))
-                        context_object_obpart = context_object_key
-                        # unique_objects[context_object_key]= None
-
-                elif line_start == b'g':
-                    if use_split_groups:
-                        grppart = line_value(line_split)
-                        context_object_key = (context_object_obpart, grppart) if context_object_obpart else grppart
-                        # print 'context_object_key', context_object_key
-                        # unique_objects[context_object_key]= None
-                    elif use_groups_as_vgroups:
-                        context_vgroup = line_value(line.split())
-                        if context_vgroup and context_vgroup != b'(null)':
-                            vertex_groups.setdefault(context_vgroup, [])
-                        else:
-                            context_vgroup = None  # dont assign a vgroup
-
-                elif line_start == b'usemtl':
-                    context_material = line_value(line.split())
-                    unique_materials[context_material] = None
-                elif line_start == b'mtllib':  # usemap or usemat
-                    # can have multiple mtllib filenames per line, mtllib can appear more than once,
-                    # so make sure only occurrence of material exists
-                    material_libs |= {os.fsdecode(f) for f in filenames_group_by_ext(line.lstrip()[7:].strip(), b'.mtl')
-                    }
-
-                    # Nurbs support
-                elif line_start == b'cstype':
-                    context_nurbs[b'cstype'] = line_value(line.split())  # 'rat bspline' / 'bspline'
-                elif line_start == b'curv' or context_multi_line == b'curv':
-                    curv_idx = context_nurbs[b'curv_idx'] = context_nurbs.get(b'curv_idx', [])  # in case were multiline
-
-                    if not context_multi_line:
-                        context_nurbs[b'curv_range'] = float_func(line_split[1]), float_func(line_split[2])
-                        line_split[0:3] = []  # remove first 3 items
-
-                    if strip_slash(line_split):
-                        context_multi_line = b'curv'
-                    else:
-                        context_multi_line = b''
-
-                    for i in line_split:
-                        vert_loc_index = int(i) - 1
-
-                        if vert_loc_index < 0:
-                            vert_loc_index = len(verts_loc) + vert_loc_index + 1
-
-                        curv_idx.append(vert_loc_index)
-
-                elif line_start == b'parm' or context_multi_line == b'parm':
-                    if context_multi_line:
-                        context_multi_line = b''
-                    else:
-                        context_parm = line_split[1]
-                        line_split[0:2] = []  # remove first 2
-
-                    if strip_slash(line_split):
-                        context_multi_line = b'parm'
-                    else:
-                        context_multi_line = b''
-
-                    if context_parm.lower() == b'u':
-                        context_nurbs.setdefault(b'parm_u', []).extend([float_func(f) for f in line_split])
-                    elif context_parm.lower() == b'v':  # surfaces not supported yet
-                        context_nurbs.setdefault(b'parm_v', []).extend([float_func(f) for f in line_split])
-                    # else: # may want to support other parm's ?
-
-                elif line_start == b'deg':
-                    context_nurbs[b'deg'] = [int(i) for i in line.split()[1:]]
-                elif line_start == b'end':
-                    # Add the nurbs curve
-                    if context_object_key:
-                        context_nurbs[b'name'] = context_object_key
-                    nurbs.append(context_nurbs)
-                    context_nurbs = {}
-                    context_parm = b''
-
-                ''' # How to use usemap? deprecated?
-                elif line_start == b'usema': # usemap or usemat
-                    context_image= line_value(line_split)
-                '''
+        status.start("Parsing", 'BYTES', os.path.getsize(filepath) if source is None else 0)
+        if source is None:
+            source = filepath
+            i3d_dialect = objx_tokenizer.is_i3d_dialect(filepath)
+        else:
+            # Parsed in a single pass, the tokenizer tells the dialect from the first lines.
+            i3d_dialect = None
+            parse_processes = 1
+            use_streaming = False
+        options = dict(use_smooth_groups=use_smooth_groups,
+                       use_edges=use_edges,
+                       use_split_objects=use_split_objects,
+                       use_split_groups=use_split_groups,
+                       use_groups_as_vgroups=use_groups_as_vgroups,
+                       )
+        # Split the mesh by objects/materials, may
+        SPLIT_OB_OR_GROUP = bool(use_split_objects or use_split_groups)
+        name_filter = objx_parse.name_filter(object_filter) if SPLIT_OB_OR_GROUP else None
+
+        voxel_grid = None
+        if voxel_size > 0.0 or vertex_budget > 0:
+            # Only the voxels are held in memory, the file is parsed in one go.
+            voxel_grid = objx_voxel.VoxelGrid(voxel_size, vertex_budget)
+            use_streaming = False
+            pipeline_depth = 0
+
+        def not_enough_memory(peak):
+            warnings.warn("not enough memory", "%s needs about %s, only %s are available; import some objects "
+                          "(object filter) or a region of it, or turn off Check Memory to import it anyway" %
+                          (os.path.basename(filepath), objx_memory.format_size(peak),
+                           objx_memory.format_size(available)))
+            warnings.print_summary()
+            progress.leave_substeps("Not enough memory.")
+            progress.leave_substeps("Cancelled importing: %r" % filepath)
+
+        estimate = available = None
+        if (use_memory_check and source is filepath and voxel_grid is None and
+                os.path.getsize(filepath) >= objx_memory.CHECK_MIN_SIZE):
+            estimate = objx_memory.estimate(filepath, **options)
+            available = objx_memory.available_memory()
+            strategy = "streaming" if use_streaming or pipeline_depth else "in memory"
+            if (available is not None and strategy == "in memory" and SPLIT_OB_OR_GROUP and
+                    estimate.peak() > available):
+                use_streaming = True
+                strategy = "streaming, not enough memory to parse the whole file at once"
+            peak = estimate.peak(use_streaming or pipeline_depth)
+            print("\tEstimated memory: %s, available: %s, strategy: %s" % (
+                estimate.summary(use_streaming or pipeline_depth),
+                "unknown" if available is None else objx_memory.format_size(available), strategy))
+            if available is not None and peak > available:
+                not_enough_memory(peak)
+                return {'CANCELLED'}
+
+        stream = None
+        if SPLIT_OB_OR_GROUP and (use_streaming or pipeline_depth or name_filter is not None) and source is filepath:
+            stream = yield from status.call(objx_stream.OBJxStream.cached_index, filepath,
+                                            i3d_dialect=i3d_dialect, **options)
+            if stream is None:
+                print("\tOBJx file has no faces, or multi-line or indented records, it cannot be streamed")
+                if estimate is not None and available is not None and estimate.peak() > available:
+                    # Streaming was the only way for the file to fit in memory.
+                    not_enough_memory(estimate.peak())
+                    return {'CANCELLED'}
+            elif name_filter is not None:
+                stream.select(name_filter)
+            if stream is not None:
+                prefetch.add_libraries(stream.material_libs)
+        use_streaming = stream is not None
+
+        if use_streaming:
+            # Only what all the objects need is known at this point, the objects are parsed while building them.
+            data = stream
+            num_verts, num_faces = stream.verts_counts[-1][0], sum(stream.object_faces_counts())
+        else:
+            data = yield from status.call(objx_parse.parse, source, processes=parse_processes,
+                                          i3d_dialect=i3d_dialect, on_material_lib=prefetch.add_library,
+                                          on_progress=status.on_progress, voxel_grid=voxel_grid, **options)
+            if voxel_grid is not None:
+                print("\tDownsampled %d vertices to %d (voxel size: %g)" % (
+                    voxel_grid.vertices, len(voxel_grid), voxel_grid.voxel_size))
+            if region is not None:
+                data.crop(*region)
+            num_verts, num_faces = len(data.verts_loc) // 3, len(data.face_material)
+            warnings.extend(data.warnings)
+        material_libs = data.material_libs
+        use_default_material = data.use_default_material
+        unique_materials = data.unique_materials
+        unique_smooth_groups = data.unique_smooth_groups
 
         progress.step("Done, loading materials and images...")
 
+        # Get the string to float conversion func for this file- is 'float' for almost all files.
+        float_func = objx_tokenizer.comma_float if data.decimal_comma else float
+
         if use_default_material:
             unique_materials[None] = None
         create_materials(filepath, relpath, material_libs, unique_materials,
-                         use_image_search, float_func)
+                         use_image_search, float_func, warnings, prefetch)
 
         progress.step("Done, building geometries (verts:%i faces:%i materials: %i smoothgroups:%i) ..." %
-                      (len(verts_loc), len(faces), len(unique_materials), len(unique_smooth_groups)))
+                      (num_verts, num_faces, len(unique_materials), len(unique_smooth_groups)))
 
         # deselect all
         if bpy.ops.object.select_all.poll():
             bpy.ops.object.select_all(action='DESELECT')
 
         new_objects = []  # put new objects here
+        status.start("Building", 'FACES', num_faces)
 
-        # Split the mesh by objects/materials, may
-        SPLIT_OB_OR_GROUP = bool(use_split_objects or use_split_groups)
-
-        # for data in split_mesh(verts_loc, faces, unique_materials, filepath, SPLIT_OB_OR_GROUP):
-        #     verts_loc_split, faces_split, unique_materials_split, dataname, use_vnor, use_vtex, use_vtex2, use_vtex3, use_vtex4 = data
-
-        # Note by Tomoaki Osada:
-        # The original program inputs verts_loc into split_mesh() and sometimes the order of verts_loc
-        # changes.
-        # Since vertex color references vertex indices of verts_loc, the order of verts_col has to
-        # be modified in the same way as verts_loc is.
-        # So far, I merge verts_loc and verts_col into a single list (verts) and do split_mesh(), and then
-        # split it into verts_loc and verts_col again.
-        # But probably it's more preferrable to modify split_mesh() itself.
-        verts = []
-        if verts_col:
-            for val in zip(verts_loc, verts_col):
-                verts.append(val)
-        else:
-            verts = verts_loc
-
-        for data in split_mesh(verts, faces, unique_materials, filepath, SPLIT_OB_OR_GROUP):
-            verts_split, faces_split, unique_materials_split, dataname, use_vnor, use_vtex, use_vtex2, use_vtex3, use_vtex4 = data
-
-            verts_loc_split = []
-            verts_col_split = []
-            for val in verts_split:
-                if type(val) is tuple:
-                    verts_loc_split.append(val[0])
-                    verts_col_split.append(val[1])
+        if use_streaming:
+            if pipeline_depth:
+                objects = stream.iter_objects_parallel(max(parse_processes, 1), pipeline_depth, **options)
+            else:
+                objects = stream.iter_objects(**options)
+            while True:
+                data = yield from status.call(next, objects, None)
+                if data is None:
+                    break
+                warnings.extend(data.warnings)
+                if region is not None:
+                    data.crop(*region)
+                if len(data.face_material):
+                    for faces in create_objects(new_objects, data, unique_materials, unique_smooth_groups,
+                                                filepath, use_edges, SPLIT_OB_OR_GROUP, warnings):
+                        status.done += faces
+                        yield status
                 else:
-                    verts_loc_split.append(val)
-
-            # Create meshes from the data, warning 'vertex_groups' wont support splitting
-            #~ print(dataname, use_vnor, use_vtex, use_vtex2, use_vtex3, use_vtex4)
-            create_mesh(new_objects,
-                        use_edges,
-                        verts_loc_split,
-                        verts_nor if use_vnor else [],
-                        verts_tex if use_vtex else [],
-                        verts_tex2 if use_vtex2 else [],
-                        verts_tex3 if use_vtex3 else [],
-                        verts_tex4 if use_vtex4 else [],
-                        verts_col_split,
-                        faces_split,
-                        unique_materials_split,
-                        unique_smooth_groups,
-                        vertex_groups,
-                        dataname,
-                        )
-
-        # nurbs support
-        for context_nurbs in nurbs:
-            create_nurbs(context_nurbs, verts_loc, new_objects)
+                    # Objects without faces (e.g. the vertices shared by the next ones) get no mesh.
+                    verts_loc = np.frombuffer(data.verts_loc, dtype=np.float32).reshape(-1, 3)
+                    for context_nurbs in data.nurbs:
+                        create_nurbs(context_nurbs, verts_loc, new_objects, warnings)
+        elif data.is_point_cloud():
+            # Files of vertices only (scans) need none of the faces machinery.
+            create_point_cloud(new_objects, data, filepath)
+        else:
+            for faces in create_objects(new_objects, data, unique_materials, unique_smooth_groups, filepath,
+                                        use_edges, SPLIT_OB_OR_GROUP, warnings, name_filter):
+                status.done += faces
+                yield status
 
         view_layer = context.view_layer
         collection = view_layer.active_layer_collection.collection
@@ -1472,7 +1232,22 @@ def load(context,
         if rotate_transform_apply:
             bpy.ops.object.transform_apply(location=False, rotation=True, scale=False)
 
+        warnings.print_summary()
+
         progress.leave_substeps("Done.")
         progress.leave_substeps("Finished importing: %r" % filepath)
 
     return {'FINISHED'}
+
+
+def load_from_buffer(context, data_or_fileobj, *, name="untitled.objx", base_dir="", **kwargs):
+    """
+    Imports an OBJx file given in memory, as bytes, a memoryview or any readable binary file object,
+    without writing it to a temporary file. It is parsed in a single pass and a single process.
+    name is the file name of the objects, and of the MTL library looked for when the file has no mtllib line;
+    the MTL libraries and images are looked for in base_dir.
+    kwargs are the ones of load(), use_streaming and parse_processes being ignored.
+    """
+    if isinstance(data_or_fileobj, (bytes, bytearray)):
+        data_or_fileobj = memoryview(data_or_fileobj)
+    return load(context, os.path.join(base_dir, name), source=data_or_fileobj, **kwargs)
@@ -0,0 +1,122 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+"""
+Compressed OBJx files and zip bundles, independent from Blender.
+
+.gz and .xz files are decompressed while they are parsed, one window of objx_reader.iter_windows() at a time,
+so that the decompressed file is neither written to disk nor held in memory as a whole.
+The OBJx files of a zip bundle are read the same way, and their MTL libraries and images are read from the bundle,
+their paths being the path of the bundle followed by the path of the member inside it.
+"""
+
+import gzip
+import lzma
+import os
+import posixpath
+import zipfile
+
+
+COMPRESSED_OPENERS = {
+    ".gz": gzip.open,
+    ".xz": lzma.open,
+}
+
+ARCHIVE_EXT = ".zip"
+
+# Members of a zip bundle imported as OBJx files.
+OBJX_EXTS = (".objx", ".obj")
+
+# Folders of metadata added to zip bundles by some archivers.
+IGNORED_DIRS = ("__MACOSX/",)
+
+
+def is_packed(filepath):
+    """
+    Tells whether the file at filepath is a compressed file or a zip bundle, from its extension.
+    """
+    ext = os.path.splitext(filepath)[1].lower()
+    return ext in COMPRESSED_OPENERS or ext == ARCHIVE_EXT
+
+
+def iter_files(filepath):
+    """
+    Yields (path, file, archive) for each OBJx file packed in the file at filepath, file being a binary file object
+    decompressing it while it is read, and path its path once decompressed, naming its objects.
+    archive is the OBJxArchive of a zip bundle, or None for a compressed file (its MTL libraries and images being
+    then next to it).
+    """
+    path, ext = os.path.splitext(filepath)
+    opener = COMPRESSED_OPENERS.get(ext.lower())
+    if opener is not None:
+        with opener(filepath, 'rb') as file:
+            yield path, file, None
+        return
+
+    with OBJxArchive(filepath) as archive:
+        for member in archive.objx_members():
+            with archive.zip.open(member) as file:
+                yield archive.member_path(member), file, archive
+
+
+class OBJxArchive:
+    """
+    Zip bundle of OBJx files, and of their MTL libraries and images.
+    """
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self.zip = zipfile.ZipFile(filepath)
+        # Member names by their lowercase name, paths written on Windows often do not match the case of the files.
+        self.members = {name.lower(): name for name in self.zip.namelist()
+                        if not name.endswith("/") and not name.startswith(IGNORED_DIRS)}
+
+    def close(self):
+        self.zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def objx_members(self):
+        """
+        Returns the names of the OBJx files of the bundle, sorted.
+        """
+        return sorted(name for lower_name, name in self.members.items() if lower_name.endswith(OBJX_EXTS))
+
+    def member_path(self, member):
+        """
+        Returns the path of member, the path of the bundle followed by its path inside the bundle.
+        """
+        return os.path.join(self.filepath, *member.split("/"))
+
+    def member(self, path):
+        """
+        Returns the name of the member at path (see member_path()), or None if it is not in the bundle.
+        """
+        root = os.path.normcase(os.path.abspath(self.filepath)) + os.sep
+        path = os.path.abspath(path)
+        if not os.path.normcase(path).startswith(root):
+            return None
+        name = posixpath.normpath(path[len(root):].replace(os.sep, "/").replace("\\", "/"))
+        return self.members.get(name.lower())
+
+    def exists(self, path):
+        return self.member(path) is not None
+
+    def open(self, path):
+        """
+        Opens the member at path for reading, as a binary file object.
+        """
+        member = self.member(path)
+        if member is None:
+            raise FileNotFoundError(path)
+        return self.zip.open(member)
+
+    def read(self, path):
+        """
+        Returns the content of the member at path, or None if it is not in the bundle.
+        """
+        member = self.member(path)
+        return None if member is None else self.zip.read(member)
@@ -0,0 +1,140 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+"""
+Scan of the structure of an OBJx file without parsing its numbers, independent from Blender.
+
+Only the line tags of objx_reader and the amount of fields of the lines are used, apart from the few
+o, g, usemtl and mtllib lines, so that a file is scanned at about the speed it is read.
+"""
+
+import os
+
+import numpy as np
+
+if __package__:
+    from . import objx_parse, objx_reader, objx_tokenizer
+else:
+    import objx_parse, objx_reader, objx_tokenizer  # Used as a standalone module, outside of Blender.
+
+
+COUNTED_TAGS = (b'v', b'vt', b'vt2', b'vt3', b'vt4', b'vn', b'f', b'l')
+
+CONTEXT_TAGS = (objx_reader.TAG_O, objx_reader.TAG_G, objx_reader.TAG_USEMTL, objx_reader.TAG_MTLLIB)
+
+# Amount of fields of a vertex line with a color, and with a color and an alpha.
+VERT_COLOR_FIELDS = 7
+VERT_ALPHA_FIELDS = 8
+
+
+class OBJxInfo:
+    """
+    Structure of an OBJx file: its amount of lines of each kind, its objects and groups with their amount of faces,
+    the materials it uses and the amount of faces of each size.
+    """
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self.size = 0
+        self.lines = 0
+        self.counts = dict.fromkeys(COUNTED_TAGS, 0)
+        self.verts_colors = 0  # Vertices with a color, alpha included.
+        self.verts_alphas = 0  # Vertices with a color and an alpha.
+        self.face_sizes = {}  # Amount of faces of each amount of corners.
+        self.objects = {}  # Amount of faces of each object, named as the import names them.
+        self.groups = {}  # Amount of faces of each group.
+        self.materials = {}  # Materials used by usemtl lines, in their order.
+        self.material_libs = {}  # Material libraries, in their order.
+        self.multi_line = 0  # Lines continued on the next one, their records are counted on their first line.
+        self.indented = 0  # Lines starting with whitespace, not counted.
+
+    def summary(self):
+        """
+        Returns the summary of the structure of the file, as a list of lines.
+        """
+        counts = self.counts
+        lines = ["%s: %d bytes, %d lines" % (os.path.basename(self.filepath), self.size, self.lines),
+                 "    vertices: %d, normals: %d, UV channels: %d (%s)" % (
+                     counts[b'v'], counts[b'vn'], sum(1 for tag in COUNTED_TAGS[1:5] if counts[tag]),
+                     ", ".join("%s: %d" % (tag.decode(), counts[tag]) for tag in COUNTED_TAGS[1:5])),
+                 "    vertex colors: %d, with alpha: %d" % (self.verts_colors, self.verts_alphas),
+                 "    faces: %d (%s), lines: %d" % (
+                     counts[b'f'], ", ".join("%d corners: %d" % (size, count)
+                                            for size, count in sorted(self.face_sizes.items())), counts[b'l'])]
+        for title, names in (("objects", self.objects), ("groups", self.groups)):
+            lines.append("    %s: %d" % (title, len(names)))
+            lines += ["        %s: %d faces" % (name, faces) for name, faces in names.items()]
+        lines.append("    materials: %d (%s)" % (len(self.materials), ", ".join(
+            material.decode('utf-8', 'replace') for material in self.materials)))
+        lines.append("    material libraries: %s" % ", ".join(self.material_libs))
+        if self.multi_line or self.indented:
+            lines.append("    multi-line records: %d, indented lines: %d (approximate counts)" %
+                         (self.multi_line, self.indented))
+        return lines
+
+
+def inspect(filepath):
+    """
+    Scans the OBJx file at filepath, and returns its OBJxInfo.
+    """
+    info = OBJxInfo(filepath)
+    info.size = os.path.getsize(filepath)
+    filename = os.path.splitext(os.path.basename(filepath))[0]
+    tag_names = {name: tag for tag, name in objx_reader.TAG_NAMES.items()}
+    face_tag = tag_names[b'f']
+
+    objects_names = {}
+    object_name = group_name = None
+    object_faces = group_faces = 0
+    faces_count = 0
+
+    def add_faces(names, name, faces):
+        # Faces before the first o (or g) line are only listed if there are some.
+        if faces or name is not None:
+            names[name] = names.get(name, 0) + faces
+
+    for lines in objx_reader.iter_windows(filepath):
+        tags = lines.line_tags
+        info.lines += len(lines)
+        info.multi_line += int(np.count_nonzero(lines.line_cont))
+        other = np.flatnonzero((tags == objx_reader.TAG_OTHER) & (lines.line_ends > lines.line_starts))
+        info.indented += int(np.count_nonzero(objx_reader.IS_SPACE[lines.data[lines.line_starts[other]]]))
+        for tag in COUNTED_TAGS:
+            info.counts[tag] += int(np.count_nonzero(tags == tag_names[tag]))
+
+        # Vertex colors and face sizes from the amount of fields of their lines.
+        for tag, r0, r1 in lines.runs():
+            if tag == tag_names[b'v']:
+                fields = lines.field_counts(r0, r1)
+                info.verts_colors += int(np.count_nonzero(fields >= VERT_COLOR_FIELDS))
+                info.verts_alphas += int(np.count_nonzero(fields >= VERT_ALPHA_FIELDS))
+            elif tag == face_tag:
+                sizes, counts = np.unique(lines.field_counts(r0, r1) - 1, return_counts=True)
+                for size, count in zip(sizes.tolist(), counts.tolist()):
+                    info.face_sizes[size] = info.face_sizes.get(size, 0) + count
+
+        faces_before = np.zeros(len(tags) + 1, dtype=np.int64)
+        np.cumsum(tags == face_tag, out=faces_before[1:])
+        faces_before += faces_count
+        for i in np.flatnonzero(np.isin(tags, CONTEXT_TAGS)).tolist():
+            tag = tags[i]
+            line = next(lines.lines(i, i + 1))
+            if tag == objx_reader.TAG_O:
+                add_faces(info.objects, object_name, int(faces_before[i]) - object_faces)
+                object_name = objx_parse.unique_name(objects_names, objx_tokenizer.line_value(line.split()))
+                object_faces = int(faces_before[i])
+            elif tag == objx_reader.TAG_G:
+                add_faces(info.groups, group_name, int(faces_before[i]) - group_faces)
+                group_name = objx_tokenizer.line_value(line.split())
+                group_faces = int(faces_before[i])
+            elif tag == objx_reader.TAG_USEMTL:
+                info.materials[objx_tokenizer.line_value(line.split())] = None
+            else:
+                for lib in objx_tokenizer.filenames_group_by_ext(line.lstrip()[7:].strip(), b'.mtl'):
+                    info.material_libs[os.fsdecode(lib)] = None
+        faces_count = int(faces_before[-1])
+
+    add_faces(info.objects, object_name, faces_count - object_faces)
+    add_faces(info.groups, group_name, faces_count - group_faces)
+    info.objects = {objx_parse.key_to_name(name, filename): faces for name, faces in info.objects.items()}
+    info.groups = {objx_parse.key_to_name(name, filename): faces for name, faces in info.groups.items()}
+    return info
@@ -0,0 +1,211 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+"""
+Estimate of the memory an import needs, from a sample of the OBJx file, independent from Blender.
+
+A few parts spread over the file are scanned with the line tags of objx_reader, like objx_inspect does,
+and their counts of vertices, faces and corners are scaled to the size of the file.
+The memory of the parsed data and of the Blender meshes follows from these counts and the import options,
+see MemoryEstimate.
+"""
+
+import os
+import sys
+
+import numpy as np
+
+if __package__:
+    from . import objx_reader
+else:
+    import objx_reader  # Used as a standalone module, outside of Blender.
+
+
+# Amount of parts of the file scanned, and their size. Smaller files are scanned as a whole.
+SAMPLES = 16
+SAMPLE_SIZE = 1 << 18
+
+# Amount of fields of a vertex line with a color.
+VERT_COLOR_FIELDS = 7
+
+# Bytes of the parsed data (objx_parse.OBJxData) of each vertex of each kind, vertex color, face and corner:
+# float32 coordinates, the compressed rows of the faces with their context indices and flags,
+# and the corner indices to the vertices of each kind.
+PARSED_VERT_BYTES = {b'v': 12, b'vn': 12, b'vt': 8, b'vt2': 8, b'vt3': 8, b'vt4': 8}
+PARSED_COLOR_BYTES = 16
+PARSED_FACE_BYTES = 21
+PARSED_CORNER_BYTES = 24
+# Python int in a list, for each corner of a face in a group with use_groups_as_vgroups.
+PARSED_VGROUP_BYTES = 36
+
+# Bytes of a Blender mesh for each vertex, face and corner (with its edge), and for each corner
+# with a custom normal, UV layer and color, plus the index arrays split_mesh() and create_mesh() build.
+MESH_VERT_BYTES = 28
+MESH_FACE_BYTES = 24
+MESH_CORNER_BYTES = 40
+MESH_NORMAL_BYTES = 12
+MESH_UV_BYTES = 8
+MESH_COLOR_BYTES = 16
+
+# Share of the available memory an import may use, the rest being left to Blender and the system.
+MEMORY_HEADROOM = 0.8
+
+# Files smaller than that are not checked, any system Blender runs on has the memory to import them,
+# and sampling them would only delay the import.
+CHECK_MIN_SIZE = 1 << 28
+
+
+class MemoryEstimate:
+    """
+    Memory an import of a file needs: its counts of vertices of each kind, vertex colors, faces, corners,
+    objects and grouped corners, scaled from the sample, and the resulting peak memory, in bytes.
+    """
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self.size = 0
+        self.counts = dict.fromkeys(PARSED_VERT_BYTES, 0)
+        self.colors = 0
+        self.faces = 0
+        self.corners = 0
+        self.objects = 0
+        self.grouped_corners = 0
+        self.parsed = 0  # Parsed data of the whole file.
+        self.meshes = 0  # Blender meshes of the whole file.
+
+    def peak(self, use_streaming=False):
+        """
+        Returns the peak memory of the import, its Blender meshes and its parsed data, that of the largest object
+        only when use_streaming.
+        """
+        if use_streaming:
+            return self.meshes + self.parsed // max(self.objects, 1)
+        return self.meshes + self.parsed
+
+    def summary(self, use_streaming=False):
+        return "%s (parsed data: %s, meshes: %s)" % (
+            format_size(self.peak(use_streaming)), format_size(self.parsed), format_size(self.meshes))
+
+
+def format_size(size):
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            break
+        size /= 1024
+    return "%.1f %s" % (size, unit) if unit != "B" else "%d B" % size
+
+
+def _sample_bounds(filepath, size):
+    """
+    Yields the bounds [start, end) of the parts of the file scanned, starting and ending at line boundaries.
+    """
+    if size <= SAMPLES * SAMPLE_SIZE:
+        yield 0, size
+        return
+    with open(filepath, 'rb') as f:
+        for i in range(SAMPLES):
+            start = size * i // SAMPLES
+            if start:
+                f.seek(start - 1)
+                f.readline()
+                start = f.tell()
+            f.seek(min(start + SAMPLE_SIZE, size))
+            f.readline()
+            end = min(f.tell(), size)
+            if start < end:
+                yield start, end
+
+
+def estimate(filepath, *, use_split_objects=True, use_split_groups=False, use_groups_as_vgroups=False,
+             use_edges=True, **options):
+    """
+    Estimates the memory importing the OBJx file at filepath needs, with the options of OBJxData.read(),
+    and returns its MemoryEstimate.
+    """
+    est = MemoryEstimate(filepath)
+    est.size = os.path.getsize(filepath)
+    tag_names = {name: tag for tag, name in objx_reader.TAG_NAMES.items()}
+    geometry_tags = [tag_names[b'f']]
+    if use_edges:
+        geometry_tags.append(tag_names[b'l'])
+    object_tags = []
+    if use_split_objects:
+        object_tags.append(objx_reader.TAG_O)
+    if use_split_groups:
+        object_tags.append(objx_reader.TAG_G)
+
+    sampled = 0
+    in_group = False
+    for start, end in _sample_bounds(filepath, est.size):
+        sampled += end - start
+        for lines in objx_reader.iter_windows(filepath, start, end):
+            tags = lines.line_tags
+            for name in PARSED_VERT_BYTES:
+                est.counts[name] += int(np.count_nonzero(tags == tag_names[name]))
+            est.objects += int(np.count_nonzero(np.isin(tags, object_tags)))
+            for tag, r0, r1 in lines.runs():
+                if tag == objx_reader.TAG_V:
+                    est.colors += int(np.count_nonzero(lines.field_counts(r0, r1) >= VERT_COLOR_FIELDS))
+                elif tag in geometry_tags:
+                    corners = int(lines.field_counts(r0, r1).sum()) - (r1 - r0)
+                    est.faces += r1 - r0
+                    est.corners += corners
+                    if in_group and tag == objx_reader.TAG_F:
+                        est.grouped_corners += corners
+                elif tag == objx_reader.TAG_G:
+                    in_group = True
+
+    # Scale the counts of the sample to the whole file.
+    scale = est.size / sampled if sampled else 0.0
+    for name in est.counts:
+        est.counts[name] = int(est.counts[name] * scale)
+    est.colors = int(est.colors * scale)
+    est.faces = int(est.faces * scale)
+    est.corners = int(est.corners * scale)
+    est.objects = max(int(est.objects * scale), 1)
+    est.grouped_corners = int(est.grouped_corners * scale) if use_groups_as_vgroups else 0
+
+    counts = est.counts
+    est.parsed = (sum(counts[name] * size for name, size in PARSED_VERT_BYTES.items()) +
+                  est.colors * PARSED_COLOR_BYTES + est.faces * PARSED_FACE_BYTES +
+                  est.corners * PARSED_CORNER_BYTES + est.grouped_corners * PARSED_VGROUP_BYTES)
+    corner_bytes = (MESH_CORNER_BYTES + (MESH_NORMAL_BYTES if counts[b'vn'] else 0) +
+                    MESH_UV_BYTES * sum(1 for name in (b'vt', b'vt2', b'vt3', b'vt4') if counts[name]) +
+                    (MESH_COLOR_BYTES if est.colors else 0))
+    est.meshes = counts[b'v'] * MESH_VERT_BYTES + est.faces * MESH_FACE_BYTES + est.corners * corner_bytes
+    return est
+
+
+def available_memory():
+    """
+    Returns the memory an import may use, in bytes: a share of the memory available on the system,
+    or None when it cannot be told.
+    """
+    available = None
+    try:
+        with open("/proc/meminfo", 'rb') as f:
+            for line in f:
+                if line.startswith(b'MemAvailable:'):
+                    available = int(line.split()[1]) * 1024
+                    break
+    except (OSError, ValueError, IndexError):
+        pass
+    if available is None and sys.platform == 'win32':
+        import ctypes
+
+        class MEMORYSTATUSEX(ctypes.Structure):
+            _fields_ = [("dwLength", ctypes.c_ulong), ("dwMemoryLoad", ctypes.c_ulong),
+                        ("ullTotalPhys", ctypes.c_ulonglong), ("ullAvailPhys", ctypes.c_ulonglong),
+                        ("ullTotalPageFile", ctypes.c_ulonglong), ("ullAvailPageFile", ctypes.c_ulonglong),
+                        ("ullTotalVirtual", ctypes.c_ulonglong), ("ullAvailVirtual", ctypes.c_ulonglong),
+                        ("ullAvailExtendedVirtual", ctypes.c_ulonglong)]
+
+        status = MEMORYSTATUSEX()
+        status.dwLength = ctypes.sizeof(MEMORYSTATUSEX)
+        if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+            available = status.ullAvailPhys
+    if available is None:
+        try:
+            available = os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+        except (AttributeError, ValueError, OSError):
+            return None
+    return int(available * MEMORY_HEADROOM)
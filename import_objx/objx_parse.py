@@ -0,0 +1,662 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+"""
+Parsing of OBJx files into plain Python data, independent from Blender.
+
+OBJxData consumes the events of objx_tokenizer. The whole file can be parsed at once,
+or split in chunks of lines parsed by several worker processes. Relative (negative) indices of the later chunks
+are resolved from the vertex counts of the previous ones, known beforehand from the line tags of the reader.
+"""
+
+import fnmatch
+import multiprocessing
+import os
+from array import array
+
+import numpy as np
+
+if __package__:
+    from . import objx_reader, objx_tokenizer, objx_warnings
+else:
+    import objx_reader, objx_tokenizer, objx_warnings  # Used as a standalone module, outside of Blender.
+
+VertexBlock = objx_tokenizer.VertexBlock
+FaceBlock = objx_tokenizer.FaceBlock
+PolylineBlock = objx_tokenizer.PolylineBlock
+UseMaterial = objx_tokenizer.UseMaterial
+SmoothGroup = objx_tokenizer.SmoothGroup
+Group = objx_tokenizer.Group
+Object = objx_tokenizer.Object
+MaterialLib = objx_tokenizer.MaterialLib
+Nurbs = objx_tokenizer.Nurbs
+
+
+# Files smaller than this are always parsed in a single process, workers would cost more than they save.
+PARALLEL_MIN_SIZE = 1 << 24
+# Seconds between the calls to on_progress while the worker processes of parse_parallel() run.
+PARALLEL_POLL_INTERVAL = 0.1
+
+# OBJxData.face_flags bits.
+FACE_POLYLINE = 1  # Polyline (l record), its nor and tex indices are all 0.
+
+
+def csr_indices(starts, sizes):
+    """
+    Returns the indices of the items of the compressed rows starting at starts and of sizes items,
+    one row after the other.
+    """
+    ends = np.cumsum(sizes)
+    return np.arange(ends[-1] if len(ends) else 0) + np.repeat(starts - (ends - sizes), sizes)
+
+
+def face_edges(starts, sizes, loc):
+    """
+    Returns the (n, 2) array of the edges of the faces of sizes (> 0) corners starting at starts in loc,
+    one face after the other, each edge going from the previous corner (the last one for the first corner)
+    to a corner of the face, as its (smallest, biggest) vertex indices.
+    """
+    corners = csr_indices(starts, sizes)
+    prev_corners = corners - 1
+    prev_corners[np.cumsum(sizes) - sizes] += sizes
+    edges = np.stack((loc[prev_corners], loc[corners]), axis=1)
+    edges.sort(axis=1)
+    return edges
+
+
+def invalid_ngons(sizes, loc):
+    """
+    Returns the bool mask of the Blender-invalid ngons, i.e. faces using a same edge more than once,
+    among faces of sizes corners whose vertex indices are stored one face after the other in loc.
+    """
+    invalid = np.zeros(len(sizes), dtype=bool)
+    if not len(loc):
+        return invalid
+
+    # Only faces using a same vertex more than once may use a same edge more than once,
+    # look for those first by sorting the vertices of each face.
+    loc = loc.astype(np.int64) - int(loc.min())
+    num_verts = int(loc.max()) + 1
+    keys = np.repeat(np.arange(len(sizes), dtype=np.int64) * num_verts, sizes) + loc
+    keys.sort()
+    suspects = np.unique(keys[1:][keys[1:] == keys[:-1]] // num_verts)
+    if not len(suspects):
+        return invalid
+
+    suspects_sizes = sizes[suspects]
+    edges = face_edges((np.cumsum(sizes) - sizes)[suspects], suspects_sizes, loc)
+    edges = np.column_stack((np.repeat(suspects, suspects_sizes), edges))
+    edges = edges[np.lexsort(edges.T[::-1])]
+    invalid[edges[1:, 0][(edges[1:] == edges[:-1]).all(axis=1)]] = True
+    return invalid
+
+
+def partition_faces(sizes, flags, loc, use_edges=True):
+    """
+    Sorts out faces of sizes corners and flags (see OBJxData.face_flags), whose vertex indices are stored one face
+    after the other in loc, the way Blender meshes are built from them: single verts are dropped (can't add single
+    vert faces), polylines and faces with 2 verts become edges, and Blender-invalid ngons are tessellated
+    (ignoring triangles with invalid indices).
+    Returns the bool mask of the faces (invalid ones included), the indices of the faces kept as they are,
+    the (n, 2) array of the edges (vertex indices in loc, none without use_edges), and the indices of the ngons
+    to tessellate. Edges and ngons are in the reverse order of their polyline or face, as they used to be built.
+    """
+    is_polyline = (flags & FACE_POLYLINE).astype(bool)
+    is_edge = (sizes > 1) & (is_polyline | (sizes == 2))
+    is_face = ~is_polyline & (sizes > 2)
+    is_invalid = is_face & invalid_ngons(sizes, loc)
+    faces_kept = np.flatnonzero(is_face & ~is_invalid)
+
+    if use_edges:
+        edges_face = np.flatnonzero(is_edge)[::-1]
+        edges_corner = csr_indices((np.cumsum(sizes) - sizes)[edges_face], sizes[edges_face] - 1)
+        edges = np.stack((loc[edges_corner], loc[edges_corner + 1]), axis=1)
+    else:
+        edges = np.empty((0, 2), dtype=loc.dtype)
+
+    ngons = np.flatnonzero(is_invalid & (sizes > 3))[::-1]
+    return is_face, faces_kept, edges, ngons
+
+
+def unique_name(existing_names, name_orig):
+    """
+    Returns name_orig, or the first name_orig.NNN not in existing_names yet, and adds it to existing_names.
+    existing_names is a dict of the names already used, mapping to the next NNN to try when they are used again.
+    """
+    if name_orig is None:
+        name_orig = b"ObjObject"
+    name = name_orig
+    if name in existing_names:
+        # All the previous NNN have been given out already, or were taken by other names.
+        i = existing_names[name_orig]
+        name = b"%s.%03d" % (name_orig, i)
+        while name in existing_names:
+            i += 1
+            name = b"%s.%03d" % (name_orig, i)
+        existing_names[name_orig] = i + 1
+    existing_names[name] = 0
+    return name
+
+
+def key_to_name(key, filename):
+    """
+    Returns the name of the object of key (an object key of OBJxData), filename when it has none.
+    """
+    if not key:
+        return filename
+    elif isinstance(key, bytes):
+        return key.decode('utf-8', 'replace')
+    else:
+        return "_".join(k.decode('utf-8', 'replace') for k in key)
+
+
+def name_filter(patterns):
+    """
+    Returns a function telling whether an object name matches one of patterns, comma separated names
+    or fnmatch patterns (such as "Wall*"). Returns None when there are no patterns, all the names matching.
+    """
+    patterns = [pattern.strip() for pattern in patterns.split(",") if pattern.strip()]
+    if not patterns:
+        return None
+    return lambda name: any(fnmatch.fnmatchcase(name, pattern) for pattern in patterns)
+
+
+class OBJxData:
+    """
+    Everything read from an OBJx file, and the parsing context at the current line.
+    """
+
+    # Parsing context carried from one event to the next ones.
+    context_attrs = (
+        "context_material",
+        "context_smooth_group",
+        "context_object_key",
+        "context_object_obpart",
+        "context_vgroup",
+        "objects_names",
+    )
+
+    # Called with the file name of each material library as soon as its mtllib line is read, when set.
+    on_material_lib = None
+    # objx_voxel.VoxelGrid the vertices (verts_loc and verts_col) go to instead, when set.
+    # The other vertex data, faces, polylines and nurbs are then dropped, their vertices being gone.
+    voxel_grid = None
+
+    def __init__(self):
+        # Vertices one after the other, 3 floats per vertex for verts_loc and verts_nor,
+        # 2 for verts_tex* and 4 (RGBA) for verts_col.
+        self.verts_loc = array('f')
+        self.verts_nor = array('f')
+        self.verts_tex = array('f')
+        self.verts_tex2 = array('f')
+        self.verts_tex3 = array('f')
+        self.verts_tex4 = array('f')
+        self.verts_col = array('f')
+        self.decimal_comma = False  # Whether the numbers of the file use a decimal comma.
+        self.warnings = objx_warnings.OBJxWarnings()  # Warnings of the tokenizer.
+
+        # Faces (and polylines) as compressed rows, the corners of face i being [face_offsets[i], face_offsets[i + 1])
+        # in the face_loc, face_nor, face_tex, ... indices arrays.
+        self.face_offsets = array('q', (0,))
+        self.face_loc = array('i')
+        self.face_nor = array('i')
+        self.face_tex = array('i')
+        self.face_tex2 = array('i')
+        self.face_tex3 = array('i')
+        self.face_tex4 = array('i')
+        # Per face context, as indices in the keys of material_keys, smooth_group_keys and object_keys.
+        self.face_material = array('i')
+        self.face_smooth_group = array('i')
+        self.face_object = array('i')
+        self.face_flags = array('B')
+        self.material_keys = {}
+        self.smooth_group_keys = {}
+        self.object_keys = {}
+
+        self.material_libs = set()  # filenames to material libs this OBJ uses
+        self.vertex_groups = {}  # when use_groups_as_vgroups is true
+        self.nurbs = []
+
+        # Until we can use sets
+        self.use_default_material = False
+        self.unique_materials = {}
+        self.unique_smooth_groups = {}
+        # unique_obects= {} - no use for this variable since the objects are stored in the face.
+
+        # Context variables
+        self.context_material = None
+        self.context_smooth_group = None
+        self.context_object_key = None
+        self.context_object_obpart = None
+        self.context_vgroup = None
+
+        self.objects_names = {}
+
+    def context(self):
+        return (tuple(getattr(self, attr) for attr in self.context_attrs) +
+                (list(self.unique_materials), list(self.unique_smooth_groups), list(self.vertex_groups)))
+
+    def continuation(self):
+        """
+        Returns an empty OBJxData to parse the lines following the ones parsed by this one.
+        """
+        data = OBJxData()
+        for attr in self.context_attrs:
+            setattr(data, attr, getattr(self, attr))
+        data.objects_names = dict(self.objects_names)
+        data.unique_materials = dict.fromkeys(self.unique_materials)
+        data.unique_smooth_groups = dict.fromkeys(self.unique_smooth_groups)
+        data.vertex_groups = {name: [] for name in self.vertex_groups}
+        data.use_default_material = self.use_default_material
+        return data
+
+    def extend(self, data):
+        """
+        Appends the result of data, which parsed the lines following the ones parsed by this one.
+        """
+        self.verts_loc += data.verts_loc
+        self.verts_nor += data.verts_nor
+        self.verts_tex += data.verts_tex
+        self.verts_tex2 += data.verts_tex2
+        self.verts_tex3 += data.verts_tex3
+        self.verts_tex4 += data.verts_tex4
+        self.verts_col += data.verts_col
+        offsets = np.frombuffer(data.face_offsets, dtype=np.int64)[1:] + self.face_offsets[-1]
+        self.face_offsets.frombytes(offsets.tobytes())
+        self.face_loc += data.face_loc
+        self.face_nor += data.face_nor
+        self.face_tex += data.face_tex
+        self.face_tex2 += data.face_tex2
+        self.face_tex3 += data.face_tex3
+        self.face_tex4 += data.face_tex4
+        for attr, keys_attr in (("face_material", "material_keys"),
+                                ("face_smooth_group", "smooth_group_keys"),
+                                ("face_object", "object_keys")):
+            keys = getattr(self, keys_attr)
+            remap = np.array([keys.setdefault(key, len(keys)) for key in getattr(data, keys_attr)], dtype=np.int32)
+            indices = np.frombuffer(getattr(data, attr), dtype=np.int32)
+            getattr(self, attr).frombytes(remap[indices].tobytes())
+        self.face_flags += data.face_flags
+        self.material_libs |= data.material_libs
+        for name, indices in data.vertex_groups.items():
+            self.vertex_groups.setdefault(name, []).extend(indices)
+        self.nurbs += data.nurbs
+        self.use_default_material |= data.use_default_material
+        self.unique_materials.update(data.unique_materials)
+        self.unique_smooth_groups.update(data.unique_smooth_groups)
+        for attr in self.context_attrs:
+            setattr(self, attr, getattr(data, attr))
+
+    def is_point_cloud(self):
+        """
+        Tells whether the data only has vertices, without faces, polylines or nurbs (such as scans).
+        """
+        return bool(len(self.verts_loc)) and not len(self.face_material) and not self.nurbs
+
+    def crop(self, region_min, region_max):
+        """
+        Drops the faces (and polylines) whose corners all lie outside the axis-aligned box [region_min, region_max],
+        and the nurbs whose points all do, then the vertices (verts_loc) nothing uses anymore.
+        Point clouds (see is_point_cloud()) keep their vertices inside the box.
+        """
+        is_point_cloud = self.is_point_cloud()
+        verts_loc = np.frombuffer(self.verts_loc, dtype=np.float32).reshape(-1, 3)
+        inside = ((verts_loc >= region_min) & (verts_loc <= region_max)).all(axis=1)
+
+        face_offsets = np.frombuffer(self.face_offsets, dtype=np.int64)
+        face_sizes = np.diff(face_offsets)
+        face_loc = np.frombuffer(self.face_loc, dtype=np.int32)
+        is_valid = (face_loc >= 0) & (face_loc < len(verts_loc))
+        corners_inside = np.zeros(len(face_loc) + 1, dtype=np.int64)
+        np.cumsum(is_valid & inside[np.where(is_valid, face_loc, 0)], out=corners_inside[1:])
+        faces = np.flatnonzero(corners_inside[face_offsets[1:]] > corners_inside[face_offsets[:-1]])
+        sizes = face_sizes[faces]
+        corners = csr_indices(face_offsets[faces], sizes)
+
+        self.face_offsets = array('q', np.concatenate(([0], np.cumsum(sizes))).tobytes())
+        for attr in ("face_loc", "face_nor", "face_tex", "face_tex2", "face_tex3", "face_tex4"):
+            setattr(self, attr, array('i', np.frombuffer(getattr(self, attr), dtype=np.int32)[corners].tobytes()))
+        for attr in ("face_material", "face_smooth_group", "face_object"):
+            setattr(self, attr, array('i', np.frombuffer(getattr(self, attr), dtype=np.int32)[faces].tobytes()))
+        self.face_flags = array('B', np.frombuffer(self.face_flags, dtype=np.uint8)[faces].tobytes())
+        self.nurbs = [curve for curve in self.nurbs
+                      if any(0 <= idx < len(verts_loc) and inside[idx] for idx in curve.get(b'curv_idx', ()))]
+
+        # Vertices still used, in their order, invalid indices staying out of range.
+        used = np.zeros(len(verts_loc) + 1, dtype=bool)
+        face_loc = np.frombuffer(self.face_loc, dtype=np.int32)
+        is_valid = is_valid[corners]
+        used[face_loc[is_valid]] = True
+        for curve in self.nurbs:
+            used[[idx for idx in curve.get(b'curv_idx', ()) if 0 <= idx < len(verts_loc)]] = True
+        if is_point_cloud:
+            used[:-1] = inside
+        used[-1] = True
+        remap = (np.cumsum(used) - 1).astype(np.int32)
+
+        self.face_loc = array('i', remap[np.where(is_valid, face_loc, len(verts_loc))].tobytes())
+        for curve in self.nurbs:
+            if b'curv_idx' in curve:
+                curve[b'curv_idx'] = [int(remap[idx]) if 0 <= idx < len(verts_loc) else int(remap[-1])
+                                      for idx in curve[b'curv_idx']]
+        for name, indices in self.vertex_groups.items():
+            indices = np.array(indices, dtype=np.int64)
+            indices = indices[(indices >= 0) & (indices < len(verts_loc))]
+            self.vertex_groups[name] = remap[indices[used[indices]]].tolist()
+        verts_col = np.frombuffer(self.verts_col, dtype=np.float32).reshape(-1, 4)
+        if len(verts_col) == len(verts_loc):
+            self.verts_col = array('f', verts_col[used[:-1]].tobytes())
+        self.verts_loc = array('f', verts_loc[used[:-1]].tobytes())
+
+    def read(self, events, *,
+             use_smooth_groups=True,
+             use_edges=True,
+             use_split_objects=True,
+             use_split_groups=False,
+             use_groups_as_vgroups=False,
+             ):
+        """
+        Consumes the events of objx_tokenizer, adding their content to this OBJxData.
+        """
+        verts = {
+            b'v': self.verts_loc,
+            b'vn': self.verts_nor,
+            b'vt': self.verts_tex,
+            b'vt2': self.verts_tex2,
+            b'vt3': self.verts_tex3,
+            b'vt4': self.verts_tex4,
+        }
+        verts_col = self.verts_col
+        face_offsets = self.face_offsets
+        face_loc = self.face_loc
+        face_nor = self.face_nor
+        face_tex = self.face_tex
+        face_tex2 = self.face_tex2
+        face_tex3 = self.face_tex3
+        face_tex4 = self.face_tex4
+        face_material = self.face_material
+        face_smooth_group = self.face_smooth_group
+        face_object = self.face_object
+        face_flags = self.face_flags
+        material_keys = self.material_keys
+        smooth_group_keys = self.smooth_group_keys
+        object_keys = self.object_keys
+        vertex_groups = self.vertex_groups
+        unique_materials = self.unique_materials
+        unique_smooth_groups = self.unique_smooth_groups
+        use_default_material = self.use_default_material
+
+        context_material = self.context_material
+        context_smooth_group = self.context_smooth_group
+        context_object_key = self.context_object_key
+        context_object_obpart = self.context_object_obpart
+        context_vgroup = self.context_vgroup
+        objects_names = self.objects_names
+        voxel_grid = self.voxel_grid
+
+        for event in events:
+            event_type = type(event)
+
+            if event_type is VertexBlock:
+                if voxel_grid is not None:
+                    if event.tag == b'v':
+                        voxel_grid.add(event.values, event.colors)
+                else:
+                    verts[event.tag] += event.values
+                    verts_col += event.colors
+
+            elif voxel_grid is not None and event_type in (FaceBlock, PolylineBlock, Nurbs):
+                continue
+
+            elif event_type is FaceBlock or (event_type is PolylineBlock and use_edges):
+                if context_material is None:
+                    use_default_material = True
+                num_faces = len(event.sizes)
+                ends = np.cumsum(np.frombuffer(event.sizes, dtype=np.int32), dtype=np.int64)
+                ends += face_offsets[-1]
+                face_offsets.frombytes(ends.tobytes())
+                face_loc += event.loc
+                if event_type is FaceBlock:
+                    face_nor += event.nor
+                    face_tex += event.tex
+                    face_tex2 += event.tex2
+                    face_tex3 += event.tex3
+                    face_tex4 += event.tex4
+                    face_flags += array('B', (0,)) * num_faces
+                    # Add the vertices to the current group
+                    # *warning*, this wont work for files that have groups defined around verts
+                    if use_groups_as_vgroups and context_vgroup:
+                        vertex_groups[context_vgroup] += event.loc
+                else:
+                    padding = array('i', (0,)) * len(event.loc)
+                    face_nor += padding
+                    face_tex += padding
+                    face_tex2 += padding
+                    face_tex3 += padding
+                    face_tex4 += padding
+                    face_flags += array('B', (FACE_POLYLINE,)) * num_faces
+                face_material += array('i', (material_keys.setdefault(context_material, len(material_keys)),)) * num_faces
+                face_smooth_group += array('i', (smooth_group_keys.setdefault(context_smooth_group,
+                                                                              len(smooth_group_keys)),)) * num_faces
+                face_object += array('i', (object_keys.setdefault(context_object_key, len(object_keys)),)) * num_faces
+
+            elif event_type is SmoothGroup:
+                if use_smooth_groups:
+                    context_smooth_group = event.name
+                    if context_smooth_group == b'off':
+                        context_smooth_group = None
+                    elif context_smooth_group:  # is not None
+                        unique_smooth_groups[context_smooth_group] = None
+
+            elif event_type is Object:
+                if use_split_objects:
+                    context_object_key = unique_name(objects_names, event.name)
+                    context_object_obpart = context_object_key
+                    # unique_objects[context_object_key]= None
+
+            elif event_type is Group:
+                if use_split_groups:
+                    grppart = event.name
+                    context_object_key = (context_object_obpart, grppart) if context_object_obpart else grppart
+                    # print 'context_object_key', context_object_key
+                    # unique_objects[context_object_key]= None
+                elif use_groups_as_vgroups:
+                    context_vgroup = event.name
+                    if context_vgroup and context_vgroup != b'(null)':
+                        vertex_groups.setdefault(context_vgroup, [])
+                    else:
+                        context_vgroup = None  # dont assign a vgroup
+
+            elif event_type is UseMaterial:
+                context_material = event.name
+                unique_materials[context_material] = None
+
+            elif event_type is MaterialLib:
+                self.material_libs.update(event.filenames)
+                if self.on_material_lib is not None:
+                    for filename in event.filenames:
+                        self.on_material_lib(filename)
+
+            elif event_type is Nurbs:
+                # Add the nurbs curve
+                if context_object_key:
+                    event.curve[b'name'] = context_object_key
+                self.nurbs.append(event.curve)
+
+        self.use_default_material = use_default_material
+        self.context_material = context_material
+        self.context_smooth_group = context_smooth_group
+        self.context_object_key = context_object_key
+        self.context_object_obpart = context_object_obpart
+        self.context_vgroup = context_vgroup
+        return self
+
+
+def parse(filepath, *, processes=1, decimal_comma=None, i3d_dialect=False, on_material_lib=None, on_progress=None,
+          voxel_grid=None, **options):
+    """
+    Parses the whole file and returns its OBJxData, options being the ones of OBJxData.read().
+    filepath can also be the content of a file, as a memoryview or a binary file object, parsed in a single pass.
+    decimal_comma and i3d_dialect are given to the tokenizer, see objx_tokenizer.OBJxTokenizer.
+    With processes > 1, big files are parsed in chunks by that many worker processes;
+    the result is the same as the one of a single process.
+    on_material_lib is called with the file name of each material library as soon as it is met,
+    see OBJxData.on_material_lib.
+    on_progress is called with the amount of bytes parsed so far, after each window of a single process parsing,
+    and every PARALLEL_POLL_INTERVAL seconds while the worker processes run, see
+    objx_tokenizer.OBJxTokenizer.on_progress. Raising from it stops the parsing, the worker processes included.
+    With voxel_grid (an objx_voxel.VoxelGrid), the file is parsed in a single process and its vertices are
+    downsampled by the grid while they are parsed, the result having the vertices of the grid and no faces.
+    """
+    if (voxel_grid is None and processes > 1 and isinstance(filepath, (str, bytes, os.PathLike)) and
+            os.path.getsize(filepath) >= PARALLEL_MIN_SIZE):
+        data = parse_parallel(filepath, processes, decimal_comma, i3d_dialect, options, on_material_lib, on_progress)
+        if data is not None:
+            if on_progress is not None:
+                on_progress(os.path.getsize(filepath))
+            return data
+    tokenizer = objx_tokenizer.OBJxTokenizer(decimal_comma=decimal_comma, i3d_dialect=i3d_dialect)
+    tokenizer.on_progress = on_progress
+    data = OBJxData()
+    data.on_material_lib = on_material_lib
+    data.voxel_grid = voxel_grid
+    data.read(tokenizer.tokenize(filepath), **options)
+    data.on_material_lib = None
+    if voxel_grid is not None:
+        data.voxel_grid = None
+        verts_loc, verts_col = voxel_grid.result()
+        data.verts_loc = array('f', verts_loc.tobytes())
+        data.verts_col = array('f', verts_col.tobytes())
+    data.decimal_comma = bool(tokenizer.decimal_comma)
+    data.warnings = tokenizer.warnings
+    return data
+
+
+# Worker processes cannot import this package as is when they do not run inside Blender
+# (its __init__ registers Blender operators), register a bare package module instead.
+_WORKER_INIT = """
+import sys, types
+if %(package)r not in sys.modules:
+    package = types.ModuleType(%(package)r)
+    package.__path__ = [%(path)r]
+    sys.modules[%(package)r] = package
+"""
+
+
+def worker_init():
+    """
+    Returns the code run by worker processes before anything of this package is unpickled in them.
+    """
+    return _WORKER_INIT % {"package": __package__, "path": os.path.dirname(__file__)} if __package__ else ""
+
+
+def parse_chunk(filepath, start, end, data, tokenizer, options):
+    """
+    Worker process side of parse_parallel(): parses bytes [start, end) of the file into data.
+    """
+    data.read(tokenizer.tokenize(filepath, start, end), **options)
+    return data, tokenizer
+
+
+def _first_decimal_comma(lines, vert_tags):
+    """
+    Tells whether the vertex lines of lines (an objx_reader.OBJxLines) use a decimal comma,
+    according to the first one with a decimal separator.
+    """
+    for tag, r0, r1 in lines.runs():
+        if tag in vert_tags:
+            for b0 in range(r0, r1, objx_tokenizer.BLOCK_SIZE):
+                decimal_comma = lines.find_decimal_comma(b0, min(b0 + objx_tokenizer.BLOCK_SIZE, r1))
+                if decimal_comma is not None:
+                    return decimal_comma
+    return False
+
+
+def parse_parallel(filepath, processes, decimal_comma, i3d_dialect, options, on_material_lib=None, on_progress=None):
+    """
+    Parses the file in chunks of lines, in processes worker processes.
+    Returns None if the file cannot be parsed that way, and has to be parsed in a single process.
+    The material libraries are met before the chunks are parsed, on_progress is called while they are, see parse().
+    """
+    with objx_reader.OBJxReader(filepath) as reader:
+        tags = reader.line_tags
+        cont = reader.line_cont
+        num_lines = len(reader)
+
+        # Chunk boundaries, moved forward so that multi-line records are never split.
+        bounds = [0]
+        for i in range(1, processes):
+            i = num_lines * i // processes
+            while i < num_lines and cont[i - 1]:
+                i += 1
+            if bounds[-1] < i < num_lines:
+                bounds.append(i)
+        bounds.append(num_lines)
+        if len(bounds) < 3:
+            return None
+
+        # The chunk contexts are guessed from the line tags, which miss indented records.
+        other = np.flatnonzero(tags == objx_reader.TAG_OTHER)
+        starts = reader.line_starts[other]
+        other = other[(reader.line_ends[other] > starts) & objx_reader.IS_SPACE[reader.data[starts]]]
+        for i in other.tolist():
+            line_split = next(reader.lines(i, i + 1)).split()
+            if line_split and line_split[0] in objx_reader.RECORD_NAMES:
+                return None
+
+        # Parse the context lines (usemtl, s, o, g) alone beforehand, to know the initial context of each chunk,
+        # and the mtllib lines, to give on_material_lib the material libraries right away.
+        # The amount of vertices before each chunk are directly counted from the line tags.
+        tag_names = {name: tag for tag, name in objx_reader.TAG_NAMES.items()}
+        vert_tags = [tag_names[name] for name in objx_tokenizer.VERT_LENS]
+        if decimal_comma is None:
+            decimal_comma = _first_decimal_comma(reader, vert_tags)
+        context_lines = np.flatnonzero(np.isin(tags, (objx_reader.TAG_USEMTL, objx_reader.TAG_S,
+                                                      objx_reader.TAG_O, objx_reader.TAG_G,
+                                                      objx_reader.TAG_MTLLIB)))
+        data = OBJxData()
+        data.on_material_lib = on_material_lib
+        tokenizer = objx_tokenizer.OBJxTokenizer(decimal_comma=decimal_comma, i3d_dialect=i3d_dialect)
+        verts_counts = [0] * len(vert_tags)
+        chunks = []
+        for i0, i1 in zip(bounds[:-1], bounds[1:]):
+            chunk_tokenizer = tokenizer.continuation(verts_counts)
+            chunk_tokenizer.line_base = i0
+            chunks.append((int(reader.line_starts[i0]), int(reader.line_ends[i1 - 1]) + 1,
+                           data.continuation(), chunk_tokenizer))
+            for i in context_lines[np.searchsorted(context_lines, i0):np.searchsorted(context_lines, i1)].tolist():
+                data.read(tokenizer.tokenize_lines(reader, i, i + 1), **options)
+            chunk_tags = tags[i0:i1]
+            verts_counts = [n + int(np.count_nonzero(chunk_tags == tag)) for n, tag in zip(verts_counts, vert_tags)]
+
+    # Leaving the pool terminates the worker processes, when on_progress raises to cancel the parsing.
+    with multiprocessing.Pool(len(chunks), initializer=exec, initargs=(worker_init(),)) as pool:
+        pending = [pool.apply_async(parse_chunk, (filepath, *chunk, options)) for chunk in chunks]
+        results = []
+        done = 0
+        for (start, end, *chunk_context), result in zip(chunks, pending):
+            while not result.ready():
+                result.wait(PARALLEL_POLL_INTERVAL)
+                if on_progress is not None:
+                    on_progress(done)
+            results.append(result.get())
+            done += end - start
+            if on_progress is not None:
+                on_progress(done)
+
+    # Vertex records spanning several lines, or files with too many quick parsing failures,
+    # make the guessed chunk contexts wrong, these need a regular single process parsing.
+    data, tokenizer = results[0]
+    warnings = tokenizer.warnings
+    quick_vert_failures = tokenizer.quick_vert_failures
+    for (start, end, expected_data, expected_tokenizer), (chunk_data, chunk_tokenizer) in zip(chunks[1:], results[1:]):
+        if tokenizer.state() != expected_tokenizer.state() or data.context() != expected_data.context():
+            return None
+        data.extend(chunk_data)
+        tokenizer = chunk_tokenizer
+        warnings.extend(tokenizer.warnings)
+        quick_vert_failures += tokenizer.quick_vert_failures
+    if quick_vert_failures > objx_tokenizer.QUICK_VERT_MAX_FAILURES:
+        return None
+    data.decimal_comma = decimal_comma
+    data.warnings = warnings
+    return data
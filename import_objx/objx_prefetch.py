@@ -0,0 +1,130 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+"""
+Background reading of the MTL libraries of an OBJx file and of their images, independent from Blender.
+
+The materials are only created once the geometry is parsed, reading each MTL library and image one after
+another at that point puts all their I/O latency (seconds on network storage) on the critical path.
+MaterialPrefetch reads them in a few threads as soon as the parser meets their mtllib line instead,
+so that creating the materials only has to make the Blender datablocks.
+Images on disk are read to have them in the system file cache when Blender loads them,
+images of zip bundles are kept in memory until they are packed.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Amount of threads reading the MTL libraries and images.
+PREFETCH_THREADS = 4
+
+# Size of the reads of images on disk, which are only read to be cached by the system.
+READ_SIZE = 1 << 20
+
+# MTL directives giving an image, see create_materials().
+MAP_DIRECTIVES = {b'map_ka', b'map_ks', b'map_kd', b'map_ke', b'map_bump', b'bump', b'map_d', b'map_tr',
+                  b'map_disp', b'disp', b'map_refl', b'refl'}
+
+
+def image_paths(line):
+    """
+    Returns the paths obj_image_load() looks for the image of the MTL line (a map_* directive) at:
+    the quoted path, or the trailing space-separated items of the line, and these with spaces instead of '_'.
+    """
+    start = line.find(b'"') + 1
+    if start != 0:
+        end = line.find(b'"', start)
+        parts = (line[start:end],)
+    else:
+        parts = line.split(b' ')
+    paths = []
+    for i in range(-1, -len(parts), -1):
+        path = os.fsdecode(b" ".join(parts[i:]))
+        paths.append(path)
+        if "_" in path:
+            paths.append(path.replace("_", " "))
+    if not paths:
+        paths.append(os.fsdecode(parts[-1]))
+    return paths
+
+
+class MaterialPrefetch:
+    """
+    MTL libraries, looked for next to the file at filepath (or in the zip bundle archive, an
+    objx_archive.OBJxArchive, when given), and their images, read in background threads.
+    The MTL library with the same name as the file, used when it exists, is read right away.
+    """
+
+    def __init__(self, filepath, archive=None, threads=PREFETCH_THREADS):
+        self.dirname = os.path.dirname(filepath)
+        self.archive = archive
+        self.executor = ThreadPoolExecutor(threads, thread_name_prefix="objx_prefetch")
+        self._libraries = {}
+        self._images = {}
+        self.add_library(os.path.splitext(os.path.basename(filepath))[0] + ".mtl")
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self._libraries.clear()
+        self._images.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def add_library(self, libname):
+        """
+        Starts reading the MTL library libname, and then its images, unless it is already read.
+        """
+        if libname not in self._libraries:
+            self._libraries[libname] = self.executor.submit(self._read_library, os.path.join(self.dirname, libname))
+
+    def add_libraries(self, libnames):
+        for libname in libnames:
+            self.add_library(libname)
+
+    def library(self, libname):
+        """
+        Returns the content of the MTL library libname, or None if it does not exist.
+        """
+        self.add_library(libname)
+        return self._libraries[libname].result()
+
+    def read(self, path):
+        """
+        Returns the content of the image at path in the zip bundle, or None if it is not in it.
+        """
+        future = self._images.pop(path, None)
+        return self.archive.read(path) if future is None else future.result()
+
+    def _read_library(self, mtlpath):
+        try:
+            if self.archive is None:
+                with open(mtlpath, 'rb') as f:
+                    content = f.read()
+            else:
+                content = self.archive.read(mtlpath)
+        except OSError:
+            return None
+        if content is not None:
+            for line in content.splitlines():
+                line = line.strip()
+                line_split = line.split()
+                if len(line_split) > 1 and line_split[0].lower() in MAP_DIRECTIVES:
+                    for path in image_paths(line):
+                        path = os.path.join(self.dirname, path)
+                        if path not in self._images:
+                            self._images[path] = self.executor.submit(self._read_image, path)
+        return content
+
+    def _read_image(self, path):
+        try:
+            if self.archive is not None:
+                return self.archive.read(path)
+            with open(path, 'rb') as f:
+                while f.read(READ_SIZE):
+                    pass
+        except OSError:
+            pass
+        return None
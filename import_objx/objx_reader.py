@@ -0,0 +1,387 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+"""
+Memory-mapped reader for OBJx files.
+
+The file is scanned once for line breaks, and every line gets a tag from its first bytes
+(v/vt/vt2/vt3/vt4/vn/f/l/g/o/s/usemtl/mtllib/other), all of it with vectorized numpy operations.
+The importer can then work on runs of same-tagged lines instead of going through the file line by line.
+"""
+
+import mmap
+import os
+import warnings
+
+import numpy as np
+
+
+# Line tags.
+TAG_OTHER = 0
+TAG_V = 1
+TAG_VT = 2
+TAG_VT2 = 3
+TAG_VT3 = 4
+TAG_VT4 = 5
+TAG_VN = 6
+TAG_F = 7
+TAG_L = 8
+TAG_G = 9
+TAG_O = 10
+TAG_S = 11
+TAG_USEMTL = 12
+TAG_MTLLIB = 13
+
+TAG_NAMES = {
+    TAG_OTHER: b'',
+    TAG_V: b'v',
+    TAG_VT: b'vt',
+    TAG_VT2: b'vt2',
+    TAG_VT3: b'vt3',
+    TAG_VT4: b'vt4',
+    TAG_VN: b'vn',
+    TAG_F: b'f',
+    TAG_L: b'l',
+    TAG_G: b'g',
+    TAG_O: b'o',
+    TAG_S: b's',
+    TAG_USEMTL: b'usemtl',
+    TAG_MTLLIB: b'mtllib',
+}
+
+VERT_TAGS = {TAG_V, TAG_VT, TAG_VT2, TAG_VT3, TAG_VT4, TAG_VN}
+
+# Records the line tags stand for, missed by them when indented.
+RECORD_NAMES = set(TAG_NAMES.values()) - {b''}
+
+# Lookup table of the bytes considered as whitespace by bytes.split().
+IS_SPACE = np.zeros(256, dtype=bool)
+IS_SPACE[np.frombuffer(b' \t\n\r\x0b\x0c', dtype=np.uint8)] = True
+
+# Keep temporary arrays of the vectorized scans to a reasonable size on huge files.
+SCAN_BLOCK_SIZE = 1 << 26
+CLASSIFY_BLOCK_SIZE = 1 << 20
+
+# Size of the parts of the file indexed at once when streaming through it.
+WINDOW_SIZE = 1 << 22
+
+
+def scan_lines(data):
+    """
+    Returns the (start, end) byte offsets of all lines in data (a uint8 array),
+    end being the offset of the line's newline char (or the end of data for the last line).
+    """
+    ends = [np.flatnonzero(data[i:i + SCAN_BLOCK_SIZE] == 10) + i for i in range(0, len(data), SCAN_BLOCK_SIZE)]
+    ends = np.concatenate(ends) if ends else np.empty(0, dtype=np.int64)
+    if len(data) and data[-1] != 10:
+        ends = np.append(ends, len(data))
+    starts = np.empty_like(ends)
+    starts[:1] = 0
+    starts[1:] = ends[:-1] + 1
+    return starts, ends
+
+
+def _bytes_at(data, starts, ends, count):
+    """Returns the first count bytes of each line as a list of arrays, with zeros past the end of the line."""
+    last = len(data) - 1
+    return [np.where(starts + i < ends, data[np.minimum(starts + i, last)], 0) for i in range(count)]
+
+
+def _is_space(b):
+    return (b == 32) | (b == 9)
+
+
+def classify_lines(data, starts, ends):
+    """
+    Returns the tag of each line (see TAG_ constants), and whether it ends with a '\\' continuation char.
+    Lines with leading whitespace are tagged as TAG_OTHER, and left to the generic per-line parsing.
+    """
+    tags = np.zeros(len(starts), dtype=np.uint8)
+    cont = np.zeros(len(starts), dtype=bool)
+    kw_usemtl = np.frombuffer(b'usemtl', dtype=np.uint8)
+    kw_mtllib = np.frombuffer(b'mtllib', dtype=np.uint8)
+
+    for i in range(0, len(starts), CLASSIFY_BLOCK_SIZE):
+        s = starts[i:i + CLASSIFY_BLOCK_SIZE]
+        e = ends[i:i + CLASSIFY_BLOCK_SIZE]
+        b = _bytes_at(data, s, e, 7)
+        t = tags[i:i + CLASSIFY_BLOCK_SIZE]
+
+        is_v = b[0] == ord('v')
+        is_vt = is_v & (b[1] == ord('t'))
+        t[is_v & _is_space(b[1])] = TAG_V
+        t[is_vt & _is_space(b[2])] = TAG_VT
+        t[is_vt & (b[2] == ord('2')) & _is_space(b[3])] = TAG_VT2
+        t[is_vt & (b[2] == ord('3')) & _is_space(b[3])] = TAG_VT3
+        t[is_vt & (b[2] == ord('4')) & _is_space(b[3])] = TAG_VT4
+        t[is_v & (b[1] == ord('n')) & _is_space(b[2])] = TAG_VN
+        for char, tag in ((b'f', TAG_F), (b'l', TAG_L), (b'g', TAG_G), (b'o', TAG_O), (b's', TAG_S)):
+            t[(b[0] == ord(char)) & _is_space(b[1])] = tag
+        head = np.stack(b[:6], axis=1)
+        t[np.all(head == kw_usemtl, axis=1) & _is_space(b[6])] = TAG_USEMTL
+        t[np.all(head == kw_mtllib, axis=1) & _is_space(b[6])] = TAG_MTLLIB
+
+        # Strip trailing whitespace, and check for a '\' at the end of the line.
+        e = e.copy()
+        todo = np.flatnonzero(e > s)
+        while len(todo):
+            todo = todo[IS_SPACE[data[e[todo] - 1]]]
+            e[todo] -= 1
+            todo = todo[e[todo] > s[todo]]
+        has_chars = e > s
+        cont[i:i + CLASSIFY_BLOCK_SIZE][has_chars] = data[e[has_chars] - 1] == 92
+
+    return tags, cont
+
+
+class OBJxLines:
+    """
+    Line offsets table and line tags of the lines of bytes [start, end) of buffer, start being the start of a line.
+    Line offsets are relative to the start of buffer.
+    """
+
+    def __init__(self, buffer, start=0, end=None):
+        self.buffer = buffer
+        self.data = np.frombuffer(buffer, dtype=np.uint8)
+        self.line_starts, self.line_ends = scan_lines(self.data[start:end])
+        self.line_starts += start
+        self.line_ends += start
+        self.line_tags, self.line_cont = classify_lines(self.data, self.line_starts, self.line_ends)
+
+    def close(self):
+        # A memory mapping cannot be closed while numpy still references it.
+        self.data = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return len(self.line_starts)
+
+    def runs(self, i0=0, i1=None):
+        """
+        Yields (tag, first_line, end_line) for each run of consecutive lines sharing the same tag,
+        within lines [i0, i1).
+        """
+        if i1 is None:
+            i1 = len(self)
+        tags = self.line_tags[i0:i1]
+        if not len(tags):
+            return
+        bounds = (np.flatnonzero(tags[1:] != tags[:-1]) + 1 + i0).tolist()
+        for r0, r1 in zip([i0] + bounds, bounds + [i1]):
+            yield int(self.line_tags[r0]), r0, r1
+
+    def lines(self, i0, i1):
+        """
+        Yields the content of lines [i0, i1), without their newline char.
+        """
+        buffer = self.buffer
+        for start, end in zip(self.line_starts[i0:i1].tolist(), self.line_ends[i0:i1].tolist()):
+            yield buffer[start:end]
+
+    def field_counts(self, i0=0, i1=None):
+        """
+        Returns the amount of whitespace separated fields (the tag included) of each line of lines [i0, i1).
+        """
+        if i1 is None:
+            i1 = len(self)
+        if i0 >= i1:
+            return np.zeros(0, dtype=np.int64)
+        start = self.line_starts[i0]
+        is_field = ~IS_SPACE[self.data[start:self.line_ends[i1 - 1]]]
+        # Amount of fields started before each byte.
+        fields_before = np.zeros(len(is_field) + 1, dtype=np.int64)
+        np.cumsum(is_field[1:] & ~is_field[:-1], out=fields_before[2:])
+        fields_before[1:] += is_field[:1]
+        return fields_before[self.line_ends[i0:i1] - start] - fields_before[self.line_starts[i0:i1] - start]
+
+    def find_decimal_comma(self, i0, i1):
+        """
+        Tells whether lines [i0, i1) use a decimal comma, according to the first of them with a ',' or a '.'.
+        Returns None if none of them has any.
+        """
+        start = self.line_starts[i0]
+        data = self.data[start:self.line_ends[i1 - 1]]
+        first_comma = int(np.argmax(data == ord(','))) if ord(',') in data else len(data)
+        first_dot = int(np.argmax(data == ord('.'))) if ord('.') in data else len(data)
+        if first_comma == first_dot:
+            return None
+        # A comma on the same line as the first dot wins.
+        line_end = self.line_ends[i0 + int(np.searchsorted(self.line_ends[i0:i1] - start, first_dot))] - start
+        return bool(first_comma < line_end)
+
+    def vert_block(self, i0, i1, decimal_comma=False):
+        """
+        Parses lines [i0, i1), all single-line vertex records of the same tag, in one go.
+        Returns a (n, ncols) float32 array of their values, ncols being the largest amount of values on a line
+        (shorter lines are padded with zeros), and the (n,) array of the actual amount of values of each line.
+        Raises ValueError if these lines hold anything else than numbers.
+        """
+        start = self.line_starts[i0]
+        end = self.line_ends[i1 - 1]
+        line_starts = self.line_starts[i0:i1] - start
+        tag_len = len(TAG_NAMES[int(self.line_tags[i0])])
+
+        data = self.data[start:end].copy()
+        # Count the values of each line, i.e. the whitespace-separated tokens minus the tag.
+        is_space = IS_SPACE[data]
+        token_starts = ~is_space
+        token_starts[1:] &= is_space[:-1]
+        ncols = np.add.reduceat(token_starts, line_starts, dtype=np.int64) - 1
+
+        data[line_starts[:, None] + np.arange(tag_len)] = 32
+        if decimal_comma:
+            data[data == ord(',')] = ord('.')
+        try:
+            with warnings.catch_warnings():
+                # Older numpy only warns (and returns a truncated array) on unparsable data.
+                warnings.simplefilter('error', DeprecationWarning)
+                values = np.fromstring(data.tobytes(), dtype=np.float32, sep=' ')
+        except DeprecationWarning as e:
+            raise ValueError(str(e))
+        if values.size != ncols.sum():
+            raise ValueError("malformed vertex block")
+
+        ncols_max = int(ncols.max())
+        if ncols.min() == ncols_max:
+            return values.reshape(-1, ncols_max), ncols
+
+        block = np.zeros((len(ncols), ncols_max), dtype=np.float32)
+        offsets = np.cumsum(ncols) - ncols
+        for col in range(ncols_max):
+            mask = ncols > col
+            block[mask, col] = values[offsets[mask] + col]
+        return block, ncols
+
+    def face_block(self, i0, i1):
+        """
+        Parses lines [i0, i1), all single-line face records, in one go.
+        Returns the (n, 3) int64 array of the v/vt/vn indices of their n corners, one line after the other,
+        as written in the file (0 for empty slots), and the (n_lines,) array of the amount of corners of each line.
+        Raises ValueError if these lines hold anything else than corners of 1 to 3 integers,
+        or a corner without vertex index.
+        """
+        start = self.line_starts[i0]
+        end = self.line_ends[i1 - 1]
+        line_starts = self.line_starts[i0:i1] - start
+        tag_len = len(TAG_NAMES[int(self.line_tags[i0])])
+
+        # A trailing space, so that a slot after a '/' always starts somewhere.
+        data = np.empty(end - start + 1, dtype=np.uint8)
+        data[:-1] = self.data[start:end]
+        data[-1] = 32
+        data[line_starts[:, None] + np.arange(tag_len)] = 32
+        is_space = IS_SPACE[data]
+        is_slash = data == ord('/')
+
+        # Corners are the whitespace-separated tokens, slots start at the start of a corner and after each '/'.
+        corner_starts = ~is_space
+        corner_starts[1:] &= is_space[:-1]
+        sizes = np.add.reduceat(corner_starts, line_starts, dtype=np.int64)
+        if not len(sizes) or sizes.min() < 1:
+            raise ValueError("face without corners")
+        slot_starts = corner_starts.copy()
+        slot_starts[1:] |= is_slash[:-1]
+        slots = np.flatnonzero(slot_starts)
+        slot_corners = np.cumsum(corner_starts)[slots] - 1
+        corners_first_slot = np.flatnonzero(corner_starts[slots])
+        slot_cols = np.arange(len(slots)) - corners_first_slot[slot_corners]
+        if slot_cols.max() > 2:
+            raise ValueError("too many indices in a face corner")
+        slot_set = ~(is_space[slots] | is_slash[slots])
+
+        data[is_slash] = 32
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter('error', DeprecationWarning)
+                values = np.fromstring(data.tobytes(), dtype=np.int64, sep=' ')
+        except DeprecationWarning as e:
+            raise ValueError(str(e))
+        if values.size != np.count_nonzero(slot_set):
+            raise ValueError("malformed face block")
+
+        indices = np.zeros((len(corners_first_slot), 3), dtype=np.int64)
+        indices[slot_corners[slot_set], slot_cols[slot_set]] = values
+        if np.count_nonzero(slot_set & (slot_cols == 0)) != len(indices):
+            raise ValueError("face corner without vertex index")
+        return indices, sizes
+
+
+class OBJxReader(OBJxLines):
+    """
+    Read-only, memory-mapped OBJx file, with its line offsets table and line tags.
+    Only the lines of bytes [start, end) of the file are indexed when given.
+    """
+
+    def __init__(self, filepath, start=0, end=None):
+        self.file = open(filepath, 'rb')
+        super().__init__(_map_file(self.file), start, end)
+
+    def close(self):
+        super().close()
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
+        self.file.close()
+
+
+def _map_file(file):
+    if os.fstat(file.fileno()).st_size:
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    return b''  # Empty files cannot be mapped.
+
+
+def iter_windows(source, start=0, end=None, window_size=WINDOW_SIZE):
+    """
+    Yields OBJxLines of consecutive parts of source, of about window_size bytes each and ending on a line end,
+    so that only one part of the file is indexed at a time.
+    source is either a file path, in which case bytes [start, end) of the file are memory-mapped,
+    a memoryview of the content of a file, copied one part at a time,
+    or a binary file object, read from its current position to its end.
+    """
+    if isinstance(source, memoryview):
+        view = source.cast('B')
+        yield from _iter_chunk_windows(view[i:i + window_size].tobytes() for i in range(0, len(view), window_size))
+        return
+    if not isinstance(source, (str, bytes, os.PathLike)):
+        yield from _iter_chunk_windows(iter(lambda: source.read(window_size), b''))
+        return
+
+    with open(source, 'rb') as file:
+        buffer = _map_file(file)
+        try:
+            if end is None:
+                end = len(buffer)
+            while start < end:
+                stop = min(start + window_size, end)
+                if stop < end:
+                    cut = buffer.rfind(b'\n', start, stop)
+                    if cut == -1:  # Line longer than a window.
+                        cut = buffer.find(b'\n', stop, end)
+                    stop = end if cut == -1 else cut + 1
+                with OBJxLines(buffer, start, stop) as lines:
+                    yield lines
+                if hasattr(mmap, 'MADV_DONTNEED'):
+                    # Do not keep pages of the parts already done in memory.
+                    page_start = start - start % mmap.PAGESIZE
+                    buffer.madvise(mmap.MADV_DONTNEED, page_start, stop - page_start)
+                start = stop
+        finally:
+            if isinstance(buffer, mmap.mmap):
+                buffer.close()
+
+
+def _iter_chunk_windows(chunks):
+    rest = b''
+    for chunk in chunks:
+        chunk = rest + chunk
+        cut = chunk.rfind(b'\n') + 1
+        rest = chunk[cut:]
+        if cut:
+            with OBJxLines(chunk[:cut]) as lines:
+                yield lines
+    if rest:
+        with OBJxLines(rest) as lines:
+            yield lines
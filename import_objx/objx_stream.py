@@ -0,0 +1,457 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+"""
+Two-pass streaming parsing of OBJx files bigger than the memory, independent from Blender.
+
+The first pass goes through the file window by window, only parsing the lines that are not vertices or faces:
+it splits the file into blocks of lines, each one starting after an o (or g) line, and records the byte range
+of each block, the amount of vertices of each kind before it and the parsing context at its start.
+The second pass then parses the blocks of each object one object after the other, so that only one object
+is in memory at a time. Vertices used by an object but defined in another one are read back from the file:
+the first pass also records the vertex counts at the start of each of its windows, so that only the windows
+holding them are read again, and only their lines of these vertices are parsed.
+
+The index of the first pass can be written next to the file, so that importing some objects of the file again
+only needs the second pass for those objects.
+"""
+
+import ast
+import collections
+import multiprocessing
+import os
+import pickle
+from array import array
+
+import numpy as np
+
+if __package__:
+    from . import objx_parse, objx_reader, objx_tokenizer
+else:
+    import objx_parse, objx_reader, objx_tokenizer  # Used as a standalone module, outside of Blender.
+
+
+VERT_TAGS = tuple(objx_tokenizer.VERT_LENS)
+
+# OBJxData vertices and face indices attributes of each kind of vertices.
+VERT_ATTRS = {
+    b'v': ("verts_loc", "face_loc"),
+    b'vn': ("verts_nor", "face_nor"),
+    b'vt': ("verts_tex", "face_tex"),
+    b'vt2': ("verts_tex2", "face_tex2"),
+    b'vt3': ("verts_tex3", "face_tex3"),
+    b'vt4': ("verts_tex4", "face_tex4"),
+}
+
+# OBJxData parsing context at the start of a block, objects_names is only needed by the first pass.
+BLOCK_CONTEXT_ATTRS = tuple(attr for attr in objx_parse.OBJxData.context_attrs if attr != "objects_names")
+
+# Lines parsed by the first pass.
+CONTEXT_TAGS = (objx_reader.TAG_USEMTL, objx_reader.TAG_S, objx_reader.TAG_O, objx_reader.TAG_G,
+                objx_reader.TAG_MTLLIB, objx_reader.TAG_OTHER)
+
+# Index file, written next to the OBJx file by OBJxStream.cached_index().
+INDEX_EXT = ".index"
+INDEX_VERSION = 2
+# Attributes of OBJxStream written as they are in the index file.
+INDEX_ATTRS = ("decimal_comma", "i3d_dialect", "options", "bounds", "verts_counts", "lines_counts", "faces_counts",
+               "materials", "contexts", "nurbs_contexts", "objects", "use_default_material",
+               "window_bounds", "window_verts_counts")
+
+# Run by the worker processes of OBJxStream.iter_objects_parallel(), after objx_parse.worker_init(),
+# stream being the pickled OBJxStream.
+_WORKER_STREAM_INIT = """
+import importlib, pickle
+importlib.import_module(%(module)r)._worker_stream = pickle.loads(stream)
+"""
+
+# OBJxStream of a worker process.
+_worker_stream = None
+
+
+class OBJxStream:
+    """
+    Block index of an OBJx file (the first pass), and what the whole file needs to be known beforehand:
+    its materials, material libraries and smooth groups, and whether it needs a default material.
+    Use OBJxStream.index() to build it.
+    """
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self.decimal_comma = False
+        self.i3d_dialect = False
+        self.options = {}
+
+        # Byte offset of the start of each block, and the end of the file.
+        self.bounds = [0]
+        # Amount of vertices of each kind before each block, and in the whole file, one row per block.
+        self.verts_counts = [[0] * len(VERT_TAGS)]
+        # Amount of lines before each block, and in the whole file.
+        self.lines_counts = [0]
+        # Amount of faces (and polylines) of each block, and the materials they use (None for the default one).
+        self.faces_counts = []
+        self.materials = [[]]
+        # OBJxData context, and tokenizer nurbs context (context_nurbs, context_parm), at the start of each block.
+        self.contexts = [dict.fromkeys(BLOCK_CONTEXT_ATTRS)]
+        self.nurbs_contexts = [({}, b'')]
+        # Blocks of each object, the objects being in the order of their first face.
+        self.objects = []
+        # Byte offset of the start of each window of the first pass, and the end of the file,
+        # and the amount of vertices of each kind before each window, see fetch_verts().
+        self.window_bounds = []
+        self.window_verts_counts = []
+
+        self.use_default_material = False
+        self.unique_materials = {}
+        self.unique_smooth_groups = {}
+        self.material_libs = set()
+
+    @classmethod
+    def index(cls, filepath, *, decimal_comma=None, i3d_dialect=False, **options):
+        """
+        First pass over the file, options being the ones of OBJxData.read().
+        Returns None if the file cannot be streamed: it needs faces, and its records have to be single-line ones,
+        starting at the beginning of their line.
+        """
+        stream = cls(filepath)
+        stream.i3d_dialect = i3d_dialect
+        stream.options = options
+        file_size = os.path.getsize(filepath)
+        block_tags = []
+        if options.get("use_split_objects", True):
+            block_tags.append(objx_reader.TAG_O)
+        if options.get("use_split_groups", False):
+            block_tags.append(objx_reader.TAG_G)
+        tag_names = {name: tag for tag, name in objx_reader.TAG_NAMES.items()}
+        vert_tags = [tag_names[name] for name in VERT_TAGS]
+        geometry_tags = [objx_reader.TAG_F]
+        if options.get("use_edges", True):
+            geometry_tags.append(objx_reader.TAG_L)
+
+        data = objx_parse.OBJxData()
+        tokenizer = objx_tokenizer.OBJxTokenizer(decimal_comma=decimal_comma, i3d_dialect=i3d_dialect)
+        verts_counts = np.zeros(len(VERT_TAGS), dtype=np.int64)
+        line_base = 0
+        faces_count = 0
+        # Object key of each block.
+        blocks_key = [None]
+
+        for lines in objx_reader.iter_windows(filepath):
+            tags = lines.line_tags
+            if lines.line_cont.any():
+                return None
+            if len(lines):
+                stream.window_bounds.append(int(lines.line_starts[0]))
+                stream.window_verts_counts.append(verts_counts.tolist())
+            if tokenizer.decimal_comma is None:
+                tokenizer.decimal_comma = objx_parse._first_decimal_comma(lines, vert_tags) or None
+
+            # Lone vertex tags are not counted as vertices.
+            is_vert = np.isin(tags, vert_tags)
+            for i in np.flatnonzero(is_vert & (lines.line_ends - lines.line_starts < 8)).tolist():
+                if len(next(lines.lines(i, i + 1)).split()) == 1:
+                    return None
+
+            is_geometry = np.isin(tags, geometry_tags)
+            # Amount of faces before each line of the window.
+            faces_before = np.zeros(len(tags) + 1, dtype=np.int64)
+            np.cumsum(is_geometry, out=faces_before[1:])
+            faces_before += faces_count
+            # Amount of vertices of each kind before each line of the window.
+            verts_before = np.zeros((len(tags) + 1, len(VERT_TAGS)), dtype=np.int64)
+            for col, tag in enumerate(vert_tags):
+                np.cumsum(tags == tag, out=verts_before[1:, col])
+            verts_before += verts_counts
+
+            prev = 0
+            for i in np.flatnonzero(np.isin(tags, CONTEXT_TAGS)).tolist():
+                if tags[i] == objx_reader.TAG_OTHER:
+                    line_split = next(lines.lines(i, i + 1)).split()
+                    if not line_split:
+                        continue
+                    if line_split[0] in objx_reader.RECORD_NAMES:
+                        return None  # Indented record, missed by the line tags.
+                    if line_split[0] == b'curv':
+                        tokenizer.verts_counts.update(zip(VERT_TAGS, verts_before[i].tolist()))
+                if is_geometry[prev:i].any() and data.context_material not in stream.materials[-1]:
+                    stream.materials[-1].append(data.context_material)
+                prev = i
+                data.read(tokenizer.tokenize_lines(lines, i, i + 1), **options)
+
+                if tags[i] in block_tags:
+                    # The block starts after its o (or g) line, with the context that line gives.
+                    stream.bounds.append(min(int(lines.line_ends[i]) + 1, file_size))
+                    stream.verts_counts.append(verts_before[i].tolist())
+                    stream.lines_counts.append(line_base + i + 1)
+                    stream.faces_counts.append(int(faces_before[i]))
+                    stream.contexts.append({attr: getattr(data, attr) for attr in BLOCK_CONTEXT_ATTRS})
+                    stream.nurbs_contexts.append((dict(tokenizer.context_nurbs), tokenizer.context_parm))
+                    stream.materials.append([])
+                    blocks_key.append(data.context_object_key)
+
+            if is_geometry[prev:].any() and data.context_material not in stream.materials[-1]:
+                stream.materials[-1].append(data.context_material)
+            verts_counts = verts_before[-1]
+            faces_count = faces_before[-1]
+            line_base += len(lines)
+
+        if not faces_count:
+            return None
+        stream.bounds.append(file_size)
+        stream.window_bounds.append(file_size)
+        stream.verts_counts.append(verts_counts.tolist())
+        stream.lines_counts.append(line_base)
+        stream.faces_counts.append(int(faces_count))
+        stream.faces_counts = np.diff(stream.faces_counts, prepend=0).tolist()
+        stream.decimal_comma = bool(tokenizer.decimal_comma)
+        stream.unique_materials = data.unique_materials
+        stream.unique_smooth_groups = data.unique_smooth_groups
+        stream.material_libs = data.material_libs
+        stream.use_default_material = any(None in materials for materials in stream.materials)
+
+        # Repeated groups have several blocks, objects without faces come last.
+        objects = {}
+        for block, key in enumerate(blocks_key):
+            objects.setdefault(key, []).append(block)
+        stream.objects = sorted(objects.values(), key=lambda blocks: next(
+            (block for block in blocks if stream.faces_counts[block]), len(blocks_key) + blocks[0]))
+        return stream
+
+    @classmethod
+    def cached_index(cls, filepath, **kwargs):
+        """
+        Same as index(), reusing the index file next to the file when it is still valid,
+        and writing it otherwise. See read_index() and write_index().
+        """
+        index_path = filepath + INDEX_EXT
+        stream = cls.read_index(filepath, index_path, **kwargs)
+        if stream is None:
+            stream = cls.index(filepath, **kwargs)
+            if stream is not None:
+                try:
+                    stream.write_index(index_path)
+                except OSError:
+                    pass  # Read-only location, the index is only not reused.
+        return stream
+
+    def write_index(self, index_path):
+        """
+        Writes the index to index_path, as a Python literal, along with the size and modification time of the file.
+        """
+        stat = os.stat(self.filepath)
+        index = {attr: getattr(self, attr) for attr in INDEX_ATTRS}
+        index.update(version=INDEX_VERSION, size=stat.st_size, mtime_ns=stat.st_mtime_ns,
+                     unique_materials=list(self.unique_materials),
+                     unique_smooth_groups=list(self.unique_smooth_groups),
+                     material_libs=sorted(self.material_libs))
+        with open(index_path, 'w', encoding='utf-8') as f:
+            f.write(repr(index))
+
+    @classmethod
+    def read_index(cls, filepath, index_path, *, decimal_comma=None, i3d_dialect=False, **options):
+        """
+        Returns the index read from index_path, None if there is none, or if it does not match
+        the file (its size and modification time) or the given parsing options.
+        """
+        try:
+            with open(index_path, encoding='utf-8') as f:
+                index = ast.literal_eval(f.read())
+            stat = os.stat(filepath)
+            if (index["version"] != INDEX_VERSION or index["size"] != stat.st_size or
+                    index["mtime_ns"] != stat.st_mtime_ns or index["options"] != options or
+                    index["i3d_dialect"] != i3d_dialect or
+                    decimal_comma is not None and index["decimal_comma"] != decimal_comma):
+                return None
+            stream = cls(filepath)
+            for attr in INDEX_ATTRS:
+                setattr(stream, attr, index[attr])
+            stream.unique_materials = dict.fromkeys(index["unique_materials"])
+            stream.unique_smooth_groups = dict.fromkeys(index["unique_smooth_groups"])
+            stream.material_libs = set(index["material_libs"])
+        except (OSError, ValueError, SyntaxError, TypeError, KeyError, MemoryError, RecursionError):
+            return None
+        return stream
+
+    def __len__(self):
+        return len(self.bounds) - 1
+
+    def object_names(self):
+        """
+        Returns the name of each object, as split_mesh names their mesh.
+        """
+        filename = os.path.splitext(os.path.basename(self.filepath))[0]
+        return [objx_parse.key_to_name(self.contexts[blocks[0]]["context_object_key"], filename)
+                for blocks in self.objects]
+
+    def object_faces_counts(self):
+        """
+        Returns the amount of faces (and polylines) of each object.
+        """
+        return [sum(self.faces_counts[block] for block in blocks) for blocks in self.objects]
+
+    def select(self, name_filter):
+        """
+        Only keeps the objects whose name name_filter (see objx_parse.name_filter()) tells to keep,
+        and the materials they use.
+        """
+        self.objects = [blocks for blocks, name in zip(self.objects, self.object_names()) if name_filter(name)]
+        materials = {material for blocks in self.objects for block in blocks for material in self.materials[block]}
+        self.use_default_material = None in materials
+        self.unique_materials = {material: None for material in self.unique_materials if material in materials}
+
+    def iter_objects(self, **options):
+        """
+        Second pass over the file: yields the OBJxData of each object, options being the ones of OBJxData.read().
+        Its vertices are only the ones its faces and nurbs use, and their indices are relative to them,
+        see localize().
+        """
+        for blocks in self.objects:
+            yield self.read_object(blocks, **options)
+
+    def iter_objects_parallel(self, processes, queue_depth, **options):
+        """
+        Same as iter_objects(), the objects being parsed by processes worker processes while the ones already
+        parsed are used. At most queue_depth objects are parsed or waiting, besides the one being used,
+        so that the memory stays bounded however fast the workers are.
+        """
+        init = objx_parse.worker_init() + _WORKER_STREAM_INIT % {"module": __name__}
+        init_globals = {"stream": pickle.dumps(self)}
+        with multiprocessing.Pool(processes, initializer=exec, initargs=(init, init_globals)) as pool:
+            pending = collections.deque()
+            for blocks in self.objects:
+                pending.append(pool.apply_async(read_object, (blocks, options)))
+                if len(pending) > queue_depth:
+                    yield pending.popleft().get()
+            while pending:
+                yield pending.popleft().get()
+
+    def read_object(self, blocks, **options):
+        """
+        Parses the object made of blocks, and returns its OBJxData, see iter_objects().
+        """
+        data = objx_parse.OBJxData()
+        for block in blocks:
+            for attr, value in self.contexts[block].items():
+                setattr(data, attr, value)
+            tokenizer = objx_tokenizer.OBJxTokenizer(decimal_comma=self.decimal_comma,
+                                                     i3d_dialect=self.i3d_dialect)
+            tokenizer.verts_counts = dict(zip(VERT_TAGS, self.verts_counts[block]))
+            context_nurbs, tokenizer.context_parm = self.nurbs_contexts[block]
+            tokenizer.context_nurbs = dict(context_nurbs)
+            tokenizer.line_base = self.lines_counts[block]
+            data.read(tokenizer.tokenize(self.filepath, self.bounds[block], self.bounds[block + 1]), **options)
+            if list(tokenizer.verts_counts.values()) != self.verts_counts[block + 1]:
+                raise ValueError("vertex count mismatch at the end of block %d" % block)
+            data.warnings.extend(tokenizer.warnings)
+        data.decimal_comma = self.decimal_comma
+        self.localize(data, blocks)
+        return data
+
+    def localize(self, data, blocks):
+        """
+        Replaces the vertices of data, the OBJxData of blocks, by the ones its faces (and nurbs for verts_loc) use,
+        wherever they are defined in the file, and makes its face indices relative to them.
+        Kinds of vertices the file has none of are left as they are.
+        """
+        for col, tag in enumerate(VERT_TAGS):
+            if not self.verts_counts[-1][col]:
+                continue
+            verts_attr, face_attr = VERT_ATTRS[tag]
+            vec_len = objx_tokenizer.VERT_LENS[tag]
+            face_indices = np.frombuffer(getattr(data, face_attr), dtype=np.int32)
+            indices = [face_indices]
+            if tag == b'v':
+                indices += [np.array(curve.get(b'curv_idx', ()), dtype=np.int32) for curve in data.nurbs]
+            used = np.unique(np.concatenate(indices))
+
+            # Own vertices, the ones of the blocks of data one after the other.
+            own = np.frombuffer(getattr(data, verts_attr), dtype=np.float32).reshape(-1, vec_len)
+            own_starts = np.array([self.verts_counts[block][col] for block in blocks], dtype=np.int64)
+            own_counts = np.array([self.verts_counts[block + 1][col] for block in blocks], dtype=np.int64) - own_starts
+            own_offsets = np.cumsum(own_counts) - own_counts
+            owner = np.maximum(np.searchsorted(own_starts, used, side='right') - 1, 0)
+            is_own = (used >= own_starts[owner]) & (used < own_starts[owner] + own_counts[owner])
+            own_idx = (used - own_starts[owner] + own_offsets[owner])[is_own]
+
+            verts = np.zeros((len(used), vec_len), dtype=np.float32)
+            verts[is_own] = own[own_idx]
+            colors = None
+            if tag == b'v':
+                own_colors = np.frombuffer(data.verts_col, dtype=np.float32).reshape(-1, 4)
+                if len(own_colors) == len(own):
+                    colors = np.zeros((len(used), 4), dtype=np.float32)
+                    colors[is_own] = own_colors[own_idx]
+            if not is_own.all():
+                fetched, fetched_colors = self.fetch_verts(tag, used[~is_own])
+                verts[~is_own] = fetched
+                if colors is not None and fetched_colors is not None:
+                    colors[~is_own] = fetched_colors
+                else:
+                    colors = None
+
+            setattr(data, verts_attr, array('f', verts.tobytes()))
+            setattr(data, face_attr, array('i', np.searchsorted(used, face_indices).astype(np.int32).tobytes()))
+            if tag == b'v':
+                # Vertex colors are only used when all the vertices have one.
+                data.verts_col = array('f', colors.tobytes() if colors is not None else b'')
+                for curve in data.nurbs:
+                    if b'curv_idx' in curve:
+                        curve[b'curv_idx'] = np.searchsorted(used, curve[b'curv_idx']).tolist()
+
+    def fetch_verts(self, tag, indices):
+        """
+        Reads back the vertices of kind tag of the given (sorted, unique) indices from the windows of the first pass
+        holding them, so that the memory used only depends on the amount of vertices read and not on the layout
+        of the file. Indices out of the vertices of the file get zeros.
+        Returns their (n, VERT_LENS[tag]) float32 array, and their (n, 4) colors array for b'v' if they all have one.
+        """
+        col = VERT_TAGS.index(tag)
+        vec_len = objx_tokenizer.VERT_LENS[tag]
+        starts = np.array([counts[col] for counts in self.window_verts_counts], dtype=np.int64)
+        verts = np.zeros((len(indices), vec_len), dtype=np.float32)
+        colors = np.zeros((len(indices), 4), dtype=np.float32) if tag == b'v' else None
+
+        valid = (indices >= 0) & (indices < self.verts_counts[-1][col])
+        windows = np.searchsorted(starts, indices, side='right') - 1
+        for window in np.unique(windows[valid]).tolist():
+            mask = valid & (windows == window)
+            window_verts, window_colors = self._window_verts(window, tag, indices[mask] - starts[window])
+            verts[mask] = window_verts
+            if colors is not None:
+                if window_colors is None:
+                    colors = None
+                else:
+                    colors[mask] = window_colors
+        return verts, colors
+
+    def _window_verts(self, window, tag, indices):
+        # Only the lines of the vertices of the given indices, counted from the start of the window, are parsed,
+        # each run of consecutive ones in one go.
+        data = objx_parse.OBJxData()
+        tokenizer = objx_tokenizer.OBJxTokenizer(decimal_comma=self.decimal_comma)
+        line_tag = next(line_tag for line_tag, name in objx_reader.TAG_NAMES.items() if name == tag)
+        base = 0
+        for lines in objx_reader.iter_windows(self.filepath, self.window_bounds[window],
+                                              self.window_bounds[window + 1]):
+            vert_lines = np.flatnonzero(lines.line_tags == line_tag)
+            wanted = indices[(indices >= base) & (indices < base + len(vert_lines))]
+            selected = vert_lines[wanted - base]
+            for run in np.split(selected, np.flatnonzero(np.diff(selected) != 1) + 1):
+                if len(run):
+                    data.read(tokenizer.tokenize_lines(lines, int(run[0]), int(run[-1]) + 1))
+            base += len(vert_lines)
+        data.read(tokenizer.flush())
+        verts = np.frombuffer(getattr(data, VERT_ATTRS[tag][0]), dtype=np.float32).reshape(
+            -1, objx_tokenizer.VERT_LENS[tag])
+        colors = None
+        if tag == b'v':
+            colors = np.frombuffer(data.verts_col, dtype=np.float32).reshape(-1, 4)
+            if len(colors) != len(verts):
+                colors = None
+        return verts, colors
+
+
+def read_object(blocks, options):
+    """
+    Worker process side of OBJxStream.iter_objects_parallel(): parses the object made of blocks.
+    """
+    return _worker_stream.read_object(blocks, **options)
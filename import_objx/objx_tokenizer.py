@@ -0,0 +1,710 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+"""
+Streaming tokenizer of OBJx files, independent from Blender.
+
+It turns the file into a stream of events: blocks of vertices, faces or polylines, and context changes
+(material, group, object, smooth group), material libraries and nurbs curves. Events are produced lazily
+as the consumer asks for them, through a fixed size window over the file, so that memory usage does not
+depend on the size of the file.
+
+Face, polyline and nurbs indices are resolved to 0-based absolute vertex indices, everything else
+(materials, groups, objects...) is left to the consumer, see objx_parse.OBJxData.
+
+This module, objx_reader and objx_parse do not depend on Blender: outside of it, they can be imported
+as standalone modules with this directory in sys.path.
+"""
+
+import os
+from array import array
+from collections import namedtuple
+
+import numpy as np
+
+if __package__:
+    from . import objx_reader, objx_warnings
+else:
+    import objx_reader, objx_warnings  # Used as a standalone module, outside of Blender.
+
+
+# Maximal amount of records in a block event.
+BLOCK_SIZE = 1 << 12
+
+# Runs of lines shorter than this are parsed faster line by line than in one go with numpy.
+MIN_RUN_SIZE = 32
+
+# Above that many quick vertex parsing failures, the tokenizer switches to the (slower) multi-line one.
+QUICK_VERT_MAX_FAILURES = 10000
+
+# Header line of the files written by I3DShapesTool, looked for in the first HEADER_SIZE bytes of a file.
+I3D_CREATOR = b'# Creator: I3DShapesTool'
+HEADER_SIZE = 1 << 12
+
+# A block of consecutive vertex records of the same kind.
+# tag is b'v', b'vn', b'vt', b'vt2', b'vt3' or b'vt4', values are the vertices one after the other (array('f'),
+# VERT_LENS[tag] values per vertex, missing ones being 0.0), colors the RGBA colors of those with extra values,
+# if any (array('f'), 4 values per color).
+VertexBlock = namedtuple("VertexBlock", ("tag", "values", "colors"))
+# A block of faces, stored as compressed rows: loc, nor, tex, tex2, tex3 and tex4 are the indices of
+# all the face corners one after the other (array('i')), sizes the amount of corners of each face (array('i')).
+FaceBlock = namedtuple("FaceBlock", ("loc", "nor", "tex", "tex2", "tex3", "tex4", "sizes"))
+# A block of polylines, stored as compressed rows: loc are the vertex indices of all the polylines (array('i')),
+# sizes the amount of vertices of each one (array('i')).
+PolylineBlock = namedtuple("PolylineBlock", ("loc", "sizes"))
+UseMaterial = namedtuple("UseMaterial", ("name",))
+SmoothGroup = namedtuple("SmoothGroup", ("name",))
+Group = namedtuple("Group", ("name",))
+Object = namedtuple("Object", ("name",))
+MaterialLib = namedtuple("MaterialLib", ("filenames",))
+# A nurbs curve, as a dict of its cstype/deg/curv/parm values.
+Nurbs = namedtuple("Nurbs", ("curve",))
+
+CONTEXT_EVENTS = {
+    b'usemtl': UseMaterial,
+    b's': SmoothGroup,
+    b'g': Group,
+    b'o': Object,
+}
+
+VERT_LENS = {
+    b'v': 3,
+    b'vn': 3,
+    b'vt': 2,
+    b'vt2': 2,
+    b'vt3': 2,
+    b'vt4': 2,
+}
+
+
+def line_value(line_split):
+    """
+    Returns 1 string representing the value for this line
+    None will be returned if there's only 1 word
+    """
+    length = len(line_split)
+    if length == 1:
+        return None
+
+    elif length == 2:
+        return line_split[1]
+
+    elif length > 2:
+        return b' '.join(line_split[1:])
+
+
+def filenames_group_by_ext(line, ext):
+    """
+    Splits material libraries supporting spaces, so:
+    b'foo bar.mtl baz spam.MTL' -> (b'foo bar.mtl', b'baz spam.MTL')
+    Also handle " chars (some software use those to protect filenames with spaces, see T67266... sic).
+    """
+    # Note that we assume that if there are some " in that line,
+    # then all filenames are properly enclosed within those...
+    start = line.find(b'"') + 1
+    if start != 0:
+        while start != 0:
+            end = line.find(b'"', start)
+            if end != -1:
+                yield line[start:end]
+                start = line.find(b'"', end + 1) + 1
+            else:
+                break
+        return
+
+    line_lower = line.lower()
+    i_prev = 0
+    while i_prev != -1 and i_prev < len(line):
+        i = line_lower.find(ext, i_prev)
+        if i != -1:
+            i += len(ext)
+        yield line[i_prev:i].strip()
+        i_prev = i
+
+
+def strip_slash(line_split):
+    if line_split[-1][-1] == 92:  # '\' char
+        if len(line_split[-1]) == 1:
+            line_split.pop()  # remove the \ item
+        else:
+            line_split[-1] = line_split[-1][:-1]  # remove the \ from the end last number
+        return True
+    return False
+
+
+def comma_float(svalue):
+    """float() for files using a decimal comma."""
+    return float(svalue.replace(b',', b'.'))
+
+
+# Numbers of files using a decimal comma are translated with this table before going through float().
+COMMA_TO_DOT = bytes.maketrans(b',', b'.')
+
+
+def line_decimal_comma(line):
+    """
+    Tells whether a line of vertex data uses a decimal comma, None if it has no decimal separator at all.
+    """
+    if b',' in line:
+        return True
+    if b'.' in line:
+        return False
+    return None
+
+
+def handle_vec(line_start, context_multi_line, line_split, tag, data, vec, vec_len):
+    ret_context_multi_line = tag if strip_slash(line_split) else b''
+    if line_start == tag:
+        vec[:] = [float(v) for v in line_split[1:]]
+    elif context_multi_line == tag:
+        vec += [float(v) for v in line_split]
+    if not ret_context_multi_line:
+        data.fromlist(vec[:vec_len] + [0.0] * (vec_len - len(vec)))
+    return ret_context_multi_line
+
+
+def is_i3d_dialect(filepath):
+    """
+    Tells whether the file has been written by I3DShapesTool, according to its header.
+    """
+    with open(filepath, 'rb') as file:
+        return is_i3d_header(file.read(HEADER_SIZE))
+
+
+def is_i3d_header(header):
+    """
+    Tells whether header, the first bytes of a file, is the one of a file written by I3DShapesTool.
+    """
+    return any(line.startswith(I3D_CREATOR) for line in header.splitlines())
+
+
+def face_block():
+    return FaceBlock(array('i'), array('i'), array('i'), array('i'), array('i'), array('i'), array('i'))
+
+
+def i3d_faces(lines, i0, i1, block):
+    """
+    Fast path for the faces of files written by I3DShapesTool: triangles of absolute v/vt/vn indices,
+    on a single line, the vt index being the one of the 4 UV layers.
+    Appends lines [i0, i1) to block (a FaceBlock) up to the first one not following that layout,
+    and returns the index of that line (i1 if they all do).
+    """
+    corners_loc = []
+    corners_tex = []
+    corners_nor = []
+    i = i0
+    for line in lines.lines(i0, i1):
+        line_split = line.split()
+        if len(line_split) != 4:
+            break
+        try:
+            v0, t0, n0 = line_split[1].split(b'/')
+            v1, t1, n1 = line_split[2].split(b'/')
+            v2, t2, n2 = line_split[3].split(b'/')
+            v0 = int(v0) - 1
+            v1 = int(v1) - 1
+            v2 = int(v2) - 1
+            t0 = int(t0) - 1
+            t1 = int(t1) - 1
+            t2 = int(t2) - 1
+            n0 = int(n0) - 1
+            n1 = int(n1) - 1
+            n2 = int(n2) - 1
+        except ValueError:
+            break
+        if min(v0, v1, v2, t0, t1, t2, n0, n1, n2) < 0:
+            break  # Relative or 0 (unset) index.
+        corners_loc += (v0, v1, v2)
+        corners_tex += (t0, t1, t2)
+        corners_nor += (n0, n1, n2)
+        i += 1
+
+    loc, nor, tex, tex2, tex3, tex4, sizes = block
+    loc.fromlist(corners_loc)
+    nor.fromlist(corners_nor)
+    tex.fromlist(corners_tex)
+    tex2.fromlist(corners_tex)
+    tex3.fromlist(corners_tex)
+    tex4.fromlist(corners_tex)
+    sizes.fromlist([3] * (i - i0))
+    return i
+
+
+def face_run(lines, i0, i1, verts_counts):
+    """
+    Fast path for runs of single-line face records, parsed all at once,
+    verts_counts being the amount of vertices of each kind read before them.
+    Returns a FaceBlock, or None if the run has to go through the generic per-line parsing instead.
+    """
+    if lines.line_cont[i0:i1].any():
+        return None
+    try:
+        indices, sizes = lines.face_block(i0, i1)
+    except ValueError:
+        return None
+
+    def absolute(idx, tag):
+        # Relative indices count back from the vertices read so far, 0 (or no index at all) is kept as 0.
+        return np.where(idx < 0, idx + verts_counts[tag], idx - 1).astype(np.int32)
+
+    # Note that we assume here we cannot get OBJ invalid 0 vertex index...
+    loc = np.where(indices[:, 0] < 1, indices[:, 0] + verts_counts[b'v'], indices[:, 0] - 1).astype(np.int32)
+    tex = indices[:, 1]
+    tex_set = tex != 0
+    nor = indices[:, 2]
+    block = face_block()
+    block.loc.frombytes(loc.tobytes())
+    block.nor.frombytes(np.where(nor != 0, absolute(nor, b'vn'), 0).tobytes())
+    for items, tag in zip(block[2:6], (b'vt', b'vt2', b'vt3', b'vt4')):
+        items.frombytes(np.where(tex_set, absolute(tex, tag), 0).tobytes())
+    block.sizes.frombytes(sizes.astype(np.int32).tobytes())
+    return block
+
+
+def vert_run(lines, i0, i1, tag, decimal_comma):
+    """
+    Fast path for runs of single-line vertex records, parsed all at once.
+    Returns a VertexBlock, or None if the run has to go through the generic per-line parsing instead.
+    """
+    vec_len = VERT_LENS[tag]
+    if lines.line_cont[i0:i1].any():
+        return None
+    try:
+        values, ncols = lines.vert_block(i0, i1, decimal_comma)
+    except ValueError:
+        return None
+    if ncols.min() < vec_len:
+        return None
+
+    colors = array('f')
+    has_rgb = ncols == 6
+    has_rgba = ncols == 7
+    if has_rgb.any() or has_rgba.any():
+        rgba = np.ones((len(values), 4), dtype=np.float32)  # add alpha=1.0
+        rgba[:, :3] = values[:, vec_len:vec_len + 3]
+        if has_rgba.any():  # with alpha
+            rgba[has_rgba, 3] = values[has_rgba, vec_len + 3]
+        colors.frombytes(rgba[has_rgb | has_rgba].tobytes())
+    vertices = array('f')
+    vertices.frombytes(values[:, :vec_len].tobytes())
+    return VertexBlock(tag, vertices, colors)
+
+
+class OBJxTokenizer:
+    """
+    Turns the lines of an OBJx file into events.
+    The tokenizer state is kept from one call to the next, so that consecutive parts of a file
+    can be given one after the other.
+    """
+
+    def __init__(self, *, decimal_comma=None, i3d_dialect=False, block_size=BLOCK_SIZE):
+        # Whether the numbers use a decimal comma, None until the first vertex data with a decimal separator tells.
+        self.decimal_comma = decimal_comma
+        # Use the I3DShapesTool faces fast path, until a face does not follow its layout.
+        # None until the header of the file given to tokenize() tells.
+        self.i3d_dialect = i3d_dialect
+        self.block_size = block_size
+
+        # Amount of vertices of each kind read so far, to resolve relative indices.
+        self.verts_counts = dict.fromkeys(VERT_LENS, 0)
+
+        # when there are faces that end with \
+        # it means they are multiline-
+        # since we use xreadline we can't skip to the next line
+        # so we need to know whether
+        self.context_multi_line = b''
+
+        # Nurbs
+        self.context_nurbs = {}
+        self.context_parm = b''  # used by nurbs too but could be used elsewhere
+
+        self.quick_vert_failures = 0
+
+        # Amount of lines before the ones given to tokenize_lines(), to tell the line numbers in warnings.
+        self.line_base = 0
+        # Called by tokenize() with the amount of bytes tokenized so far after each window, when set.
+        self.on_progress = None
+        self.warnings = objx_warnings.OBJxWarnings()
+
+        # Record currently parsed over several lines, and block event not yielded yet.
+        # A face (or polyline) is parsed in place at the end of the block, from face_start.
+        self.vec = []
+        self.face_start = None
+        self.face_verts_counts = None
+        self.block = None
+
+    def state(self):
+        """
+        Returns the state carried from one line to the next ones.
+        """
+        return (tuple(self.verts_counts.values()), self.context_multi_line, self.context_nurbs, self.context_parm)
+
+    def continuation(self, verts_counts):
+        """
+        Returns a new tokenizer for the lines following the ones given to this one,
+        the given vertices counts being the amount of vertices of each kind before those lines.
+        """
+        tokenizer = OBJxTokenizer(decimal_comma=self.decimal_comma, i3d_dialect=self.i3d_dialect,
+                                  block_size=self.block_size)
+        tokenizer.verts_counts = dict(zip(VERT_LENS, verts_counts))
+        tokenizer.context_multi_line = self.context_multi_line
+        tokenizer.context_nurbs = dict(self.context_nurbs)
+        tokenizer.context_parm = self.context_parm
+        return tokenizer
+
+    def tokenize(self, source, start=0, end=None):
+        """
+        Yields the events of a whole file, source being a file path, a memoryview or a binary file object,
+        see objx_reader.iter_windows().
+        """
+        size = 0
+        for lines in objx_reader.iter_windows(source, start, end):
+            if self.i3d_dialect is None and len(lines):
+                header_start = int(lines.line_starts[0])
+                self.i3d_dialect = is_i3d_header(lines.buffer[header_start:header_start + HEADER_SIZE])
+            yield from self.tokenize_lines(lines)
+            self.line_base += len(lines)
+            if self.on_progress is not None and len(lines):
+                size += int(lines.line_ends[-1]) + 1 - int(lines.line_starts[0])
+                self.on_progress(size)
+        yield from self.flush()
+
+    def flush(self):
+        """
+        Yields the block event not yielded yet, if any.
+        """
+        block = self.block
+        if self.face_start is not None:
+            # The file ends with a face or polyline continued on the next line, keep it as is.
+            block.sizes.append(len(block.loc) - self.face_start)
+            self.face_start = None
+        if block is not None:
+            yield block
+            self.block = None
+
+    def tokenize_lines(self, lines, i0=0, i1=None):
+        """
+        Yields the events of lines [i0, i1) of lines (an objx_reader.OBJxLines).
+        The last block event is kept until the next call, or flush().
+        """
+        block_size = self.block_size
+        decimal_comma = self.decimal_comma
+        i3d_dialect = self.i3d_dialect
+        line_base = self.line_base
+        warnings = self.warnings
+
+        verts_counts = self.verts_counts
+        context_multi_line = self.context_multi_line
+        context_nurbs = self.context_nurbs
+        context_parm = self.context_parm
+        quick_vert_failures = self.quick_vert_failures
+        skip_quick_vert = quick_vert_failures > QUICK_VERT_MAX_FAILURES
+
+        vec = self.vec
+        face_start = self.face_start
+        block = self.block
+        if face_start is not None:
+            if type(block) is FaceBlock:
+                (face_vert_loc_indices, face_vert_nor_indices, face_vert_tex_indices, face_vert_tex2_indices,
+                 face_vert_tex3_indices, face_vert_tex4_indices, face_sizes) = block
+                verts_loc_len, verts_nor_len, verts_tex_len, verts_tex2_len, verts_tex3_len, verts_tex4_len = \
+                    self.face_verts_counts
+            else:
+                face_vert_loc_indices, face_sizes = block
+
+        for tag, r0, r1 in lines.runs(i0, i1):
+            tag = objx_reader.TAG_NAMES[tag]
+            for b0 in range(r0, r1, block_size):
+                b1 = min(b0 + block_size, r1)
+                long_run = b1 - b0 >= MIN_RUN_SIZE
+
+                if decimal_comma is None and tag in VERT_LENS and long_run:
+                    decimal_comma = lines.find_decimal_comma(b0, b1)
+
+                # Long runs of single-line vertex records are converted in one go.
+                if tag in VERT_LENS and long_run and not skip_quick_vert and face_start is None:
+                    vertex_block = vert_run(lines, b0, b1, tag, decimal_comma)
+                    if vertex_block is not None:
+                        if block is not None:
+                            yield block
+                            block = None
+                        verts_counts[tag] += len(vertex_block.values) // VERT_LENS[tag]
+                        yield vertex_block
+                        continue
+
+                # And so are long runs of single-line faces.
+                if tag == b'f' and long_run and not context_multi_line:
+                    faces = face_run(lines, b0, b1, verts_counts)
+                    if faces is not None:
+                        if type(block) is FaceBlock:
+                            for items, run_items in zip(block, faces):
+                                items += run_items
+                        else:
+                            if block is not None:
+                                yield block
+                            block = faces
+                        b0 = b1
+
+                # Otherwise, the lines of the run before the one it trips over may still follow the I3DShapesTool layout.
+                if tag == b'f' and i3d_dialect and not context_multi_line and b0 < b1:
+                    if type(block) is not FaceBlock:
+                        if block is not None:
+                            yield block
+                        block = face_block()
+                    b0 = i3d_faces(lines, b0, b1, block)
+                    if b0 < b1:
+                        i3d_dialect = False  # Back to the generic parsing, from that line on.
+
+                for line_index, line in enumerate(lines.lines(b0, b1), b0):
+                    line_split = line.split()
+
+                    if not line_split:
+                        continue
+
+                    line_start = line_split[0]  # we compare with this a _lot_
+
+                    if len(line_split) == 1 and not context_multi_line and line_start != b'end':
+                        warnings.warn("skipping malformatted lines", line.decode('UTF-8', 'replace').rstrip(),
+                                      line_base + line_index + 1)
+                        continue
+
+                    # Handling vertex data are pretty similar, factorize that.
+                    # Also, most OBJ files store all those on a single line, so try fast parsing for that first,
+                    # and only fallback to full multi-line parsing when needed, this gives significant speed-up
+                    # (~40% on affected code).
+                    if line_start in VERT_LENS:
+                        vtag, do_quick_vert = line_start, not skip_quick_vert
+                    elif context_multi_line in VERT_LENS:
+                        vtag, do_quick_vert = context_multi_line, False
+                    else:
+                        vtag = None
+
+                    if vtag:
+                        if decimal_comma is None:
+                            decimal_comma = line_decimal_comma(line)
+                        if decimal_comma:
+                            line_split = line.translate(COMMA_TO_DOT).split()
+                        vdata_len = VERT_LENS[vtag]
+                        if face_start is not None:
+                            # Vertex in the middle of a multi-line face, which has to stay in its block.
+                            vertex_block = VertexBlock(vtag, array('f'), array('f'))
+                        elif type(block) is not VertexBlock or block.tag != vtag:
+                            if block is not None:
+                                yield block
+                            vertex_block = block = VertexBlock(vtag, array('f'), array('f'))
+                        else:
+                            vertex_block = block
+                        vdata = vertex_block.values
+                        if do_quick_vert:
+                            try:
+                                vdata.fromlist(list(map(float, line_split[1:vdata_len + 1])))
+                                if len(line_split) <= vdata_len:
+                                    vdata.fromlist([0.0] * (vdata_len + 1 - len(line_split)))
+                                verts_counts[vtag] += 1
+                                if len(line_split) == 7:
+                                    rgb = list(map(float, line_split[vdata_len + 1:vdata_len+4]))
+                                    rgb.append(1.0)             # add alpha=1.0
+                                    vertex_block.colors.fromlist(rgb)
+                                elif len(line_split) == 8:      # with alpha
+                                    vertex_block.colors.fromlist(list(map(float, line_split[vdata_len + 1:vdata_len+5])))
+                            except:
+                                do_quick_vert = False
+                                # In case we get too many failures on quick parsing, force fallback to full multi-line one.
+                                # Exception handling can become costly...
+                                quick_vert_failures += 1
+                                if quick_vert_failures > QUICK_VERT_MAX_FAILURES:
+                                    skip_quick_vert = True
+                        if not do_quick_vert:
+                            context_multi_line = handle_vec(line_start, context_multi_line, line_split,
+                                                            context_multi_line or line_start,
+                                                            vdata, vec, vdata_len)
+                            if not context_multi_line:
+                                verts_counts[vtag] += 1
+                        if vertex_block is not block and vdata:
+                            yield vertex_block
+
+                    elif line_start == b'f' or context_multi_line == b'f':
+                        if not context_multi_line:
+                            line_split = line_split[1:]
+                            # Instantiate a face
+                            if type(block) is not FaceBlock:
+                                if block is not None:
+                                    yield block
+                                block = face_block()
+                            (face_vert_loc_indices, face_vert_nor_indices, face_vert_tex_indices, face_vert_tex2_indices,
+                             face_vert_tex3_indices, face_vert_tex4_indices, face_sizes) = block
+                            face_start = len(face_vert_loc_indices)
+                            verts_loc_len = verts_counts[b'v']
+                            verts_nor_len = verts_counts[b'vn']
+                            verts_tex_len = verts_counts[b'vt']
+                            verts_tex2_len = verts_counts[b'vt2']
+                            verts_tex3_len = verts_counts[b'vt3']
+                            verts_tex4_len = verts_counts[b'vt4']
+                        # Else, use face_vert_loc_indices and face_vert_tex_indices previously defined and used the obj_face
+
+                        context_multi_line = b'f' if strip_slash(line_split) else b''
+
+                        for v in line_split:
+                            obj_vert = v.split(b'/')
+                            idx = int(obj_vert[0])  # Note that we assume here we cannot get OBJ invalid 0 index...
+                            face_vert_loc_indices.append((idx + verts_loc_len) if (idx < 1) else idx - 1)
+
+                            # formatting for faces with normals and textures is
+                            # loc_index/tex_index/nor_index
+                            if len(obj_vert) > 1 and obj_vert[1] and obj_vert[1] != b'0':
+                                idx = int(obj_vert[1])
+                                face_vert_tex_indices.append((idx + verts_tex_len) if (idx < 1) else idx - 1)
+                            else:
+                                face_vert_tex_indices.append(0)
+
+                            if len(obj_vert) > 1 and obj_vert[1] and obj_vert[1] != b'0':
+                                idx = int(obj_vert[1])
+                                face_vert_tex2_indices.append((idx + verts_tex2_len) if (idx < 1) else idx - 1)
+                            else:
+                                face_vert_tex2_indices.append(0)
+
+                            if len(obj_vert) > 1 and obj_vert[1] and obj_vert[1] != b'0':
+                                idx = int(obj_vert[1])
+                                face_vert_tex3_indices.append((idx + verts_tex3_len) if (idx < 1) else idx - 1)
+                            else:
+                                face_vert_tex3_indices.append(0)
+
+                            if len(obj_vert) > 1 and obj_vert[1] and obj_vert[1] != b'0':
+                                idx = int(obj_vert[1])
+                                face_vert_tex4_indices.append((idx + verts_tex4_len) if (idx < 1) else idx - 1)
+                            else:
+                                face_vert_tex4_indices.append(0)
+
+                            if len(obj_vert) > 2 and obj_vert[2] and obj_vert[2] != b'0':
+                                idx = int(obj_vert[2])
+                                face_vert_nor_indices.append((idx + verts_nor_len) if (idx < 1) else idx - 1)
+                            else:
+                                face_vert_nor_indices.append(0)
+
+                        if not context_multi_line:
+                            face_sizes.append(len(face_vert_loc_indices) - face_start)
+                            face_start = None
+
+                    elif line_start == b'l' or context_multi_line == b'l':
+                        # very similar to the face load function above with some parts removed
+                        if not context_multi_line:
+                            line_split = line_split[1:]
+                            # Instantiate a polyline
+                            if type(block) is not PolylineBlock:
+                                if block is not None:
+                                    yield block
+                                block = PolylineBlock(array('i'), array('i'))
+                            face_vert_loc_indices, face_sizes = block
+                            face_start = len(face_vert_loc_indices)
+                        # Else, use face_vert_loc_indices previously defined and used the obj_face
+
+                        context_multi_line = b'l' if strip_slash(line_split) else b''
+
+                        for v in line_split:
+                            obj_vert = v.split(b'/')
+                            idx = int(obj_vert[0]) - 1
+                            face_vert_loc_indices.append((idx + verts_counts[b'v'] + 1) if (idx < 0) else idx)
+
+                        if not context_multi_line:
+                            face_sizes.append(len(face_vert_loc_indices) - face_start)
+                            face_start = None
+
+                    elif line_start in CONTEXT_EVENTS:
+                        if block is not None:
+                            yield block
+                            block = None
+                        yield CONTEXT_EVENTS[line_start](line_value(line_split))
+
+                    elif line_start == b'mtllib':  # usemap or usemat
+                        # can have multiple mtllib filenames per line, mtllib can appear more than once,
+                        # so make sure only occurrence of material exists
+                        if block is not None:
+                            yield block
+                            block = None
+                        yield MaterialLib([os.fsdecode(f) for f in filenames_group_by_ext(line.lstrip()[7:].strip(), b'.mtl')])
+
+                        # Nurbs support
+                    elif line_start == b'cstype':
+                        context_nurbs[b'cstype'] = line_value(line.split())  # 'rat bspline' / 'bspline'
+                    elif line_start == b'curv' or context_multi_line == b'curv':
+                        curv_idx = context_nurbs[b'curv_idx'] = context_nurbs.get(b'curv_idx', [])  # in case were multiline
+
+                        if not context_multi_line:
+                            if decimal_comma:
+                                line_split = line.translate(COMMA_TO_DOT).split()
+                            context_nurbs[b'curv_range'] = float(line_split[1]), float(line_split[2])
+                            line_split[0:3] = []  # remove first 3 items
+
+                        if strip_slash(line_split):
+                            context_multi_line = b'curv'
+                        else:
+                            context_multi_line = b''
+
+                        for i in line_split:
+                            vert_loc_index = int(i) - 1
+
+                            if vert_loc_index < 0:
+                                vert_loc_index = verts_counts[b'v'] + vert_loc_index + 1
+
+                            curv_idx.append(vert_loc_index)
+
+                    elif line_start == b'parm' or context_multi_line == b'parm':
+                        if decimal_comma:
+                            line_split = line.translate(COMMA_TO_DOT).split()
+                        if context_multi_line:
+                            context_multi_line = b''
+                        else:
+                            context_parm = line_split[1]
+                            line_split[0:2] = []  # remove first 2
+
+                        if strip_slash(line_split):
+                            context_multi_line = b'parm'
+                        else:
+                            context_multi_line = b''
+
+                        if context_parm.lower() == b'u':
+                            context_nurbs.setdefault(b'parm_u', []).extend([float(f) for f in line_split])
+                        elif context_parm.lower() == b'v':  # surfaces not supported yet
+                            context_nurbs.setdefault(b'parm_v', []).extend([float(f) for f in line_split])
+                        # else: # may want to support other parm's ?
+
+                    elif line_start == b'deg':
+                        context_nurbs[b'deg'] = [int(i) for i in line.split()[1:]]
+                    elif line_start == b'end':
+                        # Add the nurbs curve
+                        if block is not None:
+                            yield block
+                            block = None
+                        yield Nurbs(context_nurbs)
+                        context_nurbs = {}
+                        context_parm = b''
+
+                    ''' # How to use usemap? deprecated?
+                    elif line_start == b'usema': # usemap or usemat
+                        context_image= line_value(line_split)
+                    '''
+
+                # Records spanning several lines are never split between blocks.
+                if (block is not None and not context_multi_line and
+                        (len(block.values) // VERT_LENS[block.tag] if type(block) is VertexBlock else len(block.sizes))
+                        >= block_size):
+                    yield block
+                    block = None
+
+        self.context_multi_line = context_multi_line
+        self.context_nurbs = context_nurbs
+        self.context_parm = context_parm
+        self.quick_vert_failures = quick_vert_failures
+        self.decimal_comma = decimal_comma
+        self.i3d_dialect = i3d_dialect
+        self.face_start = face_start
+        if face_start is not None and type(block) is FaceBlock:
+            self.face_verts_counts = (verts_loc_len, verts_nor_len, verts_tex_len,
+                                      verts_tex2_len, verts_tex3_len, verts_tex4_len)
+        self.block = block
+
+
+def tokenize(source, *, decimal_comma=None, i3d_dialect=False, block_size=BLOCK_SIZE):
+    """
+    Yields the events of an OBJx file, source being a file path, a memoryview or a binary file object.
+    """
+    return OBJxTokenizer(decimal_comma=decimal_comma, i3d_dialect=i3d_dialect, block_size=block_size).tokenize(source)
@@ -0,0 +1,113 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+"""
+Voxel-grid downsampling of the vertices of an OBJx file while it is parsed, independent from Blender.
+
+The vertices are not kept: the vertex blocks of the tokenizer are added to a hash grid holding, for each voxel,
+the sums of the positions (and colors) of its vertices and their count, so that memory only depends on the amount
+of voxels. Each voxel becomes a single vertex, the average of its vertices.
+With a vertex budget, the voxel size doubles whenever the grid has more voxels than the budget, the voxels being
+merged eight by eight into the twice bigger ones, which is exact since both grids are aligned on the origin.
+"""
+
+import numpy as np
+
+
+# Vertices buffered before being merged into the grid, at least as many as the grid has voxels,
+# so that sorting the voxels again is amortized over at least as many new vertices.
+MIN_MERGE_SIZE = 1 << 16
+
+# Voxel size of a grid with a vertex budget only, as a fraction of the extent of the first vertices.
+INITIAL_RESOLUTION = 1 << 16
+
+# Columns of the sums: the position and the color (RGBA) of the vertices.
+SUM_COLUMNS = 7
+
+# Integer coordinates of a voxel as a single value, for np.unique() to sort the voxels as rows.
+_VOXEL_KEY = np.dtype((np.void, 3 * np.dtype(np.int64).itemsize))
+
+
+class VoxelGrid:
+    """
+    Hash grid of the vertices added to it: the integer coordinates (keys) of the voxels of size voxel_size
+    holding vertices, the sums of their positions and colors, and their amount.
+    With max_voxels, the voxel size grows so that the grid keeps at most about max_voxels voxels,
+    starting from voxel_size or, when 0, from a size fitting the first vertices.
+    The colors are only kept when all the vertices have one.
+    """
+
+    def __init__(self, voxel_size=0.0, max_voxels=0):
+        if voxel_size <= 0.0 and max_voxels <= 0:
+            raise ValueError("a voxel size or a maximal amount of voxels is needed")
+        self.voxel_size = voxel_size
+        self.max_voxels = max_voxels
+        self.use_colors = True
+        self.vertices = 0  # Vertices added so far.
+        self.keys = np.empty((0, 3), dtype=np.int64)
+        self.sums = np.empty((0, SUM_COLUMNS), dtype=np.float64)
+        self.counts = np.empty(0, dtype=np.int64)
+        self._pending = []
+        self._pending_size = 0
+
+    def __len__(self):
+        self.flush()
+        return len(self.counts)
+
+    def add(self, positions, colors=None):
+        """
+        Adds vertices, positions being their flat x, y, z coordinates and colors their flat RGBA colors,
+        both as float32 buffers (such as the values and colors of an objx_tokenizer.VertexBlock).
+        """
+        positions = np.frombuffer(positions, dtype=np.float32).reshape(-1, 3)
+        if not len(positions):
+            return
+        colors = np.frombuffer(colors, dtype=np.float32).reshape(-1, 4) if colors is not None else None
+        if colors is None or len(colors) != len(positions):
+            self.use_colors = False
+        if self.voxel_size <= 0.0:
+            extent = float((positions.max(axis=0) - positions.min(axis=0)).max())
+            self.voxel_size = extent / INITIAL_RESOLUTION if extent > 0.0 else 1e-6
+        values = np.zeros((len(positions), SUM_COLUMNS), dtype=np.float64)
+        values[:, :3] = positions
+        if self.use_colors:
+            values[:, 3:] = colors
+        self._pending.append((np.floor(positions / self.voxel_size).astype(np.int64), values))
+        self._pending_size += len(positions)
+        self.vertices += len(positions)
+        if self._pending_size >= max(MIN_MERGE_SIZE, len(self.counts)):
+            self.flush()
+
+    def flush(self):
+        """
+        Merges the buffered vertices into the grid, and grows the voxels while there are too many of them.
+        """
+        if self._pending:
+            keys, values = zip(*self._pending)
+            self._pending = []
+            self._pending_size = 0
+            self._merge(np.concatenate((self.keys, *keys)), np.concatenate((self.sums, *values)),
+                        np.concatenate((self.counts, np.ones(sum(map(len, keys)), dtype=np.int64))))
+        while self.max_voxels and len(self.counts) > self.max_voxels:
+            self.voxel_size *= 2.0
+            self._merge(np.floor_divide(self.keys, 2), self.sums, self.counts)
+
+    def _merge(self, keys, sums, counts):
+        # Sums the rows of the same voxel.
+        voxels = np.ascontiguousarray(keys).view(_VOXEL_KEY).ravel()
+        _, first, inverse = np.unique(voxels, return_index=True, return_inverse=True)
+        inverse = inverse.ravel()
+        self.keys = keys[first]
+        self.counts = np.bincount(inverse, weights=counts, minlength=len(first)).astype(np.int64)
+        self.sums = np.empty((len(first), SUM_COLUMNS), dtype=np.float64)
+        for column in range(SUM_COLUMNS):
+            self.sums[:, column] = np.bincount(inverse, weights=sums[:, column], minlength=len(first))
+
+    def result(self):
+        """
+        Returns the vertices of the voxels (the average of their vertices) as flat float32 x, y, z coordinates,
+        and their flat RGBA colors (empty when the vertices do not all have one).
+        """
+        self.flush()
+        averages = (self.sums / self.counts[:, None]).astype(np.float32)
+        colors = averages[:, 3:] if self.use_colors else averages[:0, 3:]
+        return np.ascontiguousarray(averages[:, :3]).ravel(), np.ascontiguousarray(colors).ravel()
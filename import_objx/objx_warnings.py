@@ -0,0 +1,65 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+"""
+Collector of the warnings of an OBJx import, independent from Blender.
+
+Dirty files can have millions of bad lines, printing a warning for each one of them makes the console
+(and batch logs) the bottleneck of the import. Warnings are counted per category instead,
+only the first ones of each category are kept as examples, and a single summary is printed at the end.
+"""
+
+
+# Amount of examples kept for each category of warnings.
+MAX_EXAMPLES = 5
+
+
+class OBJxWarnings:
+    """
+    Warnings of an import: their count per category, and the first max_examples (line number, text) of each one.
+    """
+
+    def __init__(self, max_examples=MAX_EXAMPLES):
+        self.max_examples = max_examples
+        self.counts = {}
+        self.examples = {}
+
+    def __bool__(self):
+        return bool(self.counts)
+
+    def warn(self, category, text=None, line_number=None):
+        """
+        Adds a warning of category (its message), about text found at line_number (1-based) if given.
+        """
+        count = self.counts.get(category, 0)
+        self.counts[category] = count + 1
+        if count < self.max_examples:
+            self.examples.setdefault(category, []).append((line_number, text))
+
+    def extend(self, warnings):
+        """
+        Adds the warnings of another collector, collected after the ones of this one.
+        """
+        for category, count in warnings.counts.items():
+            self.counts[category] = self.counts.get(category, 0) + count
+            examples = self.examples.setdefault(category, [])
+            examples += warnings.examples.get(category, [])[:self.max_examples - len(examples)]
+
+    def summary(self):
+        """
+        Returns the summary of the warnings, as a list of lines.
+        """
+        lines = []
+        for category, count in self.counts.items():
+            examples = [(line_number, text) for line_number, text in self.examples.get(category, ())
+                        if text is not None]
+            lines.append("WARNING, %s, %d time%s%s" % (category, count, "s" if count > 1 else "",
+                                                      ":" if examples else ""))
+            for line_number, text in examples:
+                lines.append("    line %d: %s" % (line_number, text) if line_number else "    %s" % text)
+            if examples and count > len(examples):
+                lines.append("    ... and %d more" % (count - len(examples)))
+        return lines
+
+    def print_summary(self):
+        for line in self.summary():
+            print(line)
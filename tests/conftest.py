@@ -0,0 +1,9 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+# The modules of import_objx that do not need Blender are tested as standalone modules,
+# the package itself registering Blender operators when imported.
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "import_objx"))
@@ -0,0 +1,127 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+import numpy as np
+
+import objx_parse
+
+
+def invalid_ngons_per_face(sizes, loc):
+    """
+    The per-face check invalid_ngons() replaced: faces using a vertex more than once are suspects,
+    and are invalid when they use an edge more than once.
+    """
+    invalid = []
+    start = 0
+    for size in sizes.tolist():
+        face = loc[start:start + size].tolist()
+        start += size
+        is_invalid = False
+        if len(set(face)) < len(face):
+            edges = set()
+            prev_vidx = face[-1]
+            for vidx in face:
+                edge_key = (prev_vidx, vidx) if prev_vidx < vidx else (vidx, prev_vidx)
+                if edge_key in edges:
+                    is_invalid = True
+                    break
+                edges.add(edge_key)
+                prev_vidx = vidx
+        invalid.append(is_invalid)
+    return np.array(invalid, dtype=bool)
+
+
+def random_faces(num_faces, num_verts, seed=0):
+    rng = np.random.default_rng(seed)
+    sizes = rng.integers(1, 9, num_faces)
+    loc = rng.integers(0, num_verts, int(sizes.sum())).astype(np.int32)
+    return sizes, loc
+
+
+def test_invalid_ngons_matches_per_face_check():
+    # Few vertices, so that many faces use a vertex, or an edge, more than once.
+    for seed in range(5):
+        sizes, loc = random_faces(2000, 12, seed)
+        expected = invalid_ngons_per_face(sizes, loc)
+        assert expected.any() and not expected.all()
+        assert (objx_parse.invalid_ngons(sizes, loc) == expected).all()
+
+
+def test_invalid_ngons_known_faces():
+    sizes = np.array([4, 6, 6, 3, 2, 1])
+    loc = np.array([0, 1, 2, 3,  # Valid quad.
+                    0, 1, 2, 0, 3, 4,  # Uses vertex 0 twice, but no edge twice: valid.
+                    0, 1, 2, 0, 1, 3,  # Uses edge 0-1 twice: invalid.
+                    5, 5, 6,  # Degenerate triangle, uses edge 5-6 twice: invalid.
+                    7, 8,  # No vertex used twice: valid.
+                    9], dtype=np.int32)
+    expected = [False, False, True, True, False, False]
+    assert invalid_ngons_per_face(sizes, loc).tolist() == expected
+    assert objx_parse.invalid_ngons(sizes, loc).tolist() == expected
+    assert objx_parse.invalid_ngons(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int32)).tolist() == []
+
+
+def partition_per_face(sizes, flags, loc, use_edges):
+    """
+    The reverse per-face loop of create_mesh() partition_faces() replaced.
+    Returns the faces kept, the edges and the ngons to tessellate, as lists.
+    """
+    invalid = invalid_ngons_per_face(sizes, loc)
+    starts = (np.cumsum(sizes) - sizes).tolist()
+    faces = list(range(len(sizes)))
+    edges = []
+    ngons = []
+    for f_idx in range(len(faces) - 1, -1, -1):
+        size = int(sizes[f_idx])
+        face = loc[starts[f_idx]:starts[f_idx] + size].tolist()
+        if size == 1:
+            faces.pop(f_idx)  # can't add single vert faces
+        elif flags[f_idx] & objx_parse.FACE_POLYLINE or size == 2:
+            if use_edges:
+                edges.extend((face[i], face[i + 1]) for i in range(size - 1))
+            faces.pop(f_idx)
+        elif invalid[f_idx]:
+            # ignore triangles with invalid indices
+            if size > 3:
+                ngons.append(f_idx)
+            faces.pop(f_idx)
+    return faces, edges, ngons
+
+
+def check_partition(sizes, flags, loc, use_edges=True):
+    faces, edges, ngons = partition_per_face(sizes, flags, loc, use_edges)
+    is_face, faces_kept, edges_array, ngons_array = objx_parse.partition_faces(sizes, flags, loc, use_edges)
+    assert faces_kept.tolist() == faces
+    assert list(map(tuple, edges_array.tolist())) == edges
+    assert ngons_array.tolist() == ngons
+    assert is_face.tolist() == [size > 2 and not flag & objx_parse.FACE_POLYLINE
+                                for size, flag in zip(sizes.tolist(), flags.tolist())]
+
+
+def test_partition_faces_matches_per_face_loop():
+    rng = np.random.default_rng(0)
+    for seed in range(5):
+        sizes, loc = random_faces(2000, 12, seed)
+        flags = np.where(rng.random(len(sizes)) < 0.2, objx_parse.FACE_POLYLINE, 0).astype(np.uint8)
+        for use_edges in (True, False):
+            check_partition(sizes, flags, loc, use_edges)
+
+
+def test_partition_faces_known_faces():
+    sizes = np.array([1, 3, 2, 4, 3, 3, 5, 1])
+    flags = np.array([0, objx_parse.FACE_POLYLINE, 0, 0, 0, 0, 0, objx_parse.FACE_POLYLINE], dtype=np.uint8)
+    loc = np.array([0,  # Single vert: dropped.
+                    1, 2, 3,  # Polyline: edges 1-2 and 2-3.
+                    4, 5,  # 2 verts: edge 4-5.
+                    0, 1, 2, 3,  # Kept.
+                    5, 5, 6,  # Invalid triangle: dropped.
+                    6, 7, 8,  # Kept.
+                    0, 1, 2, 0, 1,  # Invalid ngon: tessellated.
+                    9], dtype=np.int32)  # Single vert polyline: dropped.
+    is_face, faces_kept, edges, ngons = objx_parse.partition_faces(sizes, flags, loc)
+    assert is_face.tolist() == [False, False, False, True, True, True, True, False]
+    assert faces_kept.tolist() == [3, 5]
+    # In the reverse order of their face.
+    assert edges.tolist() == [[4, 5], [1, 2], [2, 3]]
+    assert ngons.tolist() == [6]
+    check_partition(sizes, flags, loc)
+    assert objx_parse.partition_faces(sizes, flags, loc, use_edges=False)[2].shape == (0, 2)
@@ -0,0 +1,183 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+import ast
+import functools
+import os
+import random
+
+import numpy as np
+import pytest
+
+import objx_parse
+import objx_reader
+import objx_stream
+
+
+def write_objx(path, num_objects=8, pool_size=200, seed=0):
+    """
+    Writes an OBJx file with all the vertices of a shared pool before the first object, like the I3D layout,
+    and objects having a few vertices of their own, their faces using both.
+    """
+    rnd = random.Random(seed)
+    lines = []
+    for i in range(pool_size):
+        lines.append("v %.4f %.4f %.4f" % (rnd.random(), rnd.random(), rnd.random()))
+        lines.append("vt %.4f %.4f" % (rnd.random(), rnd.random()))
+    num_verts = pool_size
+    for ob in range(num_objects):
+        lines.append("o Object%d" % ob)
+        lines.append("usemtl Material%d" % (ob % 3))
+        for i in range(6):
+            lines.append("v %.4f %.4f %.4f" % (ob, rnd.random(), i))
+            lines.append("vt %.4f %.4f" % (rnd.random(), ob))
+        num_verts += 6
+        for i in range(20):
+            corners = [rnd.randrange(num_verts) + 1 for _ in range(rnd.choice((3, 4)))]
+            lines.append("f " + " ".join("%d/%d" % (c, c) for c in corners))
+        lines.append("f -1/-1 -2/-2 -3/-3")
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def faces_by_object(data):
+    """
+    Returns the corner coordinates and UVs of the faces of data (an OBJxData), by object key.
+    """
+    verts_loc = np.frombuffer(data.verts_loc, dtype=np.float32).reshape(-1, 3)
+    verts_tex = np.frombuffer(data.verts_tex, dtype=np.float32).reshape(-1, 2)
+    face_loc = np.frombuffer(data.face_loc, dtype=np.int32)
+    face_tex = np.frombuffer(data.face_tex, dtype=np.int32)
+    offsets = np.frombuffer(data.face_offsets, dtype=np.int64)
+    object_keys = list(data.object_keys)
+    faces = {}
+    for face, obj in enumerate(data.face_object):
+        corners = slice(offsets[face], offsets[face + 1])
+        faces.setdefault(object_keys[obj], []).append(
+            (verts_loc[face_loc[corners]].tolist(), verts_tex[face_tex[corners]].tolist()))
+    return faces
+
+
+@pytest.mark.parametrize("window_size", [300, 2000, objx_reader.WINDOW_SIZE])
+def test_iter_objects_matches_parse(tmp_path, monkeypatch, window_size):
+    # Small windows make the vertices an object uses from the pool be read back from several windows.
+    monkeypatch.setattr(objx_reader, "iter_windows",
+                        functools.partial(objx_reader.iter_windows, window_size=window_size))
+    path = str(tmp_path / "test.objx")
+    write_objx(path)
+
+    expected = faces_by_object(objx_parse.parse(path))
+    stream = objx_stream.OBJxStream.index(path)
+    assert stream is not None
+    if window_size == 300:
+        assert len(stream.window_bounds) > 10
+    streamed = {}
+    for data in stream.iter_objects():
+        # Each object only has the vertices its faces use.
+        assert len(data.verts_loc) // 3 == len(np.unique(np.frombuffer(data.face_loc, dtype=np.int32)))
+        for key, faces in faces_by_object(data).items():
+            assert key not in streamed
+            streamed[key] = faces
+    assert streamed == expected
+
+
+def test_read_object_vertex_count_mismatch(tmp_path):
+    path = str(tmp_path / "test.objx")
+    write_objx(path, num_objects=2)
+    stream = objx_stream.OBJxStream.index(path)
+    blocks = stream.objects[0]
+    stream.verts_counts[blocks[-1] + 1][0] += 1
+    with pytest.raises(ValueError, match="vertex count mismatch"):
+        stream.read_object(blocks)
+
+
+@pytest.fixture
+def index_calls(monkeypatch):
+    """
+    Counts the first passes OBJxStream.cached_index() runs, rather than reusing the index file.
+    """
+    calls = []
+    index = objx_stream.OBJxStream.index.__func__
+
+    def counted_index(cls, filepath, **kwargs):
+        calls.append(filepath)
+        return index(cls, filepath, **kwargs)
+
+    monkeypatch.setattr(objx_stream.OBJxStream, "index", classmethod(counted_index))
+    return calls
+
+
+def test_cached_index_round_trip(tmp_path, index_calls):
+    path = str(tmp_path / "test.objx")
+    write_objx(path)
+    stream = objx_stream.OBJxStream.cached_index(path)
+    assert (tmp_path / ("test.objx" + objx_stream.INDEX_EXT)).exists()
+
+    cached = objx_stream.OBJxStream.cached_index(path)
+    assert len(index_calls) == 1
+    for attr in objx_stream.INDEX_ATTRS:
+        assert getattr(cached, attr) == getattr(stream, attr), attr
+    assert cached.unique_materials == stream.unique_materials
+    assert cached.unique_smooth_groups == stream.unique_smooth_groups
+    assert cached.material_libs == stream.material_libs
+    assert faces_by_object(next(cached.iter_objects())) == faces_by_object(next(stream.iter_objects()))
+
+
+def stale_size(path, index_path):
+    with open(path, "a") as f:
+        f.write("# changed\n")
+
+
+def stale_mtime(path, index_path):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+
+
+def stale_version(path, index_path):
+    with open(index_path, encoding='utf-8') as f:
+        index = ast.literal_eval(f.read())
+    index["version"] = objx_stream.INDEX_VERSION - 1
+    with open(index_path, 'w', encoding='utf-8') as f:
+        f.write(repr(index))
+
+
+def corrupt(path, index_path):
+    with open(index_path, 'w', encoding='utf-8') as f:
+        f.write("{'version': ")
+
+
+@pytest.mark.parametrize("make_stale", [stale_size, stale_mtime, stale_version, corrupt])
+def test_cached_index_stale(tmp_path, index_calls, make_stale):
+    path = str(tmp_path / "test.objx")
+    write_objx(path)
+    objx_stream.OBJxStream.cached_index(path)
+    make_stale(path, path + objx_stream.INDEX_EXT)
+
+    stream = objx_stream.OBJxStream.cached_index(path)
+    assert len(index_calls) == 2
+    assert stream.bounds[-1] == os.path.getsize(path)
+    # The index written again is reused.
+    objx_stream.OBJxStream.cached_index(path)
+    assert len(index_calls) == 2
+
+
+@pytest.mark.parametrize("kwargs", [{"use_split_groups": True}, {"use_edges": False}, {"i3d_dialect": True}])
+def test_cached_index_other_options(tmp_path, index_calls, kwargs):
+    path = str(tmp_path / "test.objx")
+    write_objx(path)
+    objx_stream.OBJxStream.cached_index(path)
+    objx_stream.OBJxStream.cached_index(path, **kwargs)
+    assert len(index_calls) == 2
+    # The index is of the last options it was built with.
+    objx_stream.OBJxStream.cached_index(path)
+    assert len(index_calls) == 3
+
+
+def test_cached_index_decimal_comma(tmp_path, index_calls):
+    # An index of a file using a decimal point is reused when detecting it, or when told so.
+    path = str(tmp_path / "test.objx")
+    write_objx(path)
+    objx_stream.OBJxStream.cached_index(path)
+    assert not objx_stream.OBJxStream.cached_index(path, decimal_comma=False).decimal_comma
+    assert len(index_calls) == 1
+    assert objx_stream.OBJxStream.cached_index(path, decimal_comma=True).decimal_comma
+    assert len(index_calls) == 2
@@ -0,0 +1,95 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+import random
+
+import pytest
+
+import objx_parse
+
+# OBJxData attributes the parallel parsing has to give the same as the single process one.
+DATA_ATTRS = ("verts_loc", "verts_nor", "verts_tex", "verts_col", "face_offsets", "face_loc", "face_nor", "face_tex",
+              "face_material", "face_smooth_group", "face_object", "face_flags", "material_keys",
+              "smooth_group_keys", "object_keys", "material_libs", "vertex_groups", "use_default_material",
+              "unique_materials", "unique_smooth_groups", "decimal_comma")
+
+
+def write_objx(path, num_objects=12, seed=0):
+    """
+    Writes an OBJx file of num_objects objects, with colored vertices, normals, UVs, materials,
+    smooth groups, groups, polylines and a few malformed lines.
+    """
+    rnd = random.Random(seed)
+    lines = ["# test file", "mtllib test.mtl"]
+    num_verts = 0
+    for ob in range(num_objects):
+        lines.append("o Object%d" % ob)
+        lines.append("g Group%d" % (ob % 3))
+        for i in range(40):
+            lines.append("v %.4f %.4f %.4f %.3f %.3f %.3f" % (rnd.random(), rnd.random(), rnd.random(),
+                                                             rnd.random(), rnd.random(), rnd.random()))
+            lines.append("vn %.4f %.4f %.4f" % (rnd.random(), rnd.random(), rnd.random()))
+            lines.append("vt %.4f %.4f" % (rnd.random(), rnd.random()))
+        num_verts += 40
+        if ob % 4 == 3:
+            lines.append("bogus")  # Malformed, skipped with a warning.
+        lines.append("usemtl Material%d" % (ob % 2))
+        lines.append("s %s" % ("off" if ob % 2 else ob))
+        for i in range(60):
+            size = rnd.choice((3, 4, 5))
+            corners = [rnd.randrange(num_verts - 40, num_verts) + 1 for _ in range(size)]
+            lines.append("f " + " ".join("%d/%d/%d" % (c, c, c) for c in corners))
+        lines.append("l %d %d %d" % (num_verts, num_verts - 1, num_verts - 2))
+        lines.append("f -1 -2 -3")
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+@pytest.mark.parametrize("options", [{}, {"use_split_groups": True, "use_groups_as_vgroups": True}])
+def test_parse_parallel_matches_parse(tmp_path, monkeypatch, options):
+    monkeypatch.setattr(objx_parse, "PARALLEL_MIN_SIZE", 0)
+    path = str(tmp_path / "test.objx")
+    write_objx(path)
+
+    expected = objx_parse.parse(path, **options)
+    data = objx_parse.parse_parallel(path, 4, None, False, options)
+    assert data is not None, "parallel parsing fell back to a single process"
+    for attr in DATA_ATTRS:
+        assert getattr(data, attr) == getattr(expected, attr), attr
+    assert data.warnings.counts == expected.warnings.counts
+    assert data.warnings.examples == expected.warnings.examples
+    assert expected.warnings.counts  # The malformed lines are reported.
+
+
+def test_parse_processes_matches_parse(tmp_path, monkeypatch):
+    monkeypatch.setattr(objx_parse, "PARALLEL_MIN_SIZE", 0)
+    path = str(tmp_path / "test.objx")
+    write_objx(path, num_objects=5, seed=1)
+    progress = []
+
+    expected = objx_parse.parse(path)
+    data = objx_parse.parse(path, processes=3, on_progress=progress.append)
+    for attr in DATA_ATTRS:
+        assert getattr(data, attr) == getattr(expected, attr), attr
+    assert progress[-1] == (tmp_path / "test.objx").stat().st_size
+
+
+@pytest.mark.parametrize("record", ["vn 0.1 0.2 0.3", "\tusemtl Material1", "o Indented"])
+def test_parse_parallel_indented_records(tmp_path, monkeypatch, record):
+    # The line tags miss indented records, the chunk contexts cannot be guessed from them.
+    monkeypatch.setattr(objx_parse, "PARALLEL_MIN_SIZE", 0)
+    path = tmp_path / "test.objx"
+    write_objx(str(path))
+    lines = path.read_text().splitlines()
+    lines.insert(len(lines) // 2, " " + record)
+    path.write_text("\n".join(lines) + "\n")
+
+    def pool(*args, **kwargs):
+        raise AssertionError("worker processes started for a file that cannot be parsed in chunks")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(objx_parse.multiprocessing, "Pool", pool)
+        assert objx_parse.parse_parallel(str(path), 4, None, False, {}) is None
+    expected = objx_parse.parse(str(path))
+    data = objx_parse.parse(str(path), processes=4)
+    for attr in DATA_ATTRS:
+        assert getattr(data, attr) == getattr(expected, attr), attr